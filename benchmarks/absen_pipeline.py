@@ -0,0 +1,100 @@
+# benchmarks/absen_pipeline.py
+#
+# Latency absen: urutan lama (validate_voice -> process_absen -> earn_xp_balance)
+# vs AbsenService.checkin (satu transaksi). Butuh DATABASE/REDIS dari .env, memakai
+# guild sintetis lalu membersihkan semua row-nya setelah selesai.
+# Jalankan: python -m benchmarks.absen_pipeline [jumlah_member]
+
+import asyncio
+import statistics
+import sys
+import time
+
+from core import db, redis
+from services import economy
+from services.absen import AbsenService
+from utils.time import get_current_date_uptime
+
+GUILD_ID = 1  # tidak pernah dipakai guild discord asli
+
+
+async def seed(members: int, today):
+    await db.execute(
+        """
+        INSERT INTO voisa.voice_counts (guild_id, member_id, count_date, total_time)
+        SELECT $1, g, $3::date, 600
+        FROM generate_series(1, $2) AS g
+        ON CONFLICT (guild_id, member_id, count_date) DO NOTHING
+        """,
+        GUILD_ID, members * 2, today
+    )
+
+
+async def cleanup():
+    for table, column in (
+        ("voisa.voice_counts", "guild_id"),
+        ("voisa.members_absen", "guild_id"),
+        ("voisa.members", "guild_id"),
+        ("voisa.transactions", "guild_id"),
+    ):
+        await db.execute(f"DELETE FROM {table} WHERE {column} = $1", GUILD_ID)
+
+    for pattern in (f"voisa:lb:{GUILD_ID}:*", f"voisa:member_stats:{GUILD_ID}:*"):
+        keys = [key async for key in redis.redis.scan_iter(match=pattern, count=500)]
+        if keys:
+            await redis.redis.delete(*keys)
+
+
+async def sequential(user_id: int, today):
+    ok, _ = await economy.validate_voice(GUILD_ID, user_id, today)
+    if not ok:
+        return
+    result = await AbsenService.process_absen(GUILD_ID, user_id, today)
+    if result is None:
+        return
+    await economy.earn_xp_balance(GUILD_ID, user_id, f"bench{user_id}", 1200, 1500, "daily check-in", "credit")
+
+
+async def pipelined(user_id: int, today):
+    await AbsenService.checkin(GUILD_ID, user_id, f"bench{user_id}", today, 1200, 1500)
+
+
+async def measure(fn, user_ids, today) -> list[float]:
+    samples = []
+    for user_id in user_ids:
+        started = time.perf_counter()
+        await fn(user_id, today)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def report(name: str, samples: list[float]):
+    samples = sorted(samples)
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    print(f"{name:<12} | median {statistics.median(samples):7.2f} ms | p95 {p95:7.2f} ms | n={len(samples)}")
+
+
+async def main(members: int):
+    await db.init_db_pool()
+    await redis.init_redis()
+    today = get_current_date_uptime()
+
+    try:
+        await cleanup()
+        await seed(members, today)
+
+        # member berbeda untuk tiap varian supaya keduanya benar-benar mencatat absen
+        old = await measure(sequential, range(1, members + 1), today)
+        new = await measure(pipelined, range(members + 1, members * 2 + 1), today)
+
+        report("sequential", old)
+        report("checkin", new)
+        print(f"speedup x{statistics.median(old) / statistics.median(new):.2f}")
+    finally:
+        await cleanup()
+        await redis.close_redis()
+        await db.close_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 200))
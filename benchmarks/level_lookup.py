@@ -0,0 +1,44 @@
+# benchmarks/level_lookup.py
+#
+# Bandingkan loop level lama dengan lookup bisect di tabel threshold.
+# Jalankan: python -m benchmarks.level_lookup
+
+import random
+import timeit
+
+from utils.helper.economy import BASE_XP, LEVEL_POWER, xp_for_level, get_level_from_xp
+
+
+def loop_level_from_xp(xp: int, base_xp: int = BASE_XP, power: float = LEVEL_POWER) -> int:
+    """Implementasi lama: jalan satu per satu level"""
+    level = 0
+    while xp >= xp_for_level(level + 1, base_xp, power):
+        level += 1
+    return level
+
+
+def main():
+    rng = random.Random(42)
+
+    for max_level in (10, 100, 1000, 5000):
+        top = xp_for_level(max_level)
+        samples = [rng.randrange(0, top) for _ in range(1000)]
+
+        # pastikan hasilnya identik sebelum diukur
+        for xp in samples:
+            assert loop_level_from_xp(xp) == get_level_from_xp(xp), xp
+
+        loop_t = timeit.timeit(lambda: [loop_level_from_xp(xp) for xp in samples], number=5)
+        table_t = timeit.timeit(lambda: [get_level_from_xp(xp) for xp in samples], number=5)
+
+        per_call = 5 * len(samples)
+        print(
+            f"level <= {max_level:>5} | "
+            f"loop {loop_t / per_call * 1e6:9.2f} us | "
+            f"bisect {table_t / per_call * 1e6:6.2f} us | "
+            f"x{loop_t / table_t:,.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
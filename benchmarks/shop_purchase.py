@@ -0,0 +1,99 @@
+# benchmarks/shop_purchase.py
+#
+# 100 pembeli serentak untuk satu item berstok terbatas:
+# urutan lama (spend_balance -> reduce_stock -> add_to_inventory) vs ShopRepository.purchase.
+# Butuh DATABASE/REDIS dari .env, memakai guild & item sintetis lalu membersihkannya.
+# Row ledger dari jalur lama (spend_balance -> ledger.append_many) ditulis ke journal khusus bench
+# di luar prefix voisa:ledger:pending:* (tidak diambil alih bot) dan dibuang saat cleanup.
+# Jalankan: python -m benchmarks.shop_purchase [jumlah_pembeli] [stok]
+
+import asyncio
+import sys
+import time
+
+from core import db, ledger, redis
+from repositories import economy as economy_repo
+from repositories.shop import ShopRepository
+from utils.time import get_current_date_uptime
+
+GUILD_ID = 1  # tidak pernah dipakai guild discord asli
+ITEM = {"item_name": "bench item", "effect_type": "discount", "value": 100, "price": 1000}
+BENCH_JOURNAL_KEY = "voisa:bench:ledger:pending"
+
+
+async def setup_item(repo: ShopRepository, stock: int) -> int:
+    await repo.insert_shop_item(GUILD_ID, get_current_date_uptime(), {**ITEM, "stock": stock})
+    return await db.fetchval(
+        "SELECT id FROM voisa.shop_items WHERE item_name = $1 ORDER BY id DESC LIMIT 1", ITEM["item_name"]
+    )
+
+
+async def cleanup():
+    # buffer ledger tidak pernah di-flush (ledger.start() tidak dipanggil), cukup dibuang
+    ledger._buffer.clear()
+    await redis.redis.delete(BENCH_JOURNAL_KEY)
+    for table in ("voisa.shop_items", "voisa.user_inventory", "voisa.members", "voisa.transactions"):
+        await db.execute(f"DELETE FROM {table} WHERE guild_id = $1", GUILD_ID)
+    for pattern in (f"voisa:lb:{GUILD_ID}:*", f"voisa:member_stats:{GUILD_ID}:*"):
+        keys = [key async for key in redis.redis.scan_iter(match=pattern, count=500)]
+        if keys:
+            await redis.redis.delete(*keys)
+
+
+async def legacy_buy(repo: ShopRepository, item_id: int, user_id: int) -> bool:
+    item = dict(await db.fetchrow("SELECT * FROM voisa.shop_items WHERE id = $1", item_id))
+    if item["stock"] <= 0:
+        return False
+    if not await economy_repo.spend_balance(GUILD_ID, user_id, f"bench{user_id}", item["price"], "bench", "debit"):
+        return False
+    await repo.reduce_stock(item_id)
+    await repo.add_to_inventory(GUILD_ID, user_id, item)
+    return True
+
+
+async def transactional_buy(repo: ShopRepository, item_id: int, user_id: int) -> bool:
+    status, _ = await repo.purchase(GUILD_ID, user_id, f"bench{user_id}", item_id)
+    return status == "ok"
+
+
+async def run(name: str, buy, repo: ShopRepository, buyers: int, stock: int):
+    await cleanup()
+    item_id = await setup_item(repo, stock)
+
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(buy(repo, item_id, user_id) for user_id in range(1, buyers + 1)),
+        return_exceptions=True
+    )
+    elapsed = time.perf_counter() - started
+
+    sold = sum(1 for r in results if r is True)
+    errors = sum(1 for r in results if isinstance(r, Exception))
+    final_stock = await db.fetchval("SELECT stock FROM voisa.shop_items WHERE id = $1", item_id)
+    inventory = await db.fetchval(
+        "SELECT COUNT(*) FROM voisa.user_inventory WHERE guild_id = $1 AND item_name = $2", GUILD_ID, ITEM["item_name"]
+    )
+    print(
+        f"{name:<14} | {elapsed * 1000:8.1f} ms | sold {sold:>3}/{stock} | "
+        f"stock akhir {final_stock:>4} | inventory {inventory:>3} | error {errors}"
+    )
+
+
+async def main(buyers: int, stock: int):
+    await db.init_db_pool()
+    await redis.init_redis()
+    repo = ShopRepository(db)
+    ledger.JOURNAL_KEY = BENCH_JOURNAL_KEY
+
+    try:
+        await run("sequential", legacy_buy, repo, buyers, stock)
+        await run("transactional", transactional_buy, repo, buyers, stock)
+    finally:
+        await cleanup()
+        await redis.close_redis()
+        await db.close_pool()
+
+
+if __name__ == "__main__":
+    args = [int(a) for a in sys.argv[1:3]]
+    asyncio.run(main(*(args + [100, 10][len(args):])))
@@ -0,0 +1,79 @@
+# benchmarks/sweepline.py
+#
+# Sweep-line overlap vs pairwise per channel pada sesi voice sintetis.
+# Jalankan: python -m benchmarks.sweepline [jumlah_sesi]
+
+import random
+import sys
+import time
+
+from collections import defaultdict
+from utils.helper.sweepline import OverlapSweep
+
+
+def synthetic_sessions(n: int, channels: int = 300, users: int = 20_000, days: int = 28, seed: int = 7):
+    rng = random.Random(seed)
+    span = days * 86400
+    sessions = []
+    for _ in range(n):
+        join = rng.uniform(0, span)
+        sessions.append((rng.randrange(channels), rng.randrange(users), join, join + rng.expovariate(1 / 2400)))
+    sessions.sort(key=lambda s: (s[0], s[2]))
+    return sessions
+
+
+def pairwise(sessions):
+    """Setara self-join SQL: bandingkan setiap pasangan sesi dalam channel yang sama"""
+    by_channel = defaultdict(list)
+    for session in sessions:
+        by_channel[session[0]].append(session)
+
+    totals = defaultdict(float)
+    for rows in by_channel.values():
+        for i, (_, u1, j1, l1) in enumerate(rows):
+            for _, u2, j2, l2 in rows[i + 1:]:
+                if u1 == u2:
+                    continue
+                overlap = min(l1, l2) - max(j1, j2)
+                if overlap > 0:
+                    totals[(min(u1, u2), max(u1, u2))] += overlap
+    return totals
+
+
+def run_sweep(sessions, focus_user=None):
+    sweep = OverlapSweep(focus_user)
+    for session in sessions:
+        sweep.feed(*session)
+    return sweep.totals
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    # validasi hasil di sampel kecil
+    small = synthetic_sessions(20_000)
+    t0 = time.perf_counter()
+    expected = pairwise(small)
+    pairwise_t = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    got = run_sweep(small)
+    sweep_small_t = time.perf_counter() - t0
+    assert expected.keys() == got.keys()
+    assert all(abs(expected[k] - got[k]) < 1e-6 for k in expected)
+    print(f"   20,000 sessions | pairwise {pairwise_t:7.2f}s | sweep {sweep_small_t:6.2f}s")
+
+    sessions = synthetic_sessions(n)
+
+    t0 = time.perf_counter()
+    totals = run_sweep(sessions)
+    sweep_t = time.perf_counter() - t0
+    print(f"{n:>9,} sessions | sweep (all pairs) {sweep_t:6.2f}s | {len(totals):,} pairs")
+
+    t0 = time.perf_counter()
+    run_sweep(sessions, focus_user=42)
+    focus_t = time.perf_counter() - t0
+    print(f"{n:>9,} sessions | sweep (one user) {focus_t:7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
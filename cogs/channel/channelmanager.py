@@ -41,9 +41,7 @@ class ActiveChannel(commands.Cog):
 
         self.disabled_channels.setdefault(guild_id, set()).add(target_channel_id)
 
-        key = f"voisa:disabled_channels:{guild_id}"
-        disabled = self.disabled_channels[guild_id]
-        await self.bot.redis.set(key, ",".join(str(cid) for cid in disabled))
+        await redis.save_disabled_channels_cache(self, guild_id, self.disabled_channels[guild_id])
 
         await ctx.reply(f"🔇 Yumna tidak lagi mendengarkan channel {target_channel.mention}.", ephemeral=True)
 
@@ -63,12 +61,7 @@ class ActiveChannel(commands.Cog):
 
         self.disabled_channels.setdefault(guild_id, set()).discard(target_channel_id)
 
-        key = f"voisa:disabled_channels:{guild_id}"
-        disabled = self.disabled_channels[guild_id]
-        if disabled:
-            await self.bot.redis.set(key, ",".join(str(cid) for cid in disabled))
-        else:
-            await self.bot.redis.delete(key)
+        await redis.save_disabled_channels_cache(self, guild_id, self.disabled_channels[guild_id])
 
         await ctx.reply(f"✅ Channel {target_channel.mention} didengarkan kembali oleh-ku.", ephemeral=True)
         
@@ -202,84 +195,29 @@ class ActiveChannel(commands.Cog):
     
     async def load_all_channel_data(self):
         try:
-            # 1. Ambil semua key master_channel_ai:<guild_id>
-            cursor = 0
-            master_keys = []
-            while True:
-                cursor, batch = await self.bot.redis.scan(
-                    cursor=cursor,
-                    match="voisa:master_channel_ai:*",
-                    count=100
-                )
-                master_keys.extend(batch)
-                if cursor == 0:
-                    break
-
-            # 2. Ambil semua key disabled_channels:<guild_id>
-            cursor = 0
-            disabled_keys = []
-            while True:
-                cursor, batch = await self.bot.redis.scan(
-                    cursor=cursor,
-                    match="voisa:disabled_channels:*",
-                    count=100
-                )
-                disabled_keys.extend(batch)
-                if cursor == 0:
-                    break
-
-            # 3. Proses master_keys
-            for raw_key in master_keys:
-                key = raw_key.decode() if isinstance(raw_key, bytes) else raw_key
-                # key format: "voisa:master_channel_ai:<guild_id>"
-                parts = key.split(":")
-                if len(parts) != 3:
-                    continue
-
-                try:
-                    guild_id = int(parts[2])
-                except ValueError:
-                    continue
-
-                raw_val = await self.bot.redis.get(key)
-                if raw_val:
-                    try:
-                        data_master = raw_val.decode("utf-8") if isinstance(raw_val, bytes) else raw_val
-                        channel_id = int(data_master)
-                        self.master_channels_ai[guild_id] = channel_id
-                    except (ValueError, AttributeError):
-                        self.master_channels_ai[guild_id] = None
-                else:
-                    self.master_channels_ai[guild_id] = None
-
-            # 4. Proses disabled_keys
-            for raw_key in disabled_keys:
-                key = raw_key.decode() if isinstance(raw_key, bytes) else raw_key
-                # key format: "voisa:disabled_channels:<guild_id>"
-                parts = key.split(":")
-                if len(parts) != 3:
-                    continue
-
-                try:
-                    guild_id = int(parts[2])
-                except ValueError:
-                    continue
-
-                raw_val = await self.bot.redis.get(key)
-                if raw_val:
-                    try:
-                        data_disabled = raw_val.decode("utf-8") if isinstance(raw_val, bytes) else raw_val
-                        channel_ids = {
-                            int(cid) for cid in data_disabled.split(",") if cid.strip().isdigit()
-                        }
-                        self.disabled_channels[guild_id] = channel_ids
-                    except Exception:
-                        self.disabled_channels[guild_id] = set()
-                else:
-                    self.disabled_channels[guild_id] = set()
+            # 1. Pindahkan key lama per guild ke hash (no-op setelah sekali jalan)
+            moved = await redis.migrate_legacy_keys(self)
+            if moved:
+                logger.info(f"[ ALL CHANNEL CACHE ] --------- Migrated {moved} legacy keys.")
+
+            # 2. Semua setting dalam satu pipeline HGETALL
+            masters, seconds, disabled = await redis.load_all_channels_cache(self)
+
+            # 3. Redis kosong (cold start): satu SELECT bulk lalu isi ulang hash
+            if not masters and not seconds:
+                for row in await db.get_all_channels():
+                    if row["master_text_chid"]:
+                        masters[row["guild_id"]] = int(row["master_text_chid"])
+                    if row["second_text_chid"]:
+                        seconds[row["guild_id"]] = int(row["second_text_chid"])
+                await redis.save_all_channels_cache(self, masters, seconds)
+
+            self.master_channels_ai.update(masters)
+            self.second_channels.update(seconds)
+            self.disabled_channels.update(disabled)
 
         except Exception as e:
-            print(f"Error in load_all_channel_data: {e}")
+            logger.error(f"[ ALL CHANNEL CACHE ] --------- Failed to load channel settings: {e}")
 
 async def setup(bot):
     cog = ActiveChannel(bot)
@@ -2,6 +2,7 @@
 
 import discord
 
+from typing import Union
 from discord.ext import commands
 from services import economy
 
@@ -48,6 +49,97 @@ class EconomyAdmin(commands.Cog):
                 color=discord.Color.green()
             )
         )
-        
+
+    @commands.is_owner()
+    @commands.command(name="airdrop")
+    async def airdrop(self,
+                      ctx: commands.Context,
+                      targets: commands.Greedy[Union[discord.Role, discord.VoiceChannel, discord.Member]],
+                      xp: int = None,
+                      amount: int = None):
+        """Bagi XP & vcash ke semua member role / voice channel / mention (owner only)"""
+        if not targets or xp is None or amount is None:
+            return await ctx.reply("❌ Format: `!airdrop @role|#voice|@user... xp jumlah`")
+
+        if xp < 0 or amount < 0:
+            return await ctx.reply("❌ XP dan jumlah tidak boleh negatif")
+
+        recipients = {}
+        for target in targets:
+            members = [target] if isinstance(target, discord.Member) else target.members
+            for member in members:
+                if not member.bot:
+                    recipients[member.id] = str(member)
+
+        if not recipients:
+            return await ctx.reply("Tidak ada member yang bisa menerima airdrop")
+
+        async with ctx.typing():
+            results = await economy.airdrop(
+                ctx.guild.id, list(recipients.items()), xp, amount, reason="Airdrop admin"
+            )
+
+        level_ups = sum(1 for row in results if row["new_level"] > row["old_level"])
+
+        await ctx.reply(
+            embed=discord.Embed(
+                title="🎁 Airdrop Terkirim",
+                description=(
+                    f"Berhasil membagikan `{xp:,}` xp & `{amount:,}` vcash ke `{len(results):,}` member\n"
+                    f"-# {level_ups} member naik level"
+                ),
+                color=discord.Color.green()
+            )
+        )
+
+    @commands.is_owner()
+    @commands.command(name="recomputelevels")
+    async def recompute_levels(self, ctx: commands.Context):
+        """Hitung ulang level semua member sesuai kurva saat ini (owner only)"""
+        updated = await economy.recompute_levels()
+
+        await ctx.reply(
+            embed=discord.Embed(
+                title="📈 Level Dihitung Ulang",
+                description=f"`{updated:,}` member mengalami perubahan level\n",
+                color=discord.Color.green()
+            )
+        )
+
+    @commands.is_owner()
+    @commands.command(name="cachestats")
+    async def cache_stats(self, ctx: commands.Context):
+        """Lihat hit/miss member stats cache (owner only)"""
+        stats = economy.get_cache_stats()
+
+        await ctx.reply(
+            embed=discord.Embed(
+                title="🧠 Member Stats Cache",
+                description=(
+                    f"> Hits (memory) : `{stats['hits']:,}`\n"
+                    f"> Hits (redis) : `{stats['redis_hits']:,}`\n"
+                    f"> Misses : `{stats['misses']:,}`\n"
+                    f"> Hit rate : `{stats['hit_rate']:.1%}`\n"
+                    f"> Size : `{stats['size']:,}/{stats['maxsize']:,}`"
+                ),
+                color=discord.Color.blurple()
+            )
+        )
+
+    @commands.is_owner()
+    @commands.command(name="rebuildlb")
+    async def rebuild_leaderboards(self, ctx: commands.Context):
+        """Bangun ulang leaderboard guild ini dari database (owner only)"""
+        async with ctx.typing():
+            await economy.rebuild_leaderboards(ctx.guild.id)
+
+        await ctx.reply(
+            embed=discord.Embed(
+                title="🏆 Leaderboard Dibangun Ulang",
+                description="Leaderboard guild ini sudah disinkronkan dengan database\n",
+                color=discord.Color.green()
+            )
+        )
+
 async def setup(bot):
     await bot.add_cog(EconomyAdmin(bot))
@@ -31,6 +31,8 @@ class Economy(commands.Cog):
 
         stats = await economy.get_user(guild_id, user_id, username)
         streak = await economy.get_streaks(guild_id, user_id)
+        rank, _ = await economy.get_rank(guild_id, user_id, "xp")
+        rank_text = f" | Rank #{rank}" if rank else ""
 
         if user.avatar:
             avatar_url = user.avatar.url
@@ -59,7 +61,7 @@ class Economy(commands.Cog):
         embed.set_thumbnail(url=avatar_url)
 
         embed.description = (
-            f"> Level : {stats['level']}\n"
+            f"> Level : {stats['level']}{rank_text}\n"
             f"> {bar}\n> -# {progress}/{needed} XP\n\n"
             
             f"> Stats :\n"
@@ -73,7 +75,49 @@ class Economy(commands.Cog):
 
         await ctx.send(embed=embed)
 
-        
+
+    @commands.command(name="leaderboard", aliases=["lb", "top"])
+    async def leaderboard(self, ctx: commands.Context, board: str = "xp"):
+        """Leaderboard guild: xp, balance, streak, weekly, monthly"""
+        guild_id = ctx.guild.id
+        board = board.lower()
+
+        BOARD_LABEL = {
+            "xp": ("XP", "xp"),
+            "balance": ("Balance", "vcash"),
+            "streak": ("Absen Streak", "hari"),
+            "weekly": ("Weekly Earner", "vcash"),
+            "monthly": ("Monthly Earner", "vcash"),
+        }
+
+        if board not in economy.LEADERBOARDS:
+            return await ctx.send(embed=discord.Embed(
+                description=f"Board tersedia: {', '.join(f'`{b}`' for b in economy.LEADERBOARDS)}",
+                color=discord.Color.red()
+            ))
+
+        rows = await economy.get_leaderboard(guild_id, board, 10)
+        if not rows:
+            return await ctx.send(embed=discord.Embed(description="Belum ada data leaderboard.", color=discord.Color.orange()))
+
+        title, unit = BOARD_LABEL[board]
+        lines = [
+            f"`#{idx}` <@{user_id}> — `{score:,}` {unit}"
+            for idx, (user_id, score) in enumerate(rows, start=1)
+        ]
+
+        embed = discord.Embed(
+            title=f"🏆 Leaderboard {title}",
+            description=f"{WHITELINE}\n" + "\n".join(lines),
+            color=discord.Color.gold()
+        )
+
+        rank, score = await economy.get_rank(guild_id, ctx.author.id, board)
+        if rank:
+            embed.set_footer(text=f"{ctx.author.display_name} | #{rank} • {score:,} {unit}")
+
+        await ctx.send(embed=embed)
+
     @commands.command(name="cash")
     async def get_cash_member(self, ctx: commands.Context):
         guild_id = ctx.guild.id
@@ -102,42 +146,63 @@ class Economy(commands.Cog):
 
 
     @commands.command(name="sendcash", aliases=["tf"])
-    async def transfer_vcash(self, ctx: commands.Context, target: discord.Member = None, amount: int = None):
+    async def transfer_vcash(self, ctx: commands.Context, targets: commands.Greedy[discord.Member], amount: int = None):
+        """Transfer vcash ke satu atau beberapa member: `tf @a @b @c 1000`"""
         guild_id = ctx.guild.id
         sender_id = ctx.author.id
         sender_username = str(ctx.author)
+
+        MAX_RECIPIENTS = 25
+
+        # mention yang sama cukup dihitung sekali
+        targets = list({member.id: member for member in targets}.values())
         
-        if target is None:
+        if not targets:
             return await ctx.send(embed=discord.Embed(description="Mention user yang ingin kamu transfer!", color=discord.Color.red()))
 
         if amount is None:
             return await ctx.send(embed=discord.Embed(description="Masukkan jumlah yang ingin ditransfer!", color=discord.Color.red()))
 
-        if target.bot:
+        if any(target.bot for target in targets):
             return await ctx.send(embed=discord.Embed(description="Tidak bisa transfer ke bot!", color=discord.Color.red()))
 
-        if target.id == sender_id:
+        if any(target.id == sender_id for target in targets):
             return await ctx.send(embed=discord.Embed(description="Tidak bisa transfer ke diri sendiri!", color=discord.Color.red()))
 
+        if len(targets) > MAX_RECIPIENTS:
+            return await ctx.send(embed=discord.Embed(description=f"Maksimal {MAX_RECIPIENTS} penerima sekali transfer!", color=discord.Color.red()))
+
         if amount < 1000:
             return await ctx.send(embed=discord.Embed(description=f"Minimal transfer 1000!", color=discord.Color.red()))
 
-        result = await economy.transfer_balance(
-            guild_id, sender_id, sender_username, target.id, str(target), amount
+        result = await economy.transfer_balance_many(
+            guild_id, sender_id, sender_username,
+            [(target.id, str(target)) for target in targets],
+            amount
         )
 
         if result is None:
             return await ctx.reply(embed=discord.Embed(description="Saldo tidak cukup!\n-# biaya admin 50%", color=discord.Color.red()))
 
         amount_formatted = f"{result['amount']:,}"
-        fee_formatted = f"{result['fee']:,}"
+        fee_formatted = f"{result['fee'] * result['recipients']:,}"
+        mentions = ", ".join(target.mention for target in targets)
+
+        if result["recipients"] > 1:
+            description = (
+                f"**Jumlah Dikirim:** `{amount_formatted}` vcash / orang\n"
+                f"**Total:** `{result['total']:,}` vcash\n"
+                f"-# **Berhasil transfer ke → {mentions}**"
+            )
+        else:
+            description = (
+                f"**Jumlah Dikirim:** `{amount_formatted}` vcash\n"
+                f"-# **Berhasil transfer ke → {mentions}**"
+            )
 
         embed = discord.Embed(
             title="💸 Transfer Berhasil",
-            description=(
-                f"**Jumlah Dikirim:** `{amount_formatted}` vcash\n"
-                f"-# **Berhasil transfer ke → {target.mention}**"
-            ),
+            description=description,
             color=discord.Color.green()
         )
         embed.set_footer(text=f"tax {fee_formatted} (50%)")
@@ -186,76 +251,119 @@ class Economy(commands.Cog):
         await self.paginate_user_transactions(ctx, guild_id, user_id, formatter, user_name)
 
     async def paginate_user_transactions(self, ctx, guild_id, user_id, formatter, user_name=None):
-        """Pagination untuk user transactions dengan service layer"""
+        """
+        Pagination untuk user transactions dengan service layer.
+        Halaman diambil pakai keyset (created_at, id), disimpan di cache per sesi,
+        dan halaman berikutnya di-prefetch selama halaman sekarang ditampilkan.
+        """
         
         DATA_PER_PAGE = 5
         
         left_str = "◀️"
         right_str = "▶️"
 
-        start = 0
+        page = 0
         message = None
 
-        while True:
-            results = await economy.get_user_transaction_history(guild_id, user_id, DATA_PER_PAGE, start)
-
-            if not results:
-                if start == 0:
-                    await ctx.send("Tidak ada data transaksi yang ditemukan")
+        pages = []              # cache halaman yang sudah dimuat di sesi ini
+        exhausted = False
+        load_lock = asyncio.Lock()
+        prefetch_task = None
+
+        async def load_page(index):
+            nonlocal exhausted
+            async with load_lock:
+                while len(pages) <= index and not exhausted:
+                    before = None
+                    if pages:
+                        last = pages[-1][-1]
+                        before = (last['created_at'], last['id'])
+
+                    rows = await economy.get_user_transaction_history(guild_id, user_id, DATA_PER_PAGE, before)
+                    if rows:
+                        pages.append(rows)
+                    if len(rows) < DATA_PER_PAGE:
+                        exhausted = True
+
+                return pages[index] if index < len(pages) else None
+
+        # transaksi yang masih di buffer ledger harus ikut tampil
+        await economy.flush_pending_transactions()
+
+        _, total_rows = await asyncio.gather(
+            load_page(0),
+            economy.count_user_transactions(guild_id, user_id)
+        )
+        total_pages = max(1, -(-total_rows // DATA_PER_PAGE))
+
+        try:
+            while True:
+                results = await load_page(page)
+
+                if not results:
+                    if page == 0:
+                        await ctx.send("Tidak ada data transaksi yang ditemukan")
+                    else:
+                        await ctx.send("Tidak ada data untuk halaman selanjutnya")
+                    break
+
+                # prefetch halaman berikutnya selagi user membaca halaman ini
+                if not exhausted and (prefetch_task is None or prefetch_task.done()):
+                    prefetch_task = asyncio.create_task(load_page(page + 1))
+
+                embed = discord.Embed(color=discord.Color.blue())
+                embed.description = f"{WHITELINE}"
+                embed.set_thumbnail(url=ctx.guild.icon.url if ctx.guild.icon else None)
+                embed.set_footer(text=f"{ctx.guild.name}")
+                # tampilkan username jika ada
+                title_user = f" — {user_name}" if user_name else ""
+                embed.set_author(name=f"|  {page + 1}/{total_pages}  |  Trx History{title_user}")
+
+                for idx, row in enumerate(results, start=page * DATA_PER_PAGE + 1):
+                    formatter(embed, idx, row)
+
+                if not message:
+                    message = await ctx.send(embed=embed)
+                    try:
+                        await message.add_reaction(left_str)
+                        await message.add_reaction(right_str)
+                    except Exception as e:
+                        log.info(f"[ REACTION ERROR ] ------- {e}")
+                        return
                 else:
-                    await ctx.send("Tidak ada data untuk halaman selanjutnya")
-                break
-
-            embed = discord.Embed(color=discord.Color.blue())
-            embed.description = f"{WHITELINE}"
-            embed.set_thumbnail(url=ctx.guild.icon.url if ctx.guild.icon else None)
-            embed.set_footer(text=f"{ctx.guild.name}")
-            # tampilkan username jika ada
-            title_user = f" — {user_name}" if user_name else ""
-            embed.set_author(name=f"|  {(start // DATA_PER_PAGE) + 1}  |  Trx History{title_user}")
-
-            for idx, row in enumerate(results, start=start + 1):
-                formatter(embed, idx, row)
-
-            if not message:
-                message = await ctx.send(embed=embed)
+                    await message.edit(embed=embed)
+
+                def check(reaction, user):
+                    return (
+                        reaction.message.id == message.id
+                        and user == ctx.author
+                        and str(reaction.emoji) in [left_str, right_str]
+                    )
+
                 try:
-                    await message.add_reaction(left_str)
-                    await message.add_reaction(right_str)
-                except Exception as e:
-                    log.info(f"[ REACTION ERROR ] ------- {e}")
-                    return
-            else:
-                await message.edit(embed=embed)
-
-            def check(reaction, user):
-                return (
-                    reaction.message.id == message.id
-                    and user == ctx.author
-                    and str(reaction.emoji) in [left_str, right_str]
-                )
+                    reaction, user = await self.bot.wait_for('reaction_add', timeout=60.0, check=check)
+                except asyncio.TimeoutError:
+                    try:
+                        await message.clear_reactions()
+                    except Exception:
+                        pass
+                    break
 
-            try:
-                reaction, user = await self.bot.wait_for('reaction_add', timeout=60.0, check=check)
-            except asyncio.TimeoutError:
                 try:
-                    await message.clear_reactions()
+                    try:
+                        await reaction.remove(user)
+                    except Exception:
+                        await message.remove_reaction(reaction.emoji, user)
                 except Exception:
                     pass
-                break
 
-            try:
-                try:
-                    await reaction.remove(user)
-                except Exception:
-                    await message.remove_reaction(reaction.emoji, user)
-            except Exception:
-                pass
-
-            if str(reaction.emoji) == right_str:
-                start += DATA_PER_PAGE
-            elif str(reaction.emoji) == left_str:
-                start = max(0, start - DATA_PER_PAGE)
+                if str(reaction.emoji) == right_str:
+                    page += 1
+                elif str(reaction.emoji) == left_str:
+                    page = max(0, page - 1)
+        finally:
+            if prefetch_task and not prefetch_task.done():
+                prefetch_task.cancel()
 
         
 async def setup(bot):
@@ -0,0 +1,54 @@
+# cogs/economy/inventory.py
+
+import discord
+import logging
+
+from discord.ext import commands
+from core.scheduler import scheduler
+from services.inventory import sweeper
+
+log = logging.getLogger(__name__)
+
+class InventoryMaintenance(commands.Cog):
+    JOB = "inventory:expiry_sweep"
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        await scheduler.cron(self.JOB, "*/10 * * * *", self.expiry_sweep)
+
+    def cog_unload(self):
+        scheduler.unregister(self.JOB)
+
+    async def expiry_sweep(self):
+        """Hapus item inventory yang sudah kadaluarsa"""
+        report = await sweeper.sweep()
+        if report["deleted"]:
+            log.info(
+                f"[ INVENTORY ] ------------- Expired {report['deleted']} items in {report['batches']} batches "
+                f"({report['ms']:.0f} ms), backlog {report['backlog']}"
+            )
+        if report["backlog"]:
+            log.warning(f"[ INVENTORY ] ------------- Expiry backlog: {report['backlog']} items left")
+
+    @commands.is_owner()
+    @commands.command(name="inventorysweep")
+    async def inventory_sweep(self, ctx: commands.Context):
+        """Jalankan sweeper item kadaluarsa sekarang (owner only)"""
+        async with ctx.typing():
+            report = await sweeper.sweep()
+
+        await ctx.reply(embed=discord.Embed(
+            title="🧹 Inventory Sweep",
+            description=(
+                f"> **Dihapus:** `{report['deleted']:,}` item ({report['batches']} batch)\n"
+                f"> **Backlog:** `{report['backlog']:,}` item\n"
+                f"> **Durasi:** `{report['ms']:.0f}` ms"
+            ),
+            color=discord.Color.green()
+        ))
+
+
+async def setup(bot):
+    await bot.add_cog(InventoryMaintenance(bot))
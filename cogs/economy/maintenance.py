@@ -0,0 +1,42 @@
+# cogs/economy/maintenance.py
+
+import logging
+
+from discord.ext import commands
+from config import LedgerSetting
+from core.scheduler import scheduler
+from services import transactions
+
+log = logging.getLogger(__name__)
+
+class LedgerMaintenance(commands.Cog):
+    JOB = "ledger:partition_maintenance"
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        # tiap hari jam 03:00 & 15:00 WIB, terlewat saat bot mati = langsung jalan begitu start
+        await scheduler.cron(self.JOB, "0 3,15 * * *", self.partition_maintenance)
+
+    def cog_unload(self):
+        scheduler.unregister(self.JOB)
+
+    async def partition_maintenance(self):
+        """Buat partisi voisa.transactions di depan & arsip partisi lama"""
+        try:
+            result = await transactions.run_maintenance(
+                LedgerSetting.PARTITION_MONTHS_AHEAD,
+                LedgerSetting.RETENTION_MONTHS
+            )
+            if result["created"] or result["archived"]:
+                log.info(
+                    f"[ LEDGER ] ---------------- Partitions created: {result['created']} | "
+                    f"archived: {result['archived']}"
+                )
+        except Exception as e:
+            log.error(f"[ LEDGER ] ---------------- Partition maintenance failed: {e}")
+
+
+async def setup(bot):
+    await bot.add_cog(LedgerMaintenance(bot))
@@ -1,13 +1,13 @@
 # cogs/economy/quest.py
 
-import json
+import asyncio
 import discord
 import logging
 
 from discord.ext import commands
-from utils.time import get_current_date_uptime, get_current_date
+from utils.time import get_current_date, get_current_date_uptime
 from utils.data.emot import WHITELINE
-from services import economy
+from services import economy, quest
 
 from utils.decorator.channel import check_master_channel
 from services.dailyquest import DailyQuest
@@ -19,24 +19,48 @@ class QuestCogs(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.dailyquest = DailyQuest(bot.redis)
-        
-    async def get_daily_claim_data(self, guild_id: int, user_id: int):
-        key = f"yumna:dailyclaim:{guild_id}:{user_id}"
-        data = await self.bot.redis.get(key)
-        if not data:
-            return {"last_date": None}
-        if isinstance(data, (bytes, bytearray)):
-            data = data.decode()
+
+    async def cog_unload(self):
+        # increment yang masih di-coalesce jangan sampai hilang saat reload/shutdown
         try:
-            return json.loads(data)
-        except Exception:
-            return {"last_date": None}
+            await self.dailyquest.close()
+        except Exception as e:
+            log.error(f"[ DAILYQUEST ] ------------ Final flush failed: {e}")
 
-    async def set_daily_claim_data(self, guild_id: int, user_id: int, today: str):
-        key = f"yumna:dailyclaim:{guild_id}:{user_id}"
-        data = {"last_date": today}
-        await self.bot.redis.set(key, json.dumps(data))
+    def track(self, guild_id: int, user_id: int, key: str):
+        """Catat progress quest counter; di-coalesce lalu dikirim ke Redis oleh DailyQuest"""
+        self.dailyquest.track(guild_id, user_id, key, get_current_date())
 
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if message.author.bot or not message.guild or message.guild.id != self.bot.main_guild_id:
+            return
+
+        # post di dalam thread ikut dihitung untuk channel induknya
+        channel = message.channel
+        key = quest.MESSAGE_TRIGGERS.get(channel.id) or quest.MESSAGE_TRIGGERS.get(getattr(channel, "parent_id", None))
+        if key:
+            self.track(message.guild.id, message.author.id, key)
+
+    @commands.Cog.listener()
+    async def on_thread_create(self, thread: discord.Thread):
+        if thread.guild.id != self.bot.main_guild_id or thread.owner_id is None:
+            return
+
+        key = quest.THREAD_TRIGGERS.get(thread.parent_id)
+        if key:
+            self.track(thread.guild.id, thread.owner_id, key)
+
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
+        if member.bot or member.guild.id != self.bot.main_guild_id:
+            return
+        if after.channel is None or before.channel == after.channel:
+            return
+
+        key = quest.VOICE_JOIN_TRIGGERS.get(after.channel.id)
+        if key:
+            self.track(member.guild.id, member.id, key)
 
     @commands.command(name="daily")
     async def daily(self, ctx: commands.Context):
@@ -47,46 +71,7 @@ class QuestCogs(commands.Cog):
         if guild_id != self.bot.main_guild_id:
             return
 
-        date = get_current_date()
-
-        today_dt = get_current_date_uptime()
-        try:
-            today_date = today_dt.date()
-        except Exception:
-            today_date = today_dt
-        today_str = today_date.strftime("%Y-%m-%d")
-
-        # Ambil quest dari redis
-        progress = await self.dailyquest.get_quest(guild_id, user_id, date)
-
-        # Ambil voice time dari economy
-        voice_time = await economy.get_voice_time(guild_id, user_id, today_date)  # detik
-        count_people = await economy.get_voice_session(guild_id, user_id)
-
-        # Target quest harian
-        QUEST_TARGETS = {
-            "open_discuss": 1,
-            "post_on_ᴠᴏɪꜱᴀ-ꜰᴇᴇᴅꜱ": 1,
-            "post_on_ᴠᴏɪꜱᴀ-ᴍᴇᴍᴇ": 1,
-            "post_on_ᴠᴏɪꜱᴀ-ꜰᴏᴏᴅꜱ": 1,
-            "join_anotherworld": 1,
-            "create_voice_room": 1,
-            "voice_2_hours": 7200,  # 2 jam = 7200 detik
-            "voice_with_5_people": 5,
-
-        }
-
-        # Mapping field → tampilan nama (bisa channel mention atau teks biasa)
-        FIELD_DISPLAY = {
-            "open_discuss": "Open a discuss on <#1371795699330449419>",
-            "post_on_ᴠᴏɪꜱᴀ-ꜰᴇᴇᴅꜱ": f"Post something on <#1371794854442438717>",
-            "post_on_ᴠᴏɪꜱᴀ-ᴍᴇᴍᴇ": f"Post something on <#1371794817453129800>",
-            "post_on_ᴠᴏɪꜱᴀ-ꜰᴏᴏᴅꜱ": f"Post something on <#1415981198710276167>",
-            "join_anotherworld": f"Join <#1378722381199183895>",
-            "create_voice_room": "Create a voice room",
-            "voice_2_hours": "⏱ Stay 2 hours in voice",
-            "voice_with_5_people": "voice with 5 people",
-        }
+        status = await quest.evaluate(self.dailyquest, guild_id, user_id, get_current_date_uptime())
 
         embed = discord.Embed(
             title="📜 Daily Quest",
@@ -94,31 +79,15 @@ class QuestCogs(commands.Cog):
             color=discord.Color.green()
         )
 
-        for field, target in QUEST_TARGETS.items():
-            if field == "voice_2_hours":
-                current = voice_time
-                display_value = f"{current // 60}m/{target // 60}m"
-                
-            elif field == "voice_with_5_people":
-                current = count_people
-                display_value = f"{current}/{target}"
-
-            else:
-                current = progress.get(field, 0)
-                display_value = f"{current}/{target}"
-
-            done = "`completed`" if current >= target else "`incomplete`"
-
-            # pakai display name kalau ada di mapping, fallback ke field.title()
-            field_name = FIELD_DISPLAY.get(field, field.replace("_", " ").title())
-
+        for item in quest.QUESTS:
+            done = "`completed`" if status.is_done(item) else "`incomplete`"
             embed.add_field(
-                name=f"**{field_name}**",
-                value=f"> `{display_value}` | {done} ",
+                name=f"**{item.display}**",
+                value=f"> `{item.format(status.current(item))}` | {done} ",
                 inline=False
             )
-            
-            embed.set_footer(text=f"{ctx.author.display_name} | dailyquest")
+
+        embed.set_footer(text=f"{ctx.author.display_name} | dailyquest")
 
         await ctx.send(embed=embed)
     
@@ -134,11 +103,21 @@ class QuestCogs(commands.Cog):
             return
 
         today_date = get_current_date_uptime()
-        today_str = today_date.strftime("%Y-%m-%d")
 
-        # cek apakah sudah claim
-        claim_data = await self.get_daily_claim_data(guild_id, user_id)
-        if claim_data.get("last_date") == today_str:
+        # claim (SET NX atomik) dan evaluasi quest berjalan bersamaan,
+        # claim dilepas lagi kalau evaluasi gagal supaya member bisa mencoba ulang
+        claimed, status = await asyncio.gather(
+            quest.claim_daily(guild_id, user_id, today_date),
+            quest.evaluate(self.dailyquest, guild_id, user_id, today_date),
+            return_exceptions=True,
+        )
+        if isinstance(claimed, BaseException):
+            raise claimed
+        if isinstance(status, BaseException):
+            if claimed:
+                await quest.release_daily(guild_id, user_id, today_date)
+            raise status
+        if not claimed:
             return await ctx.reply(
                 embed=discord.Embed(
                     description="❌ Kamu sudah claim daily hari ini!",
@@ -146,56 +125,11 @@ class QuestCogs(commands.Cog):
                 )
             )
 
-        # Ambil progress quest
-        date = get_current_date()
-        progress = await self.dailyquest.get_quest(guild_id, user_id, date)
-        voice_time = await economy.get_voice_time(guild_id, user_id, today_date)
-        count_people = await economy.get_voice_session(guild_id, user_id)
-
-        # Target quest harian
-        QUEST_TARGETS = {
-            "open_discuss": 1,
-            "post_on_ᴠᴏɪꜱᴀ-ꜰᴇᴇᴅꜱ": 1,
-            "post_on_ᴠᴏɪꜱᴀ-ᴍᴇᴍᴇ": 1,
-            "post_on_ᴠᴏɪꜱᴀ-ꜰᴏᴏᴅꜱ": 1,
-            "join_anotherworld": 1,
-            "create_voice_room": 1,
-            "voice_2_hours": 7200,
-            "voice_with_5_people": 5,
-        }
-
-        # Reward per quest
-        QUEST_REWARDS = {
-            "open_discuss": (200, 700),
-            "post_on_ᴠᴏɪꜱᴀ-ꜰᴇᴇᴅꜱ": (200, 500),
-            "post_on_ᴠᴏɪꜱᴀ-ᴍᴇᴍᴇ": (200, 500),
-            "post_on_ᴠᴏɪꜱᴀ-ꜰᴏᴏᴅꜱ": (200, 500),
-            "join_anotherworld": (250, 500),
-            "create_voice_room": (250, 500),
-            "voice_2_hours": (1500, 1200),
-            "voice_with_5_people": (1500, 1500),
-        }
-
-        total_xp = 0
-        total_balance = 0
-        completed_count = 0
-        total_quests = len(QUEST_TARGETS)
-
-        for field, target in QUEST_TARGETS.items():
-            if field == "voice_2_hours":
-                current = voice_time
-            elif field == "voice_with_5_people":
-                current = count_people
-            else:
-                current = progress.get(field, 0)
-
-            if current >= target:
-                xp_gain, bal_gain = QUEST_REWARDS.get(field, (0, 0))
-                total_xp += xp_gain
-                total_balance += bal_gain
-                completed_count += 1
+        total_xp = status.total_xp
+        total_balance = status.total_balance
 
         if total_xp == 0 and total_balance == 0:
+            await quest.release_daily(guild_id, user_id, today_date)
             return await ctx.reply(
                 embed=discord.Embed(
                     description="⚠️ Kamu belum menyelesaikan quest apapun hari ini.",
@@ -203,13 +137,14 @@ class QuestCogs(commands.Cog):
                 )
             )
 
-        # update economy
-        result = await economy.earn_xp_balance(
-            guild_id, user_id, username, total_xp, total_balance, "daily quest", "credit"
-        )
-
-        # simpan daily claim
-        await self.set_daily_claim_data(guild_id, user_id, today_str)
+        # update economy, claim dilepas lagi kalau pembayaran gagal
+        try:
+            result = await economy.earn_xp_balance(
+                guild_id, user_id, username, total_xp, total_balance, "daily quest", "credit"
+            )
+        except Exception:
+            await quest.release_daily(guild_id, user_id, today_date)
+            raise
 
         # buat embed hasil
         embed = discord.Embed(
@@ -218,7 +153,7 @@ class QuestCogs(commands.Cog):
                 f"-# Selamat, kamu mendapatkan total :\n"
                 f"- XP: `{total_xp}`\n"
                 f"- Balance: `{total_balance}` vcash\n\n"
-                f"✅ Tugas diselesaikan: `{completed_count}/{total_quests}`"
+                f"✅ Tugas diselesaikan: `{len(status.completed)}/{status.total}`"
             ),
             color=discord.Color.green()
         )
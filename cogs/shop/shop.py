@@ -1,33 +1,41 @@
+import time
 import discord
-from discord.ext import commands, tasks
-from datetime import datetime, time
+import logging
+
+from discord.ext import commands
+from datetime import datetime
+from core.scheduler import scheduler
 from utils.time_utils import JAKARTA_TZ
 
+log = logging.getLogger(__name__)
+
 class ShopCog(commands.Cog):
+    JOB = "shop:daily_refresh"
+
     def __init__(self, bot, shop_service):
         self.bot = bot
         self.shop_service = shop_service
-        self.daily_refresh.start()
+
+    async def cog_load(self):
+        await scheduler.cron(self.JOB, "0 7 * * *", self.daily_refresh)
 
     def cog_unload(self):
-        self.daily_refresh.cancel()
+        scheduler.unregister(self.JOB)
 
-    @tasks.loop(minutes=1)
     async def daily_refresh(self):
         """Auto refresh shop at 7AM GMT+7."""
-        now = datetime.now(JAKARTA_TZ)
-        if now.hour == 7 and now.minute == 0:
-            await self.shop_service.generate_daily_shop()
-            print(f"[SHOP] Refreshed for {now.date()}")
-
-    @daily_refresh.before_loop
-    async def before_refresh(self):
         await self.bot.wait_until_ready()
+        started = time.perf_counter()
+        guilds = await self.shop_service.generate_daily_shop([guild.id for guild in self.bot.guilds])
+        log.info(
+            f"[ SHOP ] ------------------ Refreshed {guilds} guilds for {datetime.now(JAKARTA_TZ).date()} "
+            f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
 
     #view shop
     @commands.command(name="shop")
     async def shop(self, ctx):
-        items = await self.shop_service.get_today_shop()
+        items = await self.shop_service.get_today_shop(ctx.guild.id)
         if not items:
             return await ctx.send("🛒 The shop is empty right now.")
 
@@ -58,10 +66,12 @@ class ShopCog(commands.Cog):
 
 
 async def setup(bot):
-    from repositories.shop_repo import ShopRepository
-    from services.shop_service import ShopService
+    from core import db
+    from repositories.shop import ShopRepository
+    from services import economy
+    from services.shop import ShopService
 
-    repo = ShopRepository(bot.db)
-    service = ShopService(repo, bot.economy)
+    repo = ShopRepository(db)
+    service = ShopService(repo, economy)
 
     await bot.add_cog(ShopCog(bot, service))
@@ -0,0 +1,91 @@
+# cogs/voice/copresence.py
+
+import asyncio
+import discord
+import logging
+
+from discord.ext import commands
+from services.copresence import tracker, top_voice_partners
+
+log = logging.getLogger(__name__)
+
+class CoPresence(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        asyncio.create_task(self.delayed_seed())
+
+    async def delayed_seed(self):
+        await self.bot.wait_until_ready()
+        await tracker.seed(self.bot.guilds)
+        log.info(f"[ COPRESENCE ] ------------ Seeded {len(tracker.channels)} active voice channels")
+
+    def cog_unload(self):
+        tracker.reset()
+
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
+        if member.bot:
+            return
+
+        before_id = before.channel.id if before.channel else None
+        after_id = after.channel.id if after.channel else None
+        if before_id == after_id:
+            # mute/deafen/stream, bukan pindah channel
+            return
+
+        guild_id = member.guild.id
+        try:
+            if before_id:
+                tracker.leave(guild_id, before_id, member.id)
+            if after_id:
+                await tracker.join(guild_id, after_id, member.id)
+        except Exception as e:
+            log.error(f"[ COPRESENCE ] ------------ Failed to track voice update: {e}")
+
+    @commands.command(name="voicefriends", aliases=["vf"])
+    async def voice_friends(self, ctx: commands.Context, days: int = 28):
+        """Siapa yang paling lama satu voice denganmu (default 4 minggu terakhir)"""
+        days = max(1, min(days, 90))
+
+        async with ctx.typing():
+            partners = await top_voice_partners(ctx.guild.id, ctx.author.id, days)
+
+        if not partners:
+            return await ctx.reply(embed=discord.Embed(
+                description=f"Belum ada data voice bareng dalam {days} hari terakhir.",
+                color=discord.Color.orange()
+            ))
+
+        lines = [
+            f"`#{idx}` <@{other_id}> — `{int(seconds // 3600)}j {int(seconds % 3600 // 60)}m`"
+            for idx, (other_id, seconds) in enumerate(partners, start=1)
+        ]
+
+        embed = discord.Embed(
+            title="🎧 Voice Friends",
+            description="\n".join(lines),
+            color=discord.Color.blurple()
+        )
+        embed.set_footer(text=f"{ctx.author.display_name} | {days} hari terakhir")
+
+        await ctx.reply(embed=embed)
+
+    @commands.is_owner()
+    @commands.command(name="copresencebackfill")
+    async def backfill(self, ctx: commands.Context, date: str = None):
+        """Isi ulang co-presence dari voice_sessions (owner only), format tanggal YYYY-MM-DD"""
+        async with ctx.typing():
+            total = await tracker.backfill(ctx.guild.id, date)
+
+        await ctx.reply(
+            embed=discord.Embed(
+                description=f"Co-presence di-backfill untuk `{total:,}` member",
+                color=discord.Color.green()
+            )
+        )
+
+
+async def setup(bot):
+    await bot.add_cog(CoPresence(bot))
@@ -0,0 +1,75 @@
+# cogs/voice/voicecount.py
+
+import asyncio
+import discord
+import logging
+
+from discord.ext import commands, tasks
+from config import VoiceSetting
+from services.voicecount import tracker
+
+log = logging.getLogger(__name__)
+
+class Voicecount(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @property
+    def voice_start_times(self):
+        # dibaca run.YumnaBot.change_status untuk jumlah orang di voice
+        return tracker.voice_start_times
+
+    async def cog_load(self):
+        self.flush_voice_counts.change_interval(seconds=VoiceSetting.FLUSH_INTERVAL)
+        self.flush_voice_counts.start()
+        asyncio.create_task(self.delayed_seed())
+
+    async def cog_unload(self):
+        self.flush_voice_counts.cancel()
+        try:
+            # sesi yang masih berjalan dihitung sampai detik ini lalu di-flush
+            flushed = await tracker.flush()
+            log.info(f"[ VOICECOUNT ] ------------- Final flush: {flushed} rows")
+        except Exception as e:
+            log.error(f"[ VOICECOUNT ] ------------- Final flush failed: {e}")
+        tracker.reset()
+
+    async def delayed_seed(self):
+        await self.bot.wait_until_ready()
+        for guild in self.bot.guilds:
+            for channel in guild.voice_channels + guild.stage_channels:
+                if self._is_counted(guild, channel):
+                    for member in channel.members:
+                        if not member.bot:
+                            tracker.start(guild.id, member.id)
+        log.info(f"[ VOICECOUNT ] ------------- Tracking {len(tracker.voice_start_times)} members in voice")
+
+    @staticmethod
+    def _is_counted(guild: discord.Guild, channel) -> bool:
+        return channel is not None and channel != guild.afk_channel
+
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member: discord.Member, before: discord.VoiceState, after: discord.VoiceState):
+        if member.bot:
+            return
+
+        guild = member.guild
+        was_counted = self._is_counted(guild, before.channel)
+        is_counted = self._is_counted(guild, after.channel)
+
+        # pindah antar channel yang sama-sama dihitung = sesi tetap berjalan
+        if was_counted and not is_counted:
+            tracker.stop(guild.id, member.id)
+        elif is_counted and not was_counted:
+            tracker.start(guild.id, member.id)
+
+    @tasks.loop(seconds=60)
+    async def flush_voice_counts(self):
+        try:
+            await tracker.flush()
+        except Exception as e:
+            log.error(f"[ VOICECOUNT ] ------------- Flush failed: {e}")
+
+
+async def setup(bot):
+    await bot.add_cog(Voicecount(bot))
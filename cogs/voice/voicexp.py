@@ -0,0 +1,70 @@
+# cogs/voice/voicexp.py
+
+import discord
+import logging
+
+from discord.ext import commands, tasks
+from config import VoiceSetting
+from services.voicexp import ticker
+
+log = logging.getLogger(__name__)
+
+class VoiceXp(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        self.voice_xp_tick.change_interval(seconds=VoiceSetting.XP_TICK_INTERVAL)
+        self.voice_xp_tick.start()
+
+    async def cog_unload(self):
+        self.voice_xp_tick.cancel()
+        try:
+            # jendela yang sedang berjalan langsung dibukukan
+            booked = await ticker.book()
+            log.info(f"[ VOICE XP ] -------------- Final booking: {booked} ledger rows")
+        except Exception as e:
+            log.error(f"[ VOICE XP ] -------------- Final booking failed: {e}")
+
+    @tasks.loop(seconds=60)
+    async def voice_xp_tick(self):
+        try:
+            credited = await ticker.tick(self.bot.guilds, VoiceSetting.XP_PER_TICK, VoiceSetting.VCASH_PER_TICK)
+        except Exception as e:
+            log.error(f"[ VOICE XP ] -------------- Tick failed: {e}")
+            return
+
+        last_ms = ticker.stats()["last_ms"]
+        if last_ms > VoiceSetting.XP_TICK_INTERVAL * 1000 / 2:
+            log.warning(f"[ VOICE XP ] -------------- Slow tick: {last_ms:.0f} ms for {credited} members")
+        else:
+            log.debug(f"[ VOICE XP ] -------------- Credited {credited} members in {last_ms:.0f} ms")
+
+    @voice_xp_tick.before_loop
+    async def before_voice_xp_tick(self):
+        await self.bot.wait_until_ready()
+        await ticker.restore()
+
+    @commands.is_owner()
+    @commands.command(name="voicexpstats")
+    async def voice_xp_stats(self, ctx: commands.Context):
+        """Metrik ticker XP voice (owner only)"""
+        stats = ticker.stats()
+        embed = discord.Embed(
+            title="🎙️ Voice XP Ticker",
+            description=(
+                f"> **Ticks:** `{stats['ticks']:,}` (gagal `{stats['failures']:,}`)\n"
+                f"> **Dikredit tick terakhir:** `{stats['last_credited']:,}` member\n"
+                f"> **Total dikredit:** `{stats['total_credited']:,}`\n"
+                f"> **Belum dibukukan:** `{stats['unbooked']:,}` member\n"
+                f"> **Durasi:** last `{stats['last_ms']:.1f}` ms · avg `{stats['avg_ms']:.1f}` ms · "
+                f"p95 `{stats['p95_ms']:.1f}` ms · max `{stats['max_ms']:.1f}` ms"
+            ),
+            color=discord.Color.blurple()
+        )
+        embed.set_footer(text=f"{VoiceSetting.XP_PER_TICK} XP + {VoiceSetting.VCASH_PER_TICK} vcash / {VoiceSetting.XP_TICK_INTERVAL}s")
+        await ctx.reply(embed=embed)
+
+
+async def setup(bot):
+    await bot.add_cog(VoiceXp(bot))
@@ -1,4 +1,5 @@
 import os
+import socket
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -7,7 +8,7 @@ class BotSetting:
     #------------- BOT SETTINGS
     #----------------------------------------------------------------------------------
     PREFIX = ["v!","V!","yum ","Yum "]  
-    COGS_FOLDER = ['economy', 'channel']
+    COGS_FOLDER = ['economy', 'channel', 'voice', 'shop']
     
     # TOKEN
     TOKEN = os.getenv("TOKEN")
@@ -52,6 +53,48 @@ class DBconf:
     REDIS_PASSWORD = os.getenv("REDIS_PASSWORD")
     REDIS_URL = os.getenv("REDIS_URL")
 
+class VoiceSetting:
+    #------------- VOICE ACTIVITY
+    #----------------------------------------------------------------------------------
+    # voice channel yang tidak dihitung untuk co-presence quest (id dipisah koma)
+    EXCLUDED_CHANNELS = {
+        int(cid) for cid in os.getenv(
+            "VOICE_EXCLUDED_CHANNELS",
+            "1371783709073735711,1374916800747147325,1378722381199183895"
+        ).split(",") if cid.strip()
+    }
+    # interval (detik) flush voice time ke voisa.voice_counts
+    FLUSH_INTERVAL = int(os.getenv("VOICE_FLUSH_INTERVAL", 60))
+
+    #------------- VOICE XP TICKER
+    # setiap interval semua member yang eligible di voice dapat XP & vcash (plus bonus level)
+    XP_TICK_INTERVAL = int(os.getenv("VOICE_XP_TICK_INTERVAL", 60))
+    XP_PER_TICK = int(os.getenv("VOICE_XP_PER_TICK", 10))
+    VCASH_PER_TICK = int(os.getenv("VOICE_VCASH_PER_TICK", 5))
+    # kredit per tick diringkas jadi satu row ledger per member setiap interval ini (detik)
+    XP_LEDGER_INTERVAL = int(os.getenv("VOICE_XP_LEDGER_INTERVAL", 900))
+    # kebijakan pengecualian
+    XP_EXCLUDE_AFK = os.getenv("VOICE_XP_EXCLUDE_AFK", "true").lower() == "true"
+    XP_EXCLUDE_MUTED = os.getenv("VOICE_XP_EXCLUDE_MUTED", "true").lower() == "true"
+    XP_EXCLUDE_DEAFENED = os.getenv("VOICE_XP_EXCLUDE_DEAFENED", "true").lower() == "true"
+    # minimal member manusia di channel (2 = tidak dapat XP kalau sendirian)
+    XP_MIN_MEMBERS = int(os.getenv("VOICE_XP_MIN_MEMBERS", 2))
+    # default sama dengan channel yang dikecualikan dari co-presence
+    XP_EXCLUDED_CHANNELS = {
+        int(cid) for cid in os.getenv("VOICE_XP_EXCLUDED_CHANNELS", "").split(",") if cid.strip()
+    } or EXCLUDED_CHANNELS
+
+class LedgerSetting:
+    #------------- LEDGER (voisa.transactions)
+    #----------------------------------------------------------------------------------
+    # jumlah partisi bulanan yang disiapkan di depan
+    PARTITION_MONTHS_AHEAD = int(os.getenv("LEDGER_PARTITION_MONTHS_AHEAD", 3))
+    # partisi yang lebih tua dari ini diringkas ke balance_snapshots lalu diarsip
+    RETENTION_MONTHS = int(os.getenv("LEDGER_RETENTION_MONTHS", 12))
+    # id journal write-behind di Redis, wajib beda untuk setiap proses bot yang hidup bersamaan.
+    # Tidak harus stabil antar deploy: journal yang lease-nya habis diambil alih proses yang start berikutnya.
+    JOURNAL_ID = os.getenv("LEDGER_JOURNAL_ID") or socket.gethostname()
+
 class LavaConf:
     #------------- LAVALINK CREDENTIAL
     #----------------------------------------------------------------------------------
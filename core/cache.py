@@ -0,0 +1,148 @@
+import json
+import logging
+
+from cachetools import TTLCache
+from core import redis
+
+log = logging.getLogger(__name__)
+
+
+# Entry Redis berupa hash {data, ver}. invalidate() menaikkan `ver`, dan loader hanya boleh
+# menulis kalau `ver` masih sama dengan saat ia mulai membaca, jadi proses lain yang kalah
+# balapan dengan invalidate tidak bisa menaruh data basi.
+# KEYS[1] = key; ARGV[1] = ver saat dibaca, ARGV[2] = data JSON, ARGV[3] = ttl.
+STORE_SCRIPT = """
+if (redis.call('HGET', KEYS[1], 'ver') or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('HSET', KEYS[1], 'data', ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+
+class MemberStatsCache:
+    """
+    Cache read-through untuk stats member (balance, level, xp, streak).
+    Tier 1: LRU+TTL in-process, tier 2: Redis (dibagi antar proses).
+    Repository economy wajib memanggil invalidate() setiap kali memutasi member.
+    """
+
+    KEY = "voisa:member_stats:{guild_id}:{user_id}:h"
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 60, redis_ttl: int = 300):
+        self._local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._redis_ttl = redis_ttl
+        # key yang sedang di-load: [generasi, jumlah load berjalan]. Hanya hidup selama ada load,
+        # supaya load yang kalah balapan dengan invalidate tidak menyimpan data basi ke memory.
+        self._loading: dict[tuple[int, int], list[int]] = {}
+
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+
+    def _key(self, guild_id: int, user_id: int) -> str:
+        return self.KEY.format(guild_id=guild_id, user_id=user_id)
+
+    async def get(self, guild_id: int, user_id: int, loader) -> dict:
+        """Ambil stats; `loader(guild_id, user_id)` hanya dipanggil saat miss di kedua tier"""
+        key = (guild_id, user_id)
+
+        data = self._local.get(key)
+        if data is not None:
+            self.hits += 1
+            return data
+
+        state = self._loading.setdefault(key, [0, 0])
+        state[1] += 1
+        generation = state[0]
+
+        try:
+            try:
+                raw, version = await redis.redis.hmget(self._key(guild_id, user_id), "data", "ver")
+            except Exception as e:
+                log.error(f"[ MEMBER CACHE ] ---------- Redis get failed: {e}")
+                raw, version = None, None
+
+            if raw:
+                self.redis_hits += 1
+                data = json.loads(raw)
+            else:
+                self.misses += 1
+                row = await loader(guild_id, user_id)
+                if not row:
+                    # member belum ada: jangan di-cache, row bisa dibuat kapan saja lewat upsert
+                    return {}
+                data = dict(row)
+                if state[0] == generation:
+                    try:
+                        await redis.redis.eval(
+                            STORE_SCRIPT, 1, self._key(guild_id, user_id),
+                            version or 0, json.dumps(data), self._redis_ttl
+                        )
+                    except Exception as e:
+                        log.error(f"[ MEMBER CACHE ] ---------- Redis set failed: {e}")
+
+            if state[0] == generation:
+                self._local[key] = data
+            return data
+        finally:
+            state[1] -= 1
+            if not state[1]:
+                self._loading.pop(key, None)
+
+    async def invalidate(self, guild_id: int, user_id: int):
+        await self.invalidate_many(guild_id, [user_id])
+
+    async def invalidate_many(self, guild_id: int, user_ids):
+        pipe = redis.redis.pipeline(transaction=False)
+        touched = False
+        for user_id in user_ids:
+            key = (guild_id, user_id)
+            state = self._loading.get(key)
+            if state is not None:
+                state[0] += 1
+            self._local.pop(key, None)
+
+            redis_key = self._key(guild_id, user_id)
+            pipe.hdel(redis_key, "data")
+            pipe.hincrby(redis_key, "ver", 1)
+            pipe.expire(redis_key, self._redis_ttl)
+            touched = True
+        if not touched:
+            return
+        try:
+            await pipe.execute()
+        except Exception as e:
+            log.error(f"[ MEMBER CACHE ] ---------- Redis delete failed: {e}")
+
+    async def clear(self):
+        """Kosongkan kedua tier (mis. setelah recompute level massal)"""
+        for state in self._loading.values():
+            state[0] += 1
+        self._local.clear()
+        try:
+            batch = []
+            async for raw_key in redis.redis.scan_iter(match="voisa:member_stats:*", count=500):
+                batch.append(raw_key)
+                if len(batch) >= 500:
+                    await redis.redis.delete(*batch)
+                    batch = []
+            if batch:
+                await redis.redis.delete(*batch)
+        except Exception as e:
+            log.error(f"[ MEMBER CACHE ] ---------- Redis clear failed: {e}")
+
+    def stats(self) -> dict:
+        total = self.hits + self.redis_hits + self.misses
+        return {
+            "hits": self.hits,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.redis_hits) / total if total else 0.0,
+            "size": len(self._local),
+            "maxsize": self._local.maxsize,
+        }
+
+
+member_stats = MemberStatsCache()
@@ -0,0 +1,349 @@
+import asyncio
+import asyncpg
+import json
+import logging
+import itertools
+import time
+
+from datetime import datetime, timezone
+from config import LedgerSetting
+from core import db, redis
+
+log = logging.getLogger(__name__)
+
+# Journal di Redis: field = urutan lokal, value = row JSON.
+# Dipakai hash (bukan list) supaya row yang sudah di-COPY bisa dihapus persis
+# dengan satu HDEL walaupun beberapa coroutine append bersamaan.
+# Satu journal per proses (LEDGER_JOURNAL_ID), dijaga lease yang diperpanjang selama proses hidup.
+# Journal yang lease-nya habis (proses mati / container di-deploy ulang dengan hostname baru)
+# diambil alih proses lain saat start.
+JOURNAL_PREFIX = "voisa:ledger:pending:"
+JOURNAL_KEY = f"{JOURNAL_PREFIX}{LedgerSetting.JOURNAL_ID}"
+LEASE_PREFIX = "voisa:ledger:lease:"
+LEASE_KEY = f"{LEASE_PREFIX}{LedgerSetting.JOURNAL_ID}"
+LEASE_TTL = 120         # detik, journal tanpa lease selama ini dianggap yatim
+# row yang sendirian pun gagal di-COPY (data rusak) dipindah ke sini untuk dicek manual
+QUARANTINE_KEY = f"voisa:ledger:quarantine:{LedgerSetting.JOURNAL_ID}"
+# journal global versi lama, diambil alih sekali oleh proses yang start pertama
+LEGACY_JOURNAL_KEY = "voisa:ledger:pending"
+
+# pindahkan isi hash KEYS[1] ke KEYS[2] per 500 field (batas argumen unpack Lua)
+MOVE_SCRIPT = """
+local data = redis.call('HGETALL', KEYS[1])
+for i = 1, #data, 1000 do
+    redis.call('HSET', KEYS[2], unpack(data, i, math.min(i + 999, #data)))
+end
+redis.call('DEL', KEYS[1])
+return #data / 2
+"""
+
+# ambil/perpanjang lease journal sendiri; gagal kalau sedang dipegang proses lain (reclaim)
+LEASE_SCRIPT = """
+local holder = redis.call('GET', KEYS[1])
+if holder and holder ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return 1
+"""
+
+COLUMNS = (
+    "guild_id", "user_id", "username", "amount",
+    "balance_before", "balance_after", "reason", "tx_type", "created_at",
+)
+
+FLUSH_SIZE = 500        # flush langsung kalau buffer sudah sebanyak ini
+FLUSH_INTERVAL = 2.0    # detik, flush berkala walau buffer belum penuh
+MAX_BATCH = 5000        # maksimal row per COPY
+
+# hanya error karena isi row yang dicari dengan belah dua, selain itu batch dicoba utuh lagi nanti
+_DATA_ERRORS = (asyncpg.exceptions.DataError, asyncpg.exceptions.IntegrityConstraintViolationError)
+
+_buffer: list[tuple[str, tuple]] = []
+_seq = itertools.count()
+_boot = int(time.time() * 1000)
+_flush_lock: asyncio.Lock | None = None
+_wakeup: asyncio.Event | None = None
+_task: asyncio.Task | None = None
+_lease_renewed = 0.0
+
+
+def _record(guild_id, user_id, username, amount, balance_before, balance_after, reason, tx_type, created_at=None) -> tuple:
+    return (
+        guild_id, user_id, username, amount,
+        balance_before, balance_after, reason, tx_type,
+        created_at or datetime.now(timezone.utc),
+    )
+
+
+def _encode(record: tuple) -> str:
+    data = dict(zip(COLUMNS, record))
+    data["created_at"] = data["created_at"].isoformat()
+    return json.dumps(data)
+
+
+def _decode(raw) -> tuple:
+    data = json.loads(raw.decode() if isinstance(raw, (bytes, bytearray)) else raw)
+    data["created_at"] = datetime.fromisoformat(data["created_at"])
+    return tuple(data[col] for col in COLUMNS)
+
+
+async def _renew_lease() -> bool:
+    global _lease_renewed
+    held = await redis.redis.eval(LEASE_SCRIPT, 1, LEASE_KEY, LedgerSetting.JOURNAL_ID, LEASE_TTL)
+    if held:
+        _lease_renewed = time.monotonic()
+    return bool(held)
+
+
+async def _acquire_lease():
+    """Tunggu sebentar kalau journal lama kita sedang dipindah proses lain"""
+    for _ in range(10):
+        if await _renew_lease():
+            return
+        await asyncio.sleep(0.5)
+    log.error(f"[ LEDGER ] ---------------- Journal lease {LEASE_KEY} held by another process")
+
+
+async def _reclaim_orphans():
+    """Pindahkan journal proses lain yang lease-nya sudah habis ke journal sendiri"""
+    async for key in redis.redis.scan_iter(match=f"{JOURNAL_PREFIX}*"):
+        key = key.decode() if isinstance(key, (bytes, bytearray)) else key
+        if key == JOURNAL_KEY:
+            continue
+
+        lease = f"{LEASE_PREFIX}{key[len(JOURNAL_PREFIX):]}"
+        # SET NX: pemilik yang masih hidup atau proses lain yang sedang reclaim menang
+        if not await redis.redis.set(lease, f"reclaim:{LedgerSetting.JOURNAL_ID}", nx=True, ex=LEASE_TTL):
+            continue
+        try:
+            moved = await redis.redis.eval(MOVE_SCRIPT, 2, key, JOURNAL_KEY)
+            if moved:
+                log.info(f"[ LEDGER ] ---------------- Reclaimed {moved} rows from orphaned journal {key}")
+        finally:
+            await redis.redis.delete(lease)
+
+
+async def start():
+    """Pulihkan row yang belum sempat di-flush lalu jalankan flusher di background"""
+    global _flush_lock, _wakeup, _task
+    _flush_lock = asyncio.Lock()
+    _wakeup = asyncio.Event()
+
+    try:
+        await _acquire_lease()
+        await _reclaim_orphans()
+    except Exception as e:
+        log.error(f"[ LEDGER ] ---------------- Failed to reclaim orphaned journals: {e}")
+
+    try:
+        moved = await redis.redis.eval(MOVE_SCRIPT, 2, LEGACY_JOURNAL_KEY, JOURNAL_KEY)
+        if moved:
+            log.info(f"[ LEDGER ] ---------------- Took over {moved} rows from legacy journal")
+    except Exception as e:
+        log.error(f"[ LEDGER ] ---------------- Failed to migrate legacy journal: {e}")
+
+    try:
+        pending = await redis.redis.hgetall(JOURNAL_KEY)
+    except Exception as e:
+        log.error(f"[ LEDGER ] ---------------- Failed to read journal: {e}")
+        pending = {}
+
+    if pending:
+        recovered = []
+        for field, raw in pending.items():
+            field = field.decode() if isinstance(field, (bytes, bytearray)) else field
+            try:
+                recovered.append((field, _decode(raw)))
+            except Exception as e:
+                log.error(f"[ LEDGER ] ---------------- Dropping corrupt journal row {field}: {e}")
+        recovered.sort(key=lambda entry: entry[1][-1])
+        _buffer[:0] = recovered
+        log.info(f"[ LEDGER ] ---------------- Recovered {len(recovered)} pending rows")
+
+    _task = asyncio.create_task(_flush_loop())
+
+
+async def close():
+    """Hentikan flusher dan flush sisa buffer (panggil sebelum pool DB ditutup)"""
+    global _task
+    if _task:
+        _task.cancel()
+        try:
+            await _task
+        except asyncio.CancelledError:
+            pass
+        _task = None
+    await flush()
+
+    # journal yang masih tersisa boleh langsung diambil alih proses lain
+    try:
+        await redis.redis.delete(LEASE_KEY)
+    except Exception as e:
+        log.error(f"[ LEDGER ] ---------------- Failed to release journal lease: {e}")
+
+
+async def append(guild_id: int,
+                 user_id: int,
+                 username: str,
+                 amount: int,
+                 balance_before: int,
+                 balance_after: int,
+                 reason: str,
+                 tx_type: str):
+    """Buffer satu row ledger (write-behind), durable lewat journal Redis"""
+    record = _record(guild_id, user_id, username, amount, balance_before, balance_after, reason, tx_type)
+    field = f"{_boot}:{next(_seq):012d}"
+
+    # journal dulu baru buffer: flush yang jalan selama await ini tidak boleh
+    # meng-HDEL field yang belum ditulis (akan jadi journal yatim & replay ganda)
+    try:
+        await redis.redis.hset(JOURNAL_KEY, field, _encode(record))
+    except Exception as e:
+        log.error(f"[ LEDGER ] ---------------- Journal write failed, row kept in memory only: {e}")
+    _buffer.append((field, record))
+
+    if _wakeup and len(_buffer) >= FLUSH_SIZE:
+        _wakeup.set()
+
+
+async def append_many(rows):
+    """
+    Buffer banyak row sekaligus dengan satu tulis journal.
+    `rows` = iterable tuple (guild_id, user_id, username, amount, balance_before, balance_after, reason, tx_type).
+    """
+    entries = [(f"{_boot}:{next(_seq):012d}", _record(*row)) for row in rows]
+    if not entries:
+        return
+
+    try:
+        await redis.redis.hset(JOURNAL_KEY, mapping={field: _encode(record) for field, record in entries})
+    except Exception as e:
+        log.error(f"[ LEDGER ] ---------------- Journal write failed, rows kept in memory only: {e}")
+    _buffer.extend(entries)
+
+    if _wakeup and len(_buffer) >= FLUSH_SIZE:
+        _wakeup.set()
+
+
+async def insert(guild_id: int,
+                 user_id: int,
+                 username: str,
+                 amount: int,
+                 balance_before: int,
+                 balance_after: int,
+                 reason: str,
+                 tx_type: str,
+                 conn=None):
+    """Mode sinkron: langsung INSERT dan kembalikan row berisi id"""
+    executor = conn or db
+    return await executor.fetchrow(
+        """
+        INSERT INTO voisa.transactions
+        (guild_id, user_id, username, amount, balance_before, balance_after, reason, tx_type)
+        VALUES ($1,$2,$3,$4,$5,$6,$7,$8)
+        RETURNING id
+        """,
+        guild_id, user_id, username, amount, balance_before, balance_after, reason, tx_type
+    )
+
+
+async def _copy(conn, batch):
+    await conn.copy_records_to_table(
+        "transactions",
+        schema_name="voisa",
+        columns=COLUMNS,
+        records=[record for _, record in batch],
+    )
+
+
+async def _copy_isolating(conn, batch, done: list, bad: list):
+    """
+    COPY batch; kalau ditolak karena isi row (DataError / constraint), belah dua sampai row
+    yang rusak ketemu. Potongan yang tertulis masuk `done`, row yang gagal sendirian masuk `bad`.
+    Error lain (koneksi, permission, tabel/partisi hilang) dilempar dan journal tetap utuh.
+    """
+    try:
+        await _copy(conn, batch)
+        done.extend(batch)
+        return
+    except _DATA_ERRORS as e:
+        if len(batch) == 1:
+            log.error(f"[ LEDGER ] ---------------- Quarantining row {batch[0][0]}: {e}")
+            bad.extend(batch)
+            return
+
+    middle = len(batch) // 2
+    await _copy_isolating(conn, batch[:middle], done, bad)
+    await _copy_isolating(conn, batch[middle:], done, bad)
+
+
+async def _flush_batch(batch) -> int:
+    done, bad = [], []
+    try:
+        async with db.db_connection() as conn:
+            await _copy_isolating(conn, batch, done, bad)
+    finally:
+        # row yang sudah tertulis atau dikarantina lepas dari buffer & journal,
+        # sisanya (kalau koneksi putus di tengah) dicoba lagi di flush berikutnya
+        settled = {field for field, _ in done + bad}
+        if settled:
+            _buffer[:] = [entry for entry in _buffer if entry[0] not in settled]
+            try:
+                pipe = redis.redis.pipeline(transaction=True)
+                if bad:
+                    pipe.hset(QUARANTINE_KEY, mapping={field: _encode(record) for field, record in bad})
+                pipe.hdel(JOURNAL_KEY, *settled)
+                await pipe.execute()
+            except Exception as e:
+                log.error(f"[ LEDGER ] ---------------- Failed to trim journal: {e}")
+
+    return len(done)
+
+
+async def flush() -> int:
+    """COPY buffer ke voisa.transactions per MAX_BATCH row, return jumlah row yang tertulis"""
+    if not _buffer:
+        return 0
+
+    lock = _flush_lock or asyncio.Lock()
+    async with lock:
+        # cukup row yang sudah ada saat flush mulai, append baru menunggu flush berikutnya
+        remaining = len(_buffer)
+        written = 0
+
+        while remaining > 0 and _buffer:
+            batch = _buffer[:min(remaining, MAX_BATCH)]
+            written += await _flush_batch(batch)
+            remaining -= len(batch)
+
+        log.debug(f"[ LEDGER ] ---------------- Flushed {written} rows")
+        return written
+
+
+async def _flush_loop():
+    while True:
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=FLUSH_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        _wakeup.clear()
+
+        if time.monotonic() - _lease_renewed > LEASE_TTL / 4:
+            try:
+                if not await _renew_lease():
+                    log.error(f"[ LEDGER ] ---------------- Journal lease {LEASE_KEY} taken over by another process")
+            except Exception as e:
+                log.error(f"[ LEDGER ] ---------------- Failed to renew journal lease: {e}")
+
+        try:
+            await flush()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # row tetap di buffer & journal, dicoba lagi di tick berikutnya
+            log.error(f"[ LEDGER ] ---------------- Flush failed: {e}")
+
+
+def pending() -> int:
+    return len(_buffer)
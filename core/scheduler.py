@@ -0,0 +1,321 @@
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import time
+import uuid
+
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from core import redis
+
+log = logging.getLogger(__name__)
+
+JAKARTA = ZoneInfo("Asia/Jakarta")
+
+
+def _parse_field(field: str, low: int, high: int) -> frozenset[int]:
+    """Satu field cron: `*`, `5`, `1,15`, `9-17`, `*/10`, `0-30/5`"""
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, raw_step = part.split("/", 1)
+            step = int(raw_step)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(v) for v in part.split("-", 1))
+        else:
+            start = end = int(part)
+        if start < low or end > high or start > end or step < 1:
+            raise ValueError(f"cron field out of range: {field!r}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+
+class CronSpec:
+    """
+    Ekspresi cron 5 field (menit jam tanggal bulan hari), dievaluasi di timezone `tz`.
+    Hari: 0 = Minggu. Kalau tanggal dan hari sama-sama dibatasi, cukup salah satu cocok (seperti cron).
+    """
+
+    def __init__(self, expr: str, tz: ZoneInfo = JAKARTA):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron expression needs 5 fields: {expr!r}")
+        self.expr = expr
+        self.tz = tz
+        self.minutes = _parse_field(fields[0], 0, 59)
+        self.hours = _parse_field(fields[1], 0, 23)
+        self.days = _parse_field(fields[2], 1, 31)
+        self.months = _parse_field(fields[3], 1, 12)
+        self.weekdays = frozenset(d % 7 for d in _parse_field(fields[4], 0, 7))
+        self._any_day = fields[2] == "*"
+        self._any_weekday = fields[4] == "*"
+
+    def _day_matches(self, t: datetime) -> bool:
+        day_ok = t.day in self.days
+        weekday_ok = (t.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, after: datetime) -> datetime:
+        """Waktu jalan berikutnya setelah `after` (lompat per bulan/hari/jam, bukan per menit)"""
+        t = after.astimezone(self.tz).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 5)
+
+        while t < limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+                continue
+            if not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+                continue
+            if t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+                continue
+            return t
+
+        raise ValueError(f"cron expression never fires: {self.expr!r}")
+
+
+class Scheduler:
+    """
+    Penjadwal job berbasis min-heap: satu task tidur sampai deadline terdekat.
+    - cron(): job berulang. Waktu jalan berikutnya baru disimpan di Redis setelah job selesai,
+      jadi run yang terlewat atau gagal (bot mati saat jadwal/di tengah job) dijalankan sekali
+      begitu didaftarkan lagi (catch-up). Setiap run diambil lewat lease SET NX per (job, jadwal),
+      jadi kalau beberapa proses mendaftarkan cron yang sama, hanya satu yang menjalankannya.
+    - at(): job sekali jalan dengan payload JSON, disimpan di Redis sampai selesai.
+      Handler-nya didaftarkan dengan handler(); job yang handler-nya belum ada tetap menunggu.
+      Eksekusinya juga lewat lease, proses lain menunggu sampai job selesai atau gagal.
+    """
+
+    CRON_KEY = "voisa:scheduler:cron"
+    ONCE_KEY = "voisa:scheduler:once"
+    LEASE_KEY = "voisa:scheduler:lease:{name}:{run}"
+    LEASE_TTL = 3600
+    RETRY_DELAY = 300
+
+    # majukan jadwal tersimpan setelah run selesai, tidak pernah mundur
+    # (run lama yang selesai belakangan tidak menimpa jadwal yang lebih baru)
+    COMPLETE_SCRIPT = """
+    local current = redis.call('HGET', KEYS[1], ARGV[1])
+    if not current or tonumber(current) < tonumber(ARGV[2]) then
+        redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+    end
+    """
+
+    def __init__(self):
+        self._heap: list[tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        # name -> (spec, func, deadline aktif, jadwal asli run itu); entry heap dengan deadline lain dianggap basi
+        self._cron: dict[str, tuple[CronSpec, object, float, float]] = {}
+        self._handlers: dict[str, object] = {}
+        self._once: dict[str, dict] = {}
+        self._running: set[asyncio.Task] = set()
+        self._wakeup: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    ### ------ Lifecycle
+    ### ---------------------------------------------------
+    async def start(self):
+        """Muat job sekali jalan dari Redis lalu jalankan loop"""
+        self._wakeup = asyncio.Event()
+
+        try:
+            stored = await redis.redis.hgetall(self.ONCE_KEY)
+        except Exception as e:
+            log.error(f"[ SCHEDULER ] ------------- Failed to load one-shot jobs: {e}")
+            stored = {}
+
+        for job_id, raw in stored.items():
+            job_id = job_id.decode() if isinstance(job_id, (bytes, bytearray)) else job_id
+            try:
+                self._once[job_id] = json.loads(raw)
+            except Exception as e:
+                log.error(f"[ SCHEDULER ] ------------- Dropping corrupt job {job_id}: {e}")
+                continue
+            self._push(self._once[job_id]["at"], f"once:{job_id}")
+
+        if stored:
+            log.info(f"[ SCHEDULER ] ------------- Restored {len(self._once)} one-shot jobs")
+
+        self._task = asyncio.create_task(self._loop())
+
+    async def close(self):
+        """Hentikan loop dan tunggu job yang sedang jalan selesai"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+    ### ------ Registration
+    ### ---------------------------------------------------
+    async def cron(self, name: str, expr: str, func, tz: ZoneInfo = JAKARTA):
+        """Daftarkan job berulang `func()`; aman dipanggil ulang saat cog di-reload"""
+        spec = CronSpec(expr, tz)
+
+        now = time.time()
+        due = spec.next_after(datetime.now(tz)).timestamp()
+        try:
+            stored = await redis.redis.hget(self.CRON_KEY, name)
+        except Exception as e:
+            log.error(f"[ SCHEDULER ] ------------- Failed to read {name}: {e}")
+            stored = None
+
+        run = due
+        if stored is not None and float(stored) <= now:
+            # lease tetap memakai jadwal yang terlewat, jadi catch-up tidak ganda antar proses
+            log.info(f"[ SCHEDULER ] ------------- Catching up missed run of {name}")
+            due, run = now, float(stored)
+        else:
+            await self._store_cron(name, due)
+
+        self._cron[name] = (spec, func, due, run)
+        self._push(due, f"cron:{name}")
+
+    def handler(self, name: str, func):
+        """Daftarkan handler job sekali jalan `func(payload)`"""
+        self._handlers[name] = func
+        self._notify()
+
+    async def at(self, when: datetime | float, handler: str, payload=None, job_id: str | None = None) -> str:
+        """Jadwalkan `handler(payload)` sekali pada `when`; return id job (bisa untuk cancel_at)"""
+        job_id = job_id or uuid.uuid4().hex
+        ts = when.timestamp() if isinstance(when, datetime) else float(when)
+        job = {"handler": handler, "at": ts, "payload": payload}
+
+        await redis.redis.hset(self.ONCE_KEY, job_id, json.dumps(job))
+        self._once[job_id] = job
+        self._push(ts, f"once:{job_id}")
+        return job_id
+
+    async def cancel_at(self, job_id: str):
+        # entry heap dibiarkan, dilewati saat pop karena sudah tidak ada di _once
+        self._once.pop(job_id, None)
+        await redis.redis.hdel(self.ONCE_KEY, job_id)
+
+    def unregister(self, name: str):
+        """Lepas job cron dari proses ini; jadwal di Redis tetap ada untuk catch-up"""
+        self._cron.pop(name, None)
+
+    ### ------ Loop
+    ### ---------------------------------------------------
+    def _push(self, when: float, key: str):
+        heapq.heappush(self._heap, (when, next(self._seq), key))
+        self._notify()
+
+    def _notify(self):
+        if self._wakeup:
+            self._wakeup.set()
+
+    async def _store_cron(self, name: str, when: float):
+        try:
+            await redis.redis.hset(self.CRON_KEY, name, when)
+        except Exception as e:
+            log.error(f"[ SCHEDULER ] ------------- Failed to persist {name}: {e}")
+
+    async def _loop(self):
+        while True:
+            self._wakeup.clear()
+            delay = self._heap[0][0] - time.time() if self._heap else None
+
+            if delay is None or delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            when, _, key = heapq.heappop(self._heap)
+            kind, name = key.split(":", 1)
+
+            if kind == "cron":
+                entry = self._cron.get(name)
+                if entry is None or entry[2] != when:
+                    continue
+                spec, func, _, run = entry
+                # jadwal berikutnya langsung masuk heap, job lambat tidak menggeser jadwal;
+                # Redis baru dimajukan setelah job selesai
+                next_run = spec.next_after(datetime.now(spec.tz)).timestamp()
+                self._cron[name] = (spec, func, next_run, next_run)
+                self._push(next_run, key)
+                self._spawn(name, self._run_cron(name, run, next_run, func))
+            else:
+                job = self._once.get(name)
+                if job is None or job["at"] != when:
+                    continue
+                func = self._handlers.get(job["handler"])
+                if func is None:
+                    # handler belum didaftarkan (cog belum load), cek lagi nanti
+                    job["at"] = time.time() + 60
+                    self._push(job["at"], key)
+                    continue
+                self._spawn(f"{job['handler']}:{name}", self._run_once(name, func, job["payload"]))
+
+    def _spawn(self, label: str, coro):
+        task = asyncio.create_task(self._guard(label, coro))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _guard(self, label: str, coro):
+        started = time.perf_counter()
+        try:
+            await coro
+            log.debug(f"[ SCHEDULER ] ------------- {label} done in {time.perf_counter() - started:.2f}s")
+        except Exception as e:
+            log.error(f"[ SCHEDULER ] ------------- Job {label} failed: {e}")
+
+    async def _run_cron(self, name: str, run: float, next_run: float, func):
+        lease = self.LEASE_KEY.format(name=name, run=int(run))
+        if not await redis.redis.set(lease, 1, nx=True, ex=self.LEASE_TTL):
+            log.debug(f"[ SCHEDULER ] ------------- {name} run {int(run)} taken by another process")
+            return
+
+        try:
+            await func()
+        except Exception:
+            # jadwal di Redis tidak dimajukan, run ini diulang saat didaftarkan lagi
+            await redis.redis.delete(lease)
+            raise
+        await redis.redis.eval(self.COMPLETE_SCRIPT, 1, self.CRON_KEY, name, next_run)
+
+    async def _run_once(self, job_id: str, func, payload):
+        # job sekali jalan juga dibaca semua proses dari ONCE_KEY, yang dapat lease yang menjalankan
+        lease = self.LEASE_KEY.format(name="once", run=job_id)
+        if not await redis.redis.set(lease, 1, nx=True, ex=self.RETRY_DELAY):
+            if await redis.redis.hexists(self.ONCE_KEY, job_id):
+                job = self._once.get(job_id)
+                if job is not None:
+                    job["at"] = time.time() + self.RETRY_DELAY
+                    self._push(job["at"], f"once:{job_id}")
+            else:
+                self._once.pop(job_id, None)
+            return
+
+        try:
+            await func(payload)
+        except Exception:
+            # tetap tersimpan di Redis, dicoba lagi beberapa menit kemudian
+            job = self._once.get(job_id)
+            if job is not None:
+                job["at"] = time.time() + self.RETRY_DELAY
+                self._push(job["at"], f"once:{job_id}")
+            raise
+        self._once.pop(job_id, None)
+        await redis.redis.hdel(self.ONCE_KEY, job_id)
+
+
+scheduler = Scheduler()
@@ -0,0 +1,38 @@
+-- migrations/001_level_from_xp.sql
+-- Kurva level di sisi Postgres, harus identik dengan utils/helper/economy.py
+-- supaya mutasi economy bisa menghitung ulang level dalam satu statement.
+
+CREATE OR REPLACE FUNCTION voisa.xp_for_level(
+    lvl integer,
+    base_xp integer DEFAULT 5000,
+    pw double precision DEFAULT 1.5
+) RETURNS bigint
+LANGUAGE sql IMMUTABLE PARALLEL SAFE AS $$
+    SELECT floor(base_xp * power(lvl::double precision, pw))::bigint
+$$;
+
+CREATE OR REPLACE FUNCTION voisa.level_from_xp(
+    xp bigint,
+    base_xp integer DEFAULT 5000,
+    pw double precision DEFAULT 1.5
+) RETURNS integer
+LANGUAGE plpgsql IMMUTABLE PARALLEL SAFE AS $$
+DECLARE
+    lvl integer;
+BEGIN
+    IF xp < base_xp THEN
+        RETURN 0;
+    END IF;
+
+    -- estimasi lewat invers kurva, lalu koreksi pembulatan float
+    lvl := floor(power(xp::double precision / base_xp, 1.0 / pw))::integer;
+    WHILE lvl > 0 AND xp < voisa.xp_for_level(lvl, base_xp, pw) LOOP
+        lvl := lvl - 1;
+    END LOOP;
+    WHILE xp >= voisa.xp_for_level(lvl + 1, base_xp, pw) LOOP
+        lvl := lvl + 1;
+    END LOOP;
+
+    RETURN lvl;
+END;
+$$;
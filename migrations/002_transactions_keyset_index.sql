@@ -0,0 +1,6 @@
+-- migrations/002_transactions_keyset_index.sql
+-- Index untuk keyset pagination history transaksi:
+-- WHERE guild_id = ? AND user_id = ? AND (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS transactions_member_keyset_idx
+    ON voisa.transactions (guild_id, user_id, created_at DESC, id DESC);
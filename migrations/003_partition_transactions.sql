@@ -0,0 +1,76 @@
+-- migrations/003_partition_transactions.sql
+-- Ubah voisa.transactions menjadi tabel partisi RANGE(created_at) bulanan.
+-- Data lama tidak disalin: tabel lama di-attach utuh sebagai partisi
+-- (MINVALUE .. awal bulan depan) dan nanti ikut diarsip oleh job maintenance.
+-- Partisi bulan-bulan berikutnya dibuat oleh repositories.transactions.ensure_partitions.
+
+BEGIN;
+
+ALTER TABLE voisa.transactions RENAME TO transactions_legacy;
+
+UPDATE voisa.transactions_legacy SET created_at = NOW() WHERE created_at IS NULL;
+ALTER TABLE voisa.transactions_legacy ALTER COLUMN created_at SET NOT NULL;
+
+-- partisi tidak boleh punya primary key sendiri yang berbeda dari parent, dan nama
+-- transactions_pkey dibutuhkan tabel baru: ganti PK (id) tabel lama dengan (id, created_at)
+DO $$
+DECLARE
+    pk text;
+BEGIN
+    SELECT conname INTO pk
+    FROM pg_constraint
+    WHERE conrelid = 'voisa.transactions_legacy'::regclass AND contype = 'p';
+    IF pk IS NOT NULL THEN
+        EXECUTE format('ALTER TABLE voisa.transactions_legacy DROP CONSTRAINT %I', pk);
+    END IF;
+END;
+$$;
+ALTER TABLE voisa.transactions_legacy
+    ADD CONSTRAINT transactions_legacy_pkey PRIMARY KEY (id, created_at);
+
+CREATE TABLE voisa.transactions (
+    LIKE voisa.transactions_legacy INCLUDING DEFAULTS INCLUDING CONSTRAINTS
+) PARTITION BY RANGE (created_at);
+
+ALTER TABLE voisa.transactions ALTER COLUMN created_at SET NOT NULL;
+ALTER TABLE voisa.transactions ALTER COLUMN created_at SET DEFAULT NOW();
+ALTER TABLE voisa.transactions ADD PRIMARY KEY (id, created_at);
+
+-- sequence id tetap dipakai tabel baru, jangan ikut terhapus bersama tabel legacy
+DO $$
+DECLARE
+    seq text := pg_get_serial_sequence('voisa.transactions_legacy', 'id');
+BEGIN
+    IF seq IS NOT NULL THEN
+        EXECUTE format('ALTER SEQUENCE %s OWNED BY voisa.transactions.id', seq);
+    END IF;
+END;
+$$;
+
+DROP INDEX IF EXISTS voisa.transactions_member_keyset_idx;
+CREATE INDEX transactions_member_keyset_idx
+    ON voisa.transactions (guild_id, user_id, created_at DESC, id DESC);
+
+ALTER TABLE voisa.transactions
+    ATTACH PARTITION voisa.transactions_legacy
+    FOR VALUES FROM (MINVALUE)
+    TO ((date_trunc('month', NOW() AT TIME ZONE 'UTC') + INTERVAL '1 month') AT TIME ZONE 'UTC');
+
+-- jaring pengaman kalau job maintenance telat membuat partisi
+CREATE TABLE voisa.transactions_default PARTITION OF voisa.transactions DEFAULT;
+
+-- ringkasan per user untuk partisi yang sudah diarsip
+CREATE TABLE IF NOT EXISTS voisa.balance_snapshots (
+    guild_id      bigint      NOT NULL,
+    user_id       bigint      NOT NULL,
+    period_end    timestamptz NOT NULL,
+    last_balance  bigint,
+    total_credit  bigint      NOT NULL DEFAULT 0,
+    total_debit   bigint      NOT NULL DEFAULT 0,
+    tx_count      integer     NOT NULL DEFAULT 0,
+    PRIMARY KEY (guild_id, user_id, period_end)
+);
+
+CREATE SCHEMA IF NOT EXISTS voisa_archive;
+
+COMMIT;
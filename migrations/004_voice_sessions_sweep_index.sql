@@ -0,0 +1,6 @@
+-- migrations/004_voice_sessions_sweep_index.sql
+-- Urutan baca sweep-line co-presence: (guild_id, channel_id, join_time)
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS voice_sessions_sweep_idx
+    ON voisa.voice_sessions (guild_id, channel_id, join_time)
+    INCLUDE (user_id, leave_time);
@@ -0,0 +1,5 @@
+-- migrations/005_voice_counts_upsert.sql
+-- Target ON CONFLICT untuk bulk upsert voice time dari cog Voicecount
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS voice_counts_member_day_uidx
+    ON voisa.voice_counts (guild_id, member_id, count_date);
@@ -0,0 +1,5 @@
+-- migrations/006_members_absen_upsert.sql
+-- Target ON CONFLICT untuk upsert absen satu statement (AbsenRepository.upsert_absen)
+
+CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS members_absen_member_uidx
+    ON voisa.members_absen (guild_id, user_id);
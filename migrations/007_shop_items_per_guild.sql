@@ -0,0 +1,27 @@
+-- migrations/007_shop_items_per_guild.sql
+-- Shop harian per guild. Kode lama menulis kolom `day` tapi membaca `date`;
+-- kolom yang dipakai sekarang `day`, `date` di-rename kalau masih ada.
+
+DO $$
+BEGIN
+    IF EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = 'voisa' AND table_name = 'shop_items' AND column_name = 'date'
+    ) AND NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = 'voisa' AND table_name = 'shop_items' AND column_name = 'day'
+    ) THEN
+        ALTER TABLE voisa.shop_items RENAME COLUMN date TO day;
+    END IF;
+END
+$$;
+
+ALTER TABLE voisa.shop_items ADD COLUMN IF NOT EXISTS guild_id bigint;
+
+-- katalog lama (global) tidak punya guild, diganti saat refresh 07:00 berikutnya
+DELETE FROM voisa.shop_items WHERE guild_id IS NULL;
+
+ALTER TABLE voisa.shop_items ALTER COLUMN guild_id SET NOT NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS shop_items_guild_day_idx
+    ON voisa.shop_items (guild_id, day, id);
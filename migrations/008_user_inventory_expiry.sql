@@ -0,0 +1,11 @@
+-- migrations/008_user_inventory_expiry.sql
+-- Sweeper item kadaluarsa membaca urut expires_at (partial, item permanen tidak ikut)
+-- dan lookup efek aktif per member cukup index-only scan.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS user_inventory_expires_idx
+    ON voisa.user_inventory (expires_at)
+    WHERE expires_at IS NOT NULL;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS user_inventory_effects_idx
+    ON voisa.user_inventory (guild_id, user_id, effect_type)
+    INCLUDE (id, value, expires_at);
@@ -3,11 +3,45 @@
 from datetime import date, datetime, timedelta
 from typing import Optional, Dict, Any, List
 from core import db
+from repositories import economy
+from utils.helper.economy import BASE_XP, LEVEL_POWER
 import logging
 
 log = logging.getLogger(__name__)
 
 
+# Template CTE absen; placeholder diisi nomor parameter pemanggil
+# ({guild}, {user}, {today}) dan `{gate}` = syarat tambahan sebelum absen boleh tercatat.
+# `absen_prev` membaca longest_streak sebelum update untuk menentukan rekor baru.
+UPSERT_ABSEN_CTE = """
+    absen_prev AS (
+        SELECT longest_streak
+        FROM voisa.members_absen
+        WHERE guild_id = {guild} AND user_id = {user}
+    ),
+    absen AS (
+        INSERT INTO voisa.members_absen AS a
+            (guild_id, user_id, current_streak, longest_streak, total_absen, last_absen)
+        SELECT {guild}, {user}, 1, 1, 1, {today}
+        WHERE {gate}
+        ON CONFLICT (guild_id, user_id) DO UPDATE SET
+            current_streak = CASE WHEN a.last_absen = {today}::date - 1 THEN a.current_streak + 1 ELSE 1 END,
+            longest_streak = GREATEST(
+                a.longest_streak,
+                CASE WHEN a.last_absen = {today}::date - 1 THEN a.current_streak + 1 ELSE 1 END
+            ),
+            total_absen = a.total_absen + 1,
+            last_absen = {today}
+        WHERE a.last_absen IS DISTINCT FROM {today}
+        RETURNING a.current_streak,
+                  a.longest_streak,
+                  a.total_absen,
+                  a.last_absen,
+                  a.current_streak > COALESCE((SELECT longest_streak FROM absen_prev), 0) AS is_new_record
+    )
+"""
+
+
 class AbsenRepository:
     """Repository untuk manage absen data"""
     
@@ -45,47 +79,83 @@ class AbsenRepository:
         return row is not None
     
     @staticmethod
-    async def insert_absen(
-        guild_id: int, 
-        user_id: int, 
-        today: date
-    ) -> Dict[str, Any]:
+    async def upsert_absen(guild_id: int, user_id: int, today: date) -> Optional[Dict[str, Any]]:
+        """
+        Absen dalam satu statement: lanjut/reset streak, longest streak, dan total.
+        Return None kalau sudah absen hari ini (WHERE ON CONFLICT tidak meloloskan row).
+        """
         row = await db.fetchrow(
-            """
-            INSERT INTO voisa.members_absen 
-                (guild_id, user_id, current_streak, longest_streak, total_absen, last_absen)
-            VALUES ($1, $2, 1, 1, 1, $3)
-            RETURNING 
-                guild_id, user_id, current_streak, longest_streak, 
-                total_absen, last_absen
-            """,
+            "WITH "
+            + UPSERT_ABSEN_CTE.format(guild="$1", user="$2", today="$3::date", gate="TRUE")
+            + "SELECT current_streak, longest_streak, total_absen, last_absen, is_new_record FROM absen",
             guild_id, user_id, today
         )
-        
-        return dict(row)
-    
+
+        return dict(row) if row else None
+
     @staticmethod
-    async def update_absen(
+    async def absen_with_reward(
         guild_id: int,
         user_id: int,
+        username: str,
         today: date,
-        new_streak: int,
-        new_longest: int
+        unflushed_voice: int,
+        min_voice: int,
+        xp_gain: int,
+        balance_gain: int,
+        reason: str = "daily check-in"
     ) -> Dict[str, Any]:
+        """
+        Validasi voice, streak, dan hadiah dalam satu statement (satu round trip).
+        Absen hanya tercatat kalau voice cukup, dan CTE `input` jalur kredit bersama
+        (economy.CREDIT_CTES) baru berisi member ini kalau absen tercatat.
+        Selalu return satu row: kolom absen/hadiah None kalau voice kurang atau sudah absen.
+        """
+        # $1-$7 parameter tetap CREDIT_CTES, parameter absen mulai $8
         row = await db.fetchrow(
             """
-            UPDATE voisa.members_absen
-            SET 
-                current_streak = $3,
-                longest_streak = $4,
-                total_absen = total_absen + 1,
-                last_absen = $5
-            WHERE guild_id = $1 AND user_id = $2
-            RETURNING 
-                guild_id, user_id, current_streak, longest_streak, 
-                total_absen, last_absen
+            WITH voice AS (
+                SELECT COALESCE(SUM(total_time), 0) + $11 AS total_time
+                FROM voisa.voice_counts
+                WHERE guild_id = $1 AND member_id = $8 AND count_date = $10
+            ),
+            """
+            + UPSERT_ABSEN_CTE.format(
+                guild="$1", user="$8", today="$10::date",
+                gate="(SELECT total_time FROM voice) >= $12"
+            )
+            + """,
+            input AS (
+                SELECT $8::bigint AS user_id, $9::text AS username FROM absen
+            ),
+            """
+            + economy.CREDIT_CTES
+            + """
+            SELECT v.total_time,
+                   a.current_streak, a.longest_streak, a.total_absen, a.last_absen, a.is_new_record,
+                   c.user_id, c.xp, c.balance,
+                   c.balance - c.balance_before AS amount,
+                   c.old_level, c.new_level, l.id AS tx_id
+            FROM voice v
+            LEFT JOIN absen a ON TRUE
+            LEFT JOIN credited c ON TRUE
+            LEFT JOIN ledger l ON l.user_id = c.user_id
             """,
-            guild_id, user_id, new_streak, new_longest, today
+            guild_id, xp_gain, balance_gain, reason, "credit", BASE_XP, LEVEL_POWER,
+            user_id, username, today, unflushed_voice, min_voice
         )
-        
-        return dict(row)
\ No newline at end of file
+        result = dict(row)
+
+        if result["current_streak"] is not None and result["tx_id"] is None:
+            # member baru yang dibuat transaksi lain di saat bersamaan dilewati CTE,
+            # absen sudah tercatat jadi hadiahnya dibayar terpisah
+            credited = await economy.credit_many(
+                db, guild_id, {user_id: username}, xp_gain, balance_gain, reason, "credit"
+            )
+            result.update({key: credited[0][key] for key in (
+                "user_id", "xp", "balance", "amount", "old_level", "new_level", "tx_id"
+            )})
+
+        if result["tx_id"] is not None:
+            await economy.after_credit(guild_id, [result], "credit")
+        return result
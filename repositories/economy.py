@@ -1,5 +1,7 @@
-from core import db
-from utils.helper.economy import get_level_from_xp
+from core import db, ledger
+from core.cache import member_stats
+from repositories import leaderboard
+from utils.helper.economy import BASE_XP, LEVEL_POWER
 
 ### ------ Fetcher 
 ### ---------------------------------------------------
@@ -33,18 +35,194 @@ async def get_streaks(guild_id: int, user_id: int):
     )
 
 @staticmethod
-async def get_user_transactions(guild_id: int, user_id: int, limit: int = 5, offset: int = 0):
-    """Ambil transaction history untuk user tertentu"""
+async def get_member_stats(guild_id: int, user_id: int):
+    """Loader untuk member_stats cache: semua stats ringan dalam satu query"""
+    return await db.fetchrow(
+        """
+        SELECT balance, level, xp, current_streak, longest_streak
+        FROM voisa.members
+        WHERE guild_id = $1 AND user_id = $2
+        """,
+        guild_id, user_id
+    )
+
+@staticmethod
+async def get_user_transactions(guild_id: int, user_id: int, limit: int = 5, before: tuple | None = None):
+    """
+    Ambil transaction history untuk user tertentu (keyset pagination).
+    `before` = (created_at, id) dari row terakhir halaman sebelumnya, None untuk halaman pertama.
+    """
+    if before is None:
+        query = (
+            "SELECT id, username, amount, balance_before, balance_after, reason, tx_type, created_at "
+            "FROM voisa.transactions "
+            "WHERE guild_id = $1 AND user_id = $2 "
+            "ORDER BY created_at DESC, id DESC LIMIT $3;"
+        )
+        return await db.fetch(query, guild_id, user_id, limit)
+
     query = (
         "SELECT id, username, amount, balance_before, balance_after, reason, tx_type, created_at "
         "FROM voisa.transactions "
-        "WHERE guild_id = $1 AND user_id = $2 "
-        "ORDER BY created_at DESC LIMIT $3 OFFSET $4;"
+        "WHERE guild_id = $1 AND user_id = $2 AND (created_at, id) < ($4, $5) "
+        "ORDER BY created_at DESC, id DESC LIMIT $3;"
     )
-    return await db.fetch(query, guild_id, user_id, limit, offset)
+    return await db.fetch(query, guild_id, user_id, limit, before[0], before[1])
+
+@staticmethod
+async def count_user_transactions(guild_id: int, user_id: int) -> int:
+    return await db.fetchval(
+        "SELECT COUNT(*) FROM voisa.transactions WHERE guild_id = $1 AND user_id = $2",
+        guild_id, user_id
+    ) or 0
 
 ### ------ Earner 
 ### ---------------------------------------------------
+
+# CTE bersama untuk kredit XP + vcash (dengan bonus level maks 10%) + satu row ledger per member,
+# satu statement untuk member lama dan baru. Pemanggil wajib mendefinisikan CTE `input(user_id, username)`.
+# - `old` mengunci & membaca row lama lebih dulu, `updated` meng-UPDATE dari situ, jadi
+#   balance_before / old_level adalah nilai asli (row yang sudah diubah statement yang sama
+#   tidak bisa dikunci lagi, karena itu tidak dipakai INSERT ... ON CONFLICT DO UPDATE).
+# - `inserted` membuat member baru langsung dengan nilai yang sudah dikredit (sebelumnya 25000, level 0).
+#   Member yang dibuat transaksi lain di saat bersamaan dilewati (DO NOTHING) dan tidak muncul di hasil;
+#   credit_many mengulang statement untuk mereka.
+# Parameter tetap: $1 guild_id, $2 xp_gain, $3 balance_gain, $4 reason, $5 tx_type,
+# $6 base_xp, $7 power; parameter tambahan pemanggil mulai dari $8.
+CREDIT_CTES = """
+    old AS (
+        SELECT m.user_id, m.level, m.balance
+        FROM voisa.members m
+        JOIN input i ON i.user_id = m.user_id
+        WHERE m.guild_id = $1
+        ORDER BY m.user_id
+        FOR UPDATE OF m
+    ),
+    updated AS (
+        UPDATE voisa.members AS m SET
+            xp = m.xp + $2,
+            balance = m.balance + $3 + ($3 * LEAST(m.level, 10)) / 100,
+            level = voisa.level_from_xp(m.xp + $2, $6, $7),
+            last_active = NOW(),
+            username = i.username
+        FROM old
+        JOIN input i ON i.user_id = old.user_id
+        WHERE m.guild_id = $1 AND m.user_id = old.user_id
+        RETURNING m.user_id,
+                  m.username,
+                  m.xp,
+                  m.balance,
+                  old.balance AS balance_before,
+                  old.level AS old_level,
+                  m.level AS new_level
+    ),
+    inserted AS (
+        INSERT INTO voisa.members AS m
+            (guild_id, user_id, username, balance, xp, level, last_active)
+        SELECT $1, i.user_id, i.username, 25000 + $3, $2, voisa.level_from_xp($2, $6, $7), NOW()
+        FROM input i
+        WHERE NOT EXISTS (SELECT 1 FROM old WHERE old.user_id = i.user_id)
+        ORDER BY i.user_id
+        ON CONFLICT (guild_id, user_id) DO NOTHING
+        RETURNING m.user_id,
+                  m.username,
+                  m.xp,
+                  m.balance,
+                  25000::bigint AS balance_before,
+                  0 AS old_level,
+                  m.level AS new_level
+    ),
+    credited AS (
+        SELECT * FROM updated
+        UNION ALL
+        SELECT * FROM inserted
+    ),
+    ledger AS (
+        INSERT INTO voisa.transactions
+            (guild_id, user_id, username, amount, balance_before, balance_after, reason, tx_type)
+        SELECT $1, user_id, username, balance - balance_before, balance_before, balance, $4, $5
+        FROM credited
+        RETURNING id, user_id
+    )
+"""
+
+CREDIT_RESULT = """
+    SELECT c.user_id,
+           c.username,
+           c.xp,
+           c.balance,
+           c.balance_before,
+           c.balance - c.balance_before AS amount,
+           c.old_level,
+           c.new_level,
+           l.id AS tx_id
+    FROM credited c
+    JOIN ledger l ON l.user_id = c.user_id
+"""
+
+async def after_credit(guild_id: int, rows, tx_type: str):
+    """Sinkronkan cache & leaderboard setelah kredit (dipakai juga oleh repository lain)"""
+    await member_stats.invalidate_many(guild_id, [row["user_id"] for row in rows])
+    await leaderboard.record_many(guild_id, [
+        (row["user_id"], row["xp"], row["balance"], None, row["amount"] if tx_type == "credit" else 0)
+        for row in rows
+    ])
+
+async def credit_many(executor,
+                      guild_id: int,
+                      usernames: dict[int, str],
+                      xp_gain: int,
+                      balance_gain: int,
+                      reason: str,
+                      tx_type: str):
+    """
+    Kredit lewat `executor` (db atau koneksi transaksi pemanggil): satu statement CREDIT_CTES,
+    diulang sekali hanya untuk member baru yang bentrok dengan insert transaksi lain.
+    Cache & leaderboard belum disentuh, panggil after_credit() setelah commit.
+    """
+    query = (
+        "WITH input AS ("
+        "    SELECT * FROM unnest($8::bigint[], $9::text[]) AS t(user_id, username)"
+        "),"
+        + CREDIT_CTES + CREDIT_RESULT
+    )
+
+    rows = []
+    pending = dict(usernames)
+    for _ in range(2):
+        user_ids = sorted(pending)
+        rows += await executor.fetch(
+            query,
+            guild_id, xp_gain, balance_gain, reason, tx_type, BASE_XP, LEVEL_POWER,
+            user_ids, [pending[uid] for uid in user_ids]
+        )
+        done = {row["user_id"] for row in rows}
+        pending = {uid: name for uid, name in pending.items() if uid not in done}
+        if not pending:
+            break
+    return rows
+
+@staticmethod
+async def earn_xp_balance_many(guild_id: int,
+                               members: list[tuple[int, str]],
+                               xp_gain: int,
+                               balance_gain: int,
+                               reason: str,
+                               tx_type: str):
+    """
+    Kredit XP & balance ke banyak member dalam satu statement set-based (satu round trip):
+    upsert member, bonus level, level baru, dan satu row ledger per member.
+    """
+    # satu member cukup sekali
+    usernames = dict(members)
+    if not usernames:
+        return []
+
+    rows = await credit_many(db, guild_id, usernames, xp_gain, balance_gain, reason, tx_type)
+    await after_credit(guild_id, rows, tx_type)
+
+    return [dict(row) for row in rows]
+
 @staticmethod
 async def earn_xp_balance(guild_id: int,
                           user_id: int,
@@ -53,33 +231,76 @@ async def earn_xp_balance(guild_id: int,
                           balance_gain: int,
                           reason: str,
                           tx_type: str):
-    
-    member = await get_user(guild_id, user_id, username)
+    """
+    Tambah XP & balance dalam satu statement atomik:
+    upsert member, bonus level (maks 10%), hitung ulang level, dan catat ledger.
+    """
+    rows = await earn_xp_balance_many(guild_id, [(user_id, username)], xp_gain, balance_gain, reason, tx_type)
+    row = rows[0]
+
+    return {
+        "xp": row["xp"],
+        "balance": row["balance"],
+        "old_level": row["old_level"],
+        "new_level": row["new_level"],
+        "tx_id": row["tx_id"]
+    }
+
+@staticmethod
+async def add_xp_many(guild_id: int,
+                      members: list[tuple[int, str]],
+                      xp_gain: int):
+    """
+    Tambah XP saja (tanpa vcash & ledger) ke banyak member dalam satu upsert set-based.
+    Dipakai tick voice; vcash-nya dikredit terpisah per jendela lewat earn_xp_balance_many.
+    """
+    usernames = dict(members)
+    if not usernames:
+        return []
+
+    user_ids = sorted(usernames)
+    rows = await db.fetch(
+        """
+        INSERT INTO voisa.members AS m (guild_id, user_id, username, balance, xp, level, last_active)
+        SELECT $1, t.user_id, t.username, 25000, $2, voisa.level_from_xp($2, $3, $4), NOW()
+        FROM unnest($5::bigint[], $6::text[]) AS t(user_id, username)
+        ORDER BY t.user_id
+        ON CONFLICT (guild_id, user_id) DO UPDATE SET
+            xp = m.xp + EXCLUDED.xp,
+            level = voisa.level_from_xp(m.xp + EXCLUDED.xp, $3, $4),
+            last_active = NOW(),
+            username = EXCLUDED.username
+        RETURNING m.user_id, m.username, m.xp, m.level
+        """,
+        guild_id, xp_gain, BASE_XP, LEVEL_POWER, user_ids, [usernames[uid] for uid in user_ids]
+    )
 
-    old_level = member.get("level", 0) if member else 0
-    new_xp = (member.get("xp", 0) if member else 0) + xp_gain
-    old_balance = (member.get("balance", 0) if member else 0)
-    new_balance = old_balance + balance_gain
+    await member_stats.invalidate_many(guild_id, [row["user_id"] for row in rows])
+    await leaderboard.record_many(guild_id, [(row["user_id"], row["xp"], None, None, 0) for row in rows])
 
-    new_level = get_level_from_xp(new_xp)
+    return [dict(row) for row in rows]
 
-    await db.execute(
+@staticmethod
+async def recompute_levels(base_xp: int = BASE_XP, power: float = LEVEL_POWER) -> int:
+    """Hitung ulang level semua member dalam satu UPDATE set-based, return jumlah row yang berubah"""
+    status = await db.execute(
         """
-        UPDATE voisa.members
-        SET xp=$1, balance=$2, level=$3, last_active=NOW(), username=$6
-        WHERE guild_id=$4 AND user_id=$5
+        UPDATE voisa.members AS m
+        SET level = n.level
+        FROM (
+            SELECT guild_id, user_id, voisa.level_from_xp(xp, $1, $2) AS level
+            FROM voisa.members
+        ) AS n
+        WHERE m.guild_id = n.guild_id
+          AND m.user_id = n.user_id
+          AND m.level IS DISTINCT FROM n.level
         """,
-        new_xp, new_balance, new_level, guild_id, user_id, username
+        base_xp, power
     )
-    
-    await log_transaction(guild_id, user_id, username, balance_gain, old_balance, new_balance, reason, tx_type)
-    
-    return {
-        "xp": new_xp,
-        "balance": new_balance,
-        "old_level": old_level,
-        "new_level": new_level
-    }
+    await member_stats.clear()
+
+    # status: "UPDATE <n>"
+    return int(status.split()[-1])
 
 ### ------ Validator 
 ### ---------------------------------------------------
@@ -111,75 +332,151 @@ async def get_voice_time(guild_id, user_id, date):
     return row["total_time"]
 
 @staticmethod
-async def get_voice_overlap_count(guild_id: int, user_id: int) -> int:
-    row = await db.fetchval(
+async def add_voice_time_many(rows: list[tuple[int, int, object, int]]):
+    """Bulk upsert delta voice time, `rows` = (guild_id, member_id, count_date, detik)"""
+    guild_ids, member_ids, dates, seconds = zip(*rows)
+    await db.execute(
         """
-        WITH overlap_users AS (
-            SELECT DISTINCT s2.user_id
-            FROM voisa.voice_sessions s1
-            JOIN voisa.voice_sessions s2
-              ON s1.guild_id = s2.guild_id
-             AND s1.channel_id = s2.channel_id
-             AND s1.user_id <> s2.user_id
-             AND s1.join_time < s2.leave_time
-             AND s1.leave_time > s2.join_time
-            WHERE s1.guild_id = $1
-              AND s1.user_id = $2
-              AND DATE(s1.join_time) = CURRENT_DATE
-              AND s1.channel_id NOT IN (1371783709073735711, 1374916800747147325, 1378722381199183895)
-        )
-        SELECT COUNT(*) AS total_people
-        FROM overlap_users
+        INSERT INTO voisa.voice_counts AS vc (guild_id, member_id, count_date, total_time)
+        SELECT * FROM unnest($1::bigint[], $2::bigint[], $3::date[], $4::int[])
+        ON CONFLICT (guild_id, member_id, count_date)
+        DO UPDATE SET total_time = vc.total_time + EXCLUDED.total_time
         """,
-        guild_id, user_id
+        list(guild_ids), list(member_ids), list(dates), list(seconds)
+    )
+
+@staticmethod
+async def get_voice_overlap_pairs(guild_id: int, day_start, day_end, excluded_channels: list[int]):
+    """
+    Pasangan (user_id, other_id) yang pernah satu voice channel di rentang hari tersebut.
+    Self-join ini mahal, hanya dipakai untuk backfill tracker co-presence.
+    """
+    return await db.fetch(
+        """
+        SELECT DISTINCT s1.user_id, s2.user_id AS other_id
+        FROM voisa.voice_sessions s1
+        JOIN voisa.voice_sessions s2
+          ON s1.guild_id = s2.guild_id
+         AND s1.channel_id = s2.channel_id
+         AND s1.user_id <> s2.user_id
+         AND s1.join_time < s2.leave_time
+         AND s1.leave_time > s2.join_time
+        WHERE s1.guild_id = $1
+          AND s1.join_time >= $2
+          AND s1.join_time < $3
+          AND NOT (s1.channel_id = ANY($4::bigint[]))
+        """,
+        guild_id, day_start, day_end, excluded_channels
     )
-    return row or 0
 
 
 
 
+@staticmethod
+async def stream_voice_sessions(guild_id: int, since, until, excluded_channels: list[int], batch: int = 5000):
+    """
+    Stream sesi voice terurut (channel_id, join_time) lewat server-side cursor,
+    yield (channel_id, user_id, join_epoch, leave_epoch) tanpa memuat semuanya ke memory.
+    """
+    async with db.transaction() as conn:
+        query = """
+            SELECT channel_id,
+                   user_id,
+                   EXTRACT(EPOCH FROM join_time)::float8 AS join_ts,
+                   EXTRACT(EPOCH FROM LEAST(leave_time, $3))::float8 AS leave_ts
+            FROM voisa.voice_sessions
+            WHERE guild_id = $1
+              AND join_time >= $2
+              AND join_time < $3
+              AND leave_time IS NOT NULL
+              AND NOT (channel_id = ANY($4::bigint[]))
+            ORDER BY channel_id, join_time
+        """
+        async for row in conn.cursor(query, guild_id, since, until, excluded_channels, prefetch=batch):
+            yield row["channel_id"], row["user_id"], row["join_ts"], row["leave_ts"]
+
 ### ------ Spender
 ### ---------------------------------------------------
+class _InsufficientBalance(Exception):
+    """Dipakai untuk me-rollback transaksi spend (mis. discount yang sudah terhapus)"""
+
+
 @staticmethod
 async def spend_balance(guild_id: int,
                         user_id: int, 
                         username: str, 
                         price: int = 0, 
                         reason: str = "command_usage", 
-                        tx_type: str = "debit"):
-
-    async with db.transaction() as conn:
-        await conn.execute(
-            """
-            INSERT INTO voisa.members
-            (guild_id, user_id, username, balance, xp, level, last_active)
-            VALUES ($1, $2, $3, 25000, 0, 0, NOW())
-            ON CONFLICT (guild_id, user_id) DO NOTHING
-            """,
-            guild_id, user_id, username
-        )
+                        tx_type: str = "debit",
+                        discount: tuple[int, int] | None = None,
+                        cashback_percent: int = 0):
+    """
+    Debit `price` kalau saldo cukup. `discount` = (inventory_id, potongan) item sekali pakai,
+    dihapus di transaksi yang sama (kalau sudah terpakai di tempat lain, harga penuh).
+    `cashback_percent` dari harga akhir langsung dikembalikan di UPDATE yang sama.
+    """
+    try:
+        async with db.transaction() as conn:
+            await conn.execute(
+                """
+                INSERT INTO voisa.members
+                (guild_id, user_id, username, balance, xp, level, last_active)
+                VALUES ($1, $2, $3, 25000, 0, 0, NOW())
+                ON CONFLICT (guild_id, user_id) DO NOTHING
+                """,
+                guild_id, user_id, username
+            )
+
+            discount_used = None
+            if discount:
+                discount_used = await conn.fetchval(
+                    """
+                    DELETE FROM voisa.user_inventory
+                    WHERE id = $1 AND guild_id = $2 AND user_id = $3 AND effect_type = 'discount'
+                    RETURNING id
+                    """,
+                    discount[0], guild_id, user_id
+                )
+
+            final_price = max(price - discount[1], 0) if discount_used else price
+            cashback = final_price * cashback_percent // 100
+
+            upd = await conn.fetchrow(
+                """
+                UPDATE voisa.members
+                SET balance = balance - $1 + $5,
+                    last_active = NOW(),
+                    username = $4
+                WHERE guild_id = $2 AND user_id = $3 AND balance >= $1
+                RETURNING balance
+                """,
+                final_price, guild_id, user_id, username, cashback
+            )
+
+            if not upd:
+                raise _InsufficientBalance()
+    except _InsufficientBalance:
+        return None
 
-        upd = await conn.fetchrow(
-            """
-            UPDATE voisa.members
-            SET balance = balance - $1,
-                last_active = NOW(),
-                username = $4
-            WHERE guild_id = $2 AND user_id = $3 AND balance >= $1
-            RETURNING balance
-            """,
-            price, guild_id, user_id, username
-        )
+    balance_after = upd["balance"]
+    balance_paid = balance_after - cashback
+    balance_before = balance_paid + final_price
 
-        if not upd:
-            return None
+    await member_stats.invalidate(guild_id, user_id)
+    await leaderboard.record(guild_id, user_id, balance=balance_after, earned=cashback)
 
-        balance_after = upd["balance"]
-        balance_before = balance_after + price
-        
-        tx = await log_transaction(guild_id, user_id, username, -abs(price), balance_before, balance_after, reason, tx_type)
+    # ledger dicatat setelah commit supaya tidak ada row untuk transaksi yang batal
+    rows = [(guild_id, user_id, username, -abs(final_price), balance_before, balance_paid, reason, tx_type)]
+    if cashback:
+        rows.append((guild_id, user_id, username, cashback, balance_paid, balance_after, f"cashback {reason}", "credit"))
+    await ledger.append_many(rows)
 
-        return {"balance": balance_after, "tx_id": tx["id"]}
+    return {
+        "balance": balance_after,
+        "price": final_price,
+        "cashback": cashback,
+        "discount_used": discount_used
+    }
 
 @staticmethod
 async def log_transaction(
@@ -190,101 +487,143 @@ async def log_transaction(
     balance_before: int,
     balance_after: int,
     reason: str,
-    tx_type: str
+    tx_type: str,
+    sync: bool = False,
+    conn=None
 ):
-    return await db.fetchrow(
-        """
-        INSERT INTO voisa.transactions
-        (guild_id, user_id, username, amount, balance_before, balance_after, reason, tx_type)
-        VALUES ($1,$2,$3,$4,$5,$6,$7,$8)
-        RETURNING id
-        """,
-        guild_id, user_id, username, amount, balance_before, balance_after, reason, tx_type
-    )
+    """
+    Catat transaksi ke ledger.
+    Default lewat buffer write-behind (core.ledger, di-flush pakai COPY);
+    sync=True langsung INSERT (bisa di dalam transaksi `conn`) dan mengembalikan row berisi tx id.
+    """
+    if sync:
+        return await ledger.insert(guild_id, user_id, username, amount, balance_before, balance_after, reason, tx_type, conn=conn)
+
+    await ledger.append(guild_id, user_id, username, amount, balance_before, balance_after, reason, tx_type)
+    return None
     
 @staticmethod
-async def transfer_balance(guild_id: int, sender_id: int, sender_username: str, 
-                        target_id: int, target_username: str, amount: int):
-    """Transfer balance dengan biaya admin 50%"""
+async def transfer_balance_many(guild_id: int, sender_id: int, sender_username: str,
+                                targets: list[tuple[int, str]], amount: int):
+    """
+    Transfer `amount` ke setiap target dalam satu transaksi, biaya admin 50% per target.
+    Semua baris dikunci berurutan (guild_id, user_id) supaya transfer silang tidak deadlock.
+    """
+
+    if amount <= 0 or not targets:
+        return None
 
-    if amount <= 0:
+    # satu user cukup sekali, pengirim tidak boleh jadi penerima
+    recipients = {}
+    for target_id, target_username in targets:
+        if target_id != sender_id:
+            recipients[target_id] = target_username
+    if not recipients:
         return None
 
     fee = int(amount * 0.50)
-    total_deduction = amount + fee
+    total_deduction = (amount + fee) * len(recipients)
+
+    usernames = {sender_id: sender_username, **recipients}
+    user_ids = sorted(usernames)
 
     async with db.transaction() as conn:
-        # Pastikan kedua akun ada (default balance 20000)
+        # Pastikan semua akun ada (default balance 20000)
         await conn.execute(
             """
             INSERT INTO voisa.members (guild_id, user_id, username, balance, xp, level, last_active)
-            VALUES ($1, $2, $3, 20000, 0, 0, NOW())
+            SELECT $1, t.user_id, t.username, 20000, 0, 0, NOW()
+            FROM unnest($2::bigint[], $3::text[]) AS t(user_id, username)
+            ORDER BY t.user_id
             ON CONFLICT (guild_id, user_id) DO NOTHING
             """,
-            guild_id, sender_id, sender_username
+            guild_id, user_ids, [usernames[uid] for uid in user_ids]
         )
-        await conn.execute(
+
+        # Kunci semua baris dalam urutan deterministik
+        rows = await conn.fetch(
             """
-            INSERT INTO voisa.members (guild_id, user_id, username, balance, xp, level, last_active)
-            VALUES ($1, $2, $3, 20000, 0, 0, NOW())
-            ON CONFLICT (guild_id, user_id) DO NOTHING
+            SELECT user_id, balance
+            FROM voisa.members
+            WHERE guild_id = $1 AND user_id = ANY($2::bigint[])
+            ORDER BY guild_id, user_id
+            FOR UPDATE
             """,
-            guild_id, target_id, target_username
+            guild_id, user_ids
         )
+        before = {row["user_id"]: row["balance"] for row in rows}
 
-        # Ambil dan kunci baris untuk menghindari race condition
-        sender_row = await conn.fetchrow(
-            "SELECT balance FROM voisa.members WHERE guild_id=$1 AND user_id=$2 FOR UPDATE",
-            guild_id, sender_id
-        )
-        target_row = await conn.fetchrow(
-            "SELECT balance FROM voisa.members WHERE guild_id=$1 AND user_id=$2 FOR UPDATE",
-            guild_id, target_id
-        )
-
-        if not sender_row or not target_row:
+        if len(before) != len(user_ids):
             return None
 
-        if sender_row["balance"] < total_deduction:
+        if before[sender_id] < total_deduction:
             return None
 
-        new_sender_balance = sender_row["balance"] - total_deduction
-        new_target_balance = target_row["balance"] + amount
+        after = {uid: balance + amount for uid, balance in before.items()}
+        after[sender_id] = before[sender_id] - total_deduction
 
-        # Update balances
-        await conn.execute(
-            "UPDATE voisa.members SET balance=$1, last_active=NOW() WHERE guild_id=$2 AND user_id=$3",
-            new_sender_balance, guild_id, sender_id
-        )
         await conn.execute(
-            "UPDATE voisa.members SET balance=$1, last_active=NOW() WHERE guild_id=$2 AND user_id=$3",
-            new_target_balance, guild_id, target_id
+            """
+            UPDATE voisa.members AS m
+            SET balance = u.balance,
+                last_active = NOW()
+            FROM unnest($2::bigint[], $3::bigint[]) AS u(user_id, balance)
+            WHERE m.guild_id = $1 AND m.user_id = u.user_id
+            """,
+            guild_id, user_ids, [after[uid] for uid in user_ids]
         )
 
-        sender_tx = await log_transaction(
+    await member_stats.invalidate_many(guild_id, user_ids)
+    await leaderboard.record_many(guild_id, [(uid, None, after[uid], None, 0) for uid in user_ids])
+
+    if len(recipients) == 1:
+        sender_reason = f"transfer {amount} to {next(iter(recipients.values()))} + fee {fee}"
+    else:
+        sender_reason = f"transfer {amount} to {len(recipients)} members + fee {fee * len(recipients)}"
+
+    # ledger dicatat setelah commit, sekaligus dalam satu batch
+    await ledger.append_many(
+        [(
             guild_id, sender_id, sender_username,
             -abs(total_deduction),
-            sender_row["balance"], new_sender_balance,
-            f"transfer {amount} to {target_username} + fee {fee}",
+            before[sender_id], after[sender_id],
+            sender_reason,
             "transfer"
-        )
-
-        target_tx = await log_transaction(
+        )] + [(
             guild_id, target_id, target_username,
             amount,
-            target_row["balance"], new_target_balance,
+            before[target_id], after[target_id],
             f"receive from {sender_username}",
             "transfer"
-        )
-        
-        return {
-            "sender_balance": new_sender_balance,
-            "target_balance": new_target_balance,
-            "amount": amount,
-            "fee": fee,
-            "sender_tx_id": sender_tx["id"],
-            "target_tx_id": target_tx["id"]
-        }
+        ) for target_id, target_username in recipients.items()]
+    )
+
+    return {
+        "sender_balance": after[sender_id],
+        "target_balances": {uid: after[uid] for uid in recipients},
+        "recipients": len(recipients),
+        "amount": amount,
+        "fee": fee,
+        "total": total_deduction
+    }
+
+@staticmethod
+async def transfer_balance(guild_id: int, sender_id: int, sender_username: str, 
+                        target_id: int, target_username: str, amount: int):
+    """Transfer balance dengan biaya admin 50%"""
+
+    result = await transfer_balance_many(
+        guild_id, sender_id, sender_username, [(target_id, target_username)], amount
+    )
+    if result is None:
+        return None
+
+    return {
+        "sender_balance": result["sender_balance"],
+        "target_balance": result["target_balances"][target_id],
+        "amount": amount,
+        "fee": result["fee"]
+    }
 
 
 ### ------ Setter
@@ -343,7 +682,13 @@ async def adjust_balance(
             balance_after, guild_id, user_id, username
         )
         
-        tx = await log_transaction(guild_id, user_id, username, amount, balance_before, balance_after, reason, tx_type)
+        # koreksi admin jarang terjadi, catat sinkron di transaksi yang sama agar dapat tx id
+        tx = await log_transaction(guild_id, user_id, username, amount, balance_before, balance_after, reason, tx_type,
+                                   sync=True, conn=conn)
+
+    await member_stats.invalidate(guild_id, user_id)
+    await leaderboard.record(guild_id, user_id, balance=balance_after,
+                             earned=amount if tx_type == "credit" else 0)
 
-        return {"balance": balance_after, "tx_id": tx["id"]}
+    return {"balance": balance_after, "tx_id": tx["id"]}
 
@@ -0,0 +1,197 @@
+# repositories/leaderboard.py
+
+import logging
+
+from datetime import datetime
+from zoneinfo import ZoneInfo
+from core import db, redis
+
+log = logging.getLogger(__name__)
+
+ID = ZoneInfo("Asia/Jakarta")
+
+# board total, di-mirror dari kolom voisa.members / voisa.members_absen
+BOARDS = ("xp", "balance", "streak")
+# board jendela waktu: vcash yang didapat (credit) selama minggu/bulan berjalan
+WINDOWS = ("weekly", "monthly")
+
+WINDOW_TTL = {
+    "weekly": 14 * 86400,
+    "monthly": 62 * 86400,
+}
+
+REBUILD_BATCH = 1000
+
+
+def _key(guild_id: int, board: str) -> str:
+    return f"voisa:lb:{guild_id}:{board}"
+
+
+def _window_key(guild_id: int, window: str, now: datetime | None = None) -> str:
+    now = now or datetime.now(ID)
+    if window == "weekly":
+        year, week, _ = now.isocalendar()
+        return f"voisa:lb:{guild_id}:weekly:{year}-W{week:02d}"
+    return f"voisa:lb:{guild_id}:monthly:{now:%Y-%m}"
+
+
+def board_key(guild_id: int, board: str) -> str:
+    return _window_key(guild_id, board) if board in WINDOWS else _key(guild_id, board)
+
+
+### ------ Writer
+### ---------------------------------------------------
+@staticmethod
+async def record(guild_id: int,
+                 user_id: int,
+                 xp: int | None = None,
+                 balance: int | None = None,
+                 streak: int | None = None,
+                 earned: int = 0):
+    """Mirror nilai terbaru member ke ZSET; `earned` = vcash yang baru didapat (board jendela)"""
+    await record_many(guild_id, [(user_id, xp, balance, streak, earned)])
+
+@staticmethod
+async def record_many(guild_id: int, rows):
+    """`rows` = iterable (user_id, xp, balance, streak, earned), None = kolom tidak berubah"""
+    try:
+        pipe = redis.redis.pipeline(transaction=False)
+        touched_windows = False
+
+        for user_id, xp, balance, streak, earned in rows:
+            if xp is not None:
+                pipe.zadd(_key(guild_id, "xp"), {user_id: xp})
+            if balance is not None:
+                pipe.zadd(_key(guild_id, "balance"), {user_id: balance})
+            if streak is not None:
+                pipe.zadd(_key(guild_id, "streak"), {user_id: streak})
+            if earned and earned > 0:
+                touched_windows = True
+                for window in WINDOWS:
+                    pipe.zincrby(_window_key(guild_id, window), earned, user_id)
+
+        if touched_windows:
+            for window in WINDOWS:
+                pipe.expire(_window_key(guild_id, window), WINDOW_TTL[window])
+
+        await pipe.execute()
+    except Exception as e:
+        # leaderboard bukan sumber kebenaran, cukup dicatat dan bisa di-rebuild
+        log.error(f"[ LEADERBOARD ] ----------- Failed to record: {e}")
+
+
+### ------ Reader
+### ---------------------------------------------------
+@staticmethod
+async def get_rank(guild_id: int, user_id: int, board: str = "xp") -> tuple[int | None, int]:
+    """Rank (1-based, O(log n) lewat ZREVRANK) dan skor member di board"""
+    key = board_key(guild_id, board)
+    pipe = redis.redis.pipeline(transaction=False)
+    pipe.zrevrank(key, user_id)
+    pipe.zscore(key, user_id)
+    rank, score = await pipe.execute()
+    return (rank + 1 if rank is not None else None), int(score or 0)
+
+@staticmethod
+async def get_top(guild_id: int, board: str = "xp", limit: int = 10) -> list[tuple[int, int]]:
+    rows = await redis.redis.zrevrange(board_key(guild_id, board), 0, limit - 1, withscores=True)
+    return [(int(member), int(score)) for member, score in rows]
+
+
+### ------ Rebuild
+### ---------------------------------------------------
+async def _stream_into(conn, query: str, args, boards: dict, suffix: str):
+    """
+    Baca hasil query lewat server-side cursor dan tulis ke key sementara per batch.
+    `boards` = {nama_kolom: nama_board}; return set guild yang tersentuh.
+    """
+    guilds = set()
+    pipe = redis.redis.pipeline(transaction=False)
+    pending = 0
+
+    async for row in conn.cursor(query, *args, prefetch=REBUILD_BATCH):
+        guild_id = row["guild_id"]
+        guilds.add(guild_id)
+        for column, board in boards.items():
+            pipe.zadd(f"{_key(guild_id, board)}{suffix}", {row["user_id"]: row[column] or 0})
+        pending += 1
+
+        if pending >= REBUILD_BATCH:
+            await pipe.execute()
+            pipe = redis.redis.pipeline(transaction=False)
+            pending = 0
+
+    if pending:
+        await pipe.execute()
+    return guilds
+
+@staticmethod
+async def rebuild(guild_id: int | None = None) -> int:
+    """
+    Bangun ulang board total (dan jendela berjalan) dari Postgres tanpa memuat seluruh tabel:
+    row di-stream per batch ke key sementara lalu di-RENAME atomik. Return jumlah guild.
+    """
+    suffix = ":rebuild"
+    guild_filter = "WHERE guild_id = $1" if guild_id is not None else ""
+    args = (guild_id,) if guild_id is not None else ()
+
+    now = datetime.now(ID)
+    week_start = datetime.fromordinal(now.date().toordinal() - now.weekday()).replace(tzinfo=ID)
+    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    # sisa key sementara dari rebuild yang gagal jangan sampai ikut tercampur
+    stale = [key async for key in redis.redis.scan_iter(match=f"voisa:lb:*{suffix}", count=500)]
+    if stale:
+        await redis.redis.delete(*stale)
+
+    async with db.transaction() as conn:
+        guilds = await _stream_into(
+            conn,
+            f"SELECT guild_id, user_id, xp, balance FROM voisa.members {guild_filter}",
+            args,
+            {"xp": "xp", "balance": "balance"},
+            suffix
+        )
+        guilds |= await _stream_into(
+            conn,
+            f"SELECT guild_id, user_id, current_streak FROM voisa.members_absen {guild_filter}",
+            args,
+            {"current_streak": "streak"},
+            suffix
+        )
+
+        window_rows = {}
+        for window, since in (("weekly", week_start), ("monthly", month_start)):
+            window_filter = "AND guild_id = $2" if guild_id is not None else ""
+            window_rows[window] = await conn.fetch(
+                f"""
+                SELECT guild_id, user_id, SUM(amount) AS earned
+                FROM voisa.transactions
+                WHERE created_at >= $1 AND amount > 0 AND tx_type = 'credit' {window_filter}
+                GROUP BY guild_id, user_id
+                """,
+                since, *args
+            )
+
+    # tukar ke key final dalam satu MULTI, pembaca tidak pernah melihat board setengah jadi
+    pipe = redis.redis.pipeline(transaction=True)
+    for gid in guilds:
+        for board in BOARDS:
+            pipe.eval(
+                "if redis.call('EXISTS', KEYS[1]) == 1 then return redis.call('RENAME', KEYS[1], KEYS[2]) end "
+                "return redis.call('DEL', KEYS[2])",
+                2, f"{_key(gid, board)}{suffix}", _key(gid, board)
+            )
+
+    for window, rows in window_rows.items():
+        by_guild = {}
+        for row in rows:
+            by_guild.setdefault(row["guild_id"], {})[row["user_id"]] = int(row["earned"])
+        for gid, scores in by_guild.items():
+            key = _window_key(gid, window, now)
+            pipe.delete(key)
+            pipe.zadd(key, scores)
+            pipe.expire(key, WINDOW_TTL[window])
+    await pipe.execute()
+
+    return len(guilds)
@@ -1,22 +1,55 @@
 # repositories/shop.py
 
 from core import db
+from core.cache import member_stats
+from repositories import economy, leaderboard
 
 class ShopRepository:
     def __init__(self, db):
         self.db = db
 
-    async def clear_today_shop(self, date):
-        await self.db.execute("DELETE FROM voisa.shop_items WHERE date=$1", date)
+    async def replace_daily_items(self, day, rows):
+        """
+        Ganti shop `day` untuk semua guild di `rows` dalam satu transaksi:
+        satu DELETE + satu INSERT dari unnest. `rows` = list dict item berisi guild_id & stock.
+        Return row baru (dengan id) urut guild_id, id.
+        """
+        guild_ids = sorted({row["guild_id"] for row in rows})
+        async with self.db.transaction() as conn:
+            await conn.execute(
+                "DELETE FROM voisa.shop_items WHERE day = $1 AND guild_id = ANY($2::bigint[])",
+                day, guild_ids
+            )
+            return await conn.fetch(
+                """
+                INSERT INTO voisa.shop_items
+                (guild_id, day, item_name, effect_type, value, price, duration, stock)
+                SELECT t.guild_id, $1, t.item_name, t.effect_type, t.value, t.price, t.duration, t.stock
+                FROM unnest(
+                    $2::bigint[], $3::text[], $4::text[], $5::int[], $6::int[], $7::interval[], $8::int[]
+                ) WITH ORDINALITY AS t(guild_id, item_name, effect_type, value, price, duration, stock, ord)
+                ORDER BY t.ord
+                RETURNING *
+                """,
+                day,
+                [row["guild_id"] for row in rows],
+                [row["item_name"] for row in rows],
+                [row["effect_type"] for row in rows],
+                [row["value"] for row in rows],
+                [row["price"] for row in rows],
+                [row.get("duration") for row in rows],
+                [row["stock"] for row in rows],
+            )
 
-    async def insert_shop_item(self, date, item):
+    async def insert_shop_item(self, guild_id, day, item):
         await self.db.execute(
             """
             INSERT INTO voisa.shop_items
-            (day, item_name, effect_type, value, price, duration, stock)
-            VALUES ($1,$2,$3,$4,$5,$6,$7)
+            (guild_id, day, item_name, effect_type, value, price, duration, stock)
+            VALUES ($1,$2,$3,$4,$5,$6,$7,$8)
             """,
-            date,
+            guild_id,
+            day,
             item["item_name"],
             item["effect_type"],
             item["value"],
@@ -25,16 +58,62 @@ class ShopRepository:
             item["stock"],
         )
 
-    async def get_today_items(self, date):
+    async def get_today_items(self, guild_id, day):
         return await self.db.fetch(
-            "SELECT * FROM voisa.shop_items WHERE date=$1 ORDER BY id ASC", date
+            "SELECT * FROM voisa.shop_items WHERE guild_id = $1 AND day = $2 ORDER BY id ASC", guild_id, day
         )
 
+    async def get_stock(self, item_id):
+        """Sisa stok item di Postgres (None kalau item sudah tidak ada)"""
+        return await self.db.fetchval("SELECT stock FROM voisa.shop_items WHERE id = $1", item_id)
+
     async def reduce_stock(self, item_id):
         await self.db.execute(
             "UPDATE voisa.shop_items SET stock = stock - 1 WHERE id = $1", item_id
         )
 
+    async def get_active_effects(self, guild_id, user_id):
+        """Item cashback/discount milik member yang masih berlaku"""
+        return await self.db.fetch(
+            """
+            SELECT id, effect_type, value, expires_at
+            FROM voisa.user_inventory
+            WHERE guild_id = $1 AND user_id = $2
+              AND effect_type IN ('cashback', 'discount')
+              AND (expires_at IS NULL OR expires_at > NOW())
+            """,
+            guild_id, user_id
+        )
+
+    async def delete_expired(self, limit):
+        """Hapus maksimal `limit` item kadaluarsa (paling lama dulu), return row yang dihapus"""
+        return await self.db.fetch(
+            """
+            WITH doomed AS (
+                SELECT id
+                FROM voisa.user_inventory
+                WHERE expires_at IS NOT NULL AND expires_at <= NOW()
+                ORDER BY expires_at
+                LIMIT $1
+                FOR UPDATE SKIP LOCKED
+            )
+            DELETE FROM voisa.user_inventory AS u
+            USING doomed
+            WHERE u.id = doomed.id
+            RETURNING u.id, u.guild_id, u.user_id, u.item_name, u.effect_type
+            """,
+            limit
+        )
+
+    async def count_expired(self):
+        return await self.db.fetchval(
+            """
+            SELECT COUNT(*)
+            FROM voisa.user_inventory
+            WHERE expires_at IS NOT NULL AND expires_at <= NOW()
+            """
+        ) or 0
+
     async def add_to_inventory(self, guild_id, user_id, item, expires_at=None):
         await self.db.execute(
             """
@@ -50,3 +129,85 @@ class ShopRepository:
             item.get("duration"),
             expires_at,
         )
+
+    async def purchase(self, guild_id, user_id, username, item_id):
+        """
+        Beli satu item dalam satu transaksi: kurangi stok (hanya kalau masih ada), debit harga,
+        masukkan inventory, catat ledger, dan kredit langsung untuk item `vcash_add`.
+        Return (status, data): status "ok", "sold_out", "not_found", atau "no_funds".
+        """
+        async with self.db.db_connection() as conn:
+            tr = conn.transaction()
+            await tr.start()
+            try:
+                # urutan kunci selalu shop_items -> members supaya pembeli serentak tidak deadlock
+                item = await conn.fetchrow(
+                    """
+                    UPDATE voisa.shop_items
+                    SET stock = stock - 1
+                    WHERE id = $1 AND stock > 0
+                    RETURNING id, item_name, effect_type, value, price, duration, stock
+                    """,
+                    item_id
+                )
+                if item is None:
+                    exists = await conn.fetchval("SELECT 1 FROM voisa.shop_items WHERE id = $1", item_id)
+                    await tr.rollback()
+                    return ("sold_out" if exists else "not_found"), None
+
+                await conn.execute(
+                    """
+                    INSERT INTO voisa.members
+                    (guild_id, user_id, username, balance, xp, level, last_active)
+                    VALUES ($1, $2, $3, 25000, 0, 0, NOW())
+                    ON CONFLICT (guild_id, user_id) DO NOTHING
+                    """,
+                    guild_id, user_id, username
+                )
+
+                credit = item["value"] if item["effect_type"] == "vcash_add" else 0
+                member = await conn.fetchrow(
+                    """
+                    UPDATE voisa.members
+                    SET balance = balance - $3 + $4,
+                        last_active = NOW(),
+                        username = $5
+                    WHERE guild_id = $1 AND user_id = $2 AND balance >= $3
+                    RETURNING balance
+                    """,
+                    guild_id, user_id, item["price"], credit, username
+                )
+                if member is None:
+                    await tr.rollback()
+                    return "no_funds", dict(item)
+
+                await conn.execute(
+                    """
+                    INSERT INTO voisa.user_inventory
+                    (guild_id, user_id, item_name, effect_type, value, duration, expires_at)
+                    VALUES ($1, $2, $3, $4, $5, $6, NOW() + $6)
+                    """,
+                    guild_id, user_id, item["item_name"], item["effect_type"], item["value"], item["duration"]
+                )
+
+                balance_after = member["balance"]
+                balance_paid = balance_after - credit
+                await economy.log_transaction(
+                    guild_id, user_id, username, -item["price"], balance_paid + item["price"], balance_paid,
+                    f"buy {item['item_name']}", "debit", sync=True, conn=conn
+                )
+                if credit:
+                    await economy.log_transaction(
+                        guild_id, user_id, username, credit, balance_paid, balance_after,
+                        f"shop {item['item_name']}", "credit", sync=True, conn=conn
+                    )
+            except BaseException:
+                await tr.rollback()
+                raise
+            else:
+                await tr.commit()
+
+        await member_stats.invalidate(guild_id, user_id)
+        await leaderboard.record(guild_id, user_id, balance=balance_after, earned=credit)
+
+        return "ok", {**dict(item), "balance": balance_after}
@@ -0,0 +1,101 @@
+# repositories/transactions.py
+
+from datetime import datetime
+from core import db
+
+### ------ Partition
+### ---------------------------------------------------
+@staticmethod
+async def get_partitions():
+    """Daftar partisi voisa.transactions beserta rentangnya (NULL = MINVALUE / DEFAULT)"""
+    return await db.fetch(
+        r"""
+        SELECT c.relname AS name,
+               pg_get_expr(c.relpartbound, c.oid) = 'DEFAULT' AS is_default,
+               substring(pg_get_expr(c.relpartbound, c.oid) FROM $re$FROM \('([^']+)'\)$re$)::timestamptz AS range_start,
+               substring(pg_get_expr(c.relpartbound, c.oid) FROM $re$TO \('([^']+)'\)$re$)::timestamptz AS range_end
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        JOIN pg_namespace n ON n.oid = p.relnamespace
+        WHERE n.nspname = 'voisa' AND p.relname = 'transactions'
+        ORDER BY range_start NULLS FIRST
+        """
+    )
+
+@staticmethod
+async def create_partition(name: str, range_start: datetime, range_end: datetime):
+    """
+    Buat partisi bulanan. Kalau partisi DEFAULT sudah menampung row di rentang ini,
+    CREATE biasa ditolak (check violation): DEFAULT di-detach, partisi dibuat, row-nya
+    dipindah ke partisi baru, lalu DEFAULT di-attach lagi, semua dalam satu transaksi.
+    """
+    # DDL tidak bisa pakai parameter; nama & batas dibangkitkan sendiri oleh service
+    start, end = range_start.isoformat(), range_end.isoformat()
+
+    async with db.transaction() as conn:
+        has_default = await conn.fetchval("SELECT to_regclass('voisa.transactions_default') IS NOT NULL")
+        stranded = has_default and await conn.fetchval(
+            """
+            SELECT EXISTS (
+                SELECT 1 FROM voisa.transactions_default
+                WHERE created_at >= $1 AND created_at < $2
+            )
+            """,
+            range_start, range_end
+        )
+
+        if stranded:
+            await conn.execute("ALTER TABLE voisa.transactions DETACH PARTITION voisa.transactions_default")
+
+        await conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS voisa."{name}"
+            PARTITION OF voisa.transactions
+            FOR VALUES FROM ('{start}') TO ('{end}')
+            """
+        )
+
+        if stranded:
+            await conn.execute(
+                """
+                WITH moved AS (
+                    DELETE FROM voisa.transactions_default
+                    WHERE created_at >= $1 AND created_at < $2
+                    RETURNING *
+                )
+                INSERT INTO voisa.transactions SELECT * FROM moved
+                """,
+                range_start, range_end
+            )
+            await conn.execute("ALTER TABLE voisa.transactions ATTACH PARTITION voisa.transactions_default DEFAULT")
+
+@staticmethod
+async def archive_partition(name: str, period_end: datetime) -> int:
+    """
+    Ringkas partisi ke voisa.balance_snapshots, detach, lalu pindahkan ke schema voisa_archive.
+    Semua dalam satu transaksi, return jumlah snapshot yang ditulis.
+    """
+    async with db.transaction() as conn:
+        status = await conn.execute(
+            f"""
+            INSERT INTO voisa.balance_snapshots
+                (guild_id, user_id, period_end, last_balance, total_credit, total_debit, tx_count)
+            SELECT guild_id,
+                   user_id,
+                   $1,
+                   (array_agg(balance_after ORDER BY created_at DESC, id DESC))[1],
+                   COALESCE(SUM(amount) FILTER (WHERE amount > 0), 0),
+                   COALESCE(SUM(-amount) FILTER (WHERE amount < 0), 0),
+                   COUNT(*)
+            FROM voisa."{name}"
+            GROUP BY guild_id, user_id
+            ON CONFLICT (guild_id, user_id, period_end) DO NOTHING
+            """,
+            period_end
+        )
+        await conn.execute(f'ALTER TABLE voisa.transactions DETACH PARTITION voisa."{name}"')
+        await conn.execute(f'ALTER TABLE voisa."{name}" SET SCHEMA voisa_archive')
+
+    # status: "INSERT 0 <n>"
+    return int(status.split()[-1])
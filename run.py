@@ -7,7 +7,8 @@ import sys
 
 import discord
 
-from core import db, redis
+from core import db, redis, ledger
+from core.scheduler import scheduler
 from discord.ext import commands, tasks
 from pathlib import Path
 from typing import Optional, List, Dict, Any
@@ -220,6 +221,12 @@ class YumnaBot(commands.Bot):
             await db.init_db_pool()
             log.info("[ DB ] -------------------- Database pool initialized")
 
+            await ledger.start()
+            log.info("[ LEDGER ] ---------------- Ledger writer started")
+
+            await scheduler.start()
+            log.info("[ SCHEDULER ] ------------- Job scheduler started")
+
             self.http_session = aiohttp.ClientSession()
             log.info("[ HTTP SESSION ] ---------- HTTP session created")
             
@@ -316,6 +323,16 @@ class YumnaBot(commands.Bot):
 
         try:
 
+            # Unload cogs dulu: cog seperti Voicecount masih perlu DB untuk flush terakhir
+            await self._unload_cogs()
+            log.info("[ SHUTDOWN ] -------------- Cogs unloaded")
+
+            await scheduler.close()
+            log.info("[ SCHEDULER ] ------------- Job scheduler stopped")
+
+            await ledger.close()
+            log.info("[ LEDGER ] ---------------- Ledger buffer flushed")
+
             await db.close_pool()
             log.info("[ DB ] -------------------- Database pool closed")
             
@@ -331,10 +348,6 @@ class YumnaBot(commands.Bot):
                 await self.http_session.close()
                 log.info("[ SHUTDOWN ] -------------- HTTP session closed")
 
-            # Unload cogs
-            await self._unload_cogs()
-            log.info("[ SHUTDOWN ] -------------- Cogs unloaded")
-
         except Exception as e:
             log.error(f"[ SHUTDOWN ] -------------- Error during shutdown: {e}")
         finally:
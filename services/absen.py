@@ -4,6 +4,8 @@
 from datetime import date, datetime, timedelta
 from typing import Optional, Dict, Any, Tuple, List
 from repositories.absen import AbsenRepository
+from repositories import leaderboard
+from services import voicecount
 import logging
 
 log = logging.getLogger(__name__)
@@ -18,59 +20,68 @@ class AbsenService:
         today: date
     ) -> Optional[Dict[str, Any]]:
         
-        # Get current absen data
-        current_data = await AbsenRepository.get_absen(guild_id, user_id)
-        
-        # First time absen
-        if not current_data:
-            result = await AbsenRepository.insert_absen(guild_id, user_id, today)
-            log.info(f"[ ABSEN SYSTEM ] --- Create new data for id : {user_id} | gid: {guild_id}")
-            return {
-                "success": True,
-                "streak": 1,
-                "longest_streak": 1,
-                "is_new_record": True,
-                "total_absen": 1,
-                "last_absen": today
-            }
-        
-        # Check if already absen today
-        last_absen_date = current_data['last_absen']
-        if last_absen_date == today:
+        # Satu statement: cek sudah absen, hitung streak, dan update sekaligus
+        row = await AbsenRepository.upsert_absen(guild_id, user_id, today)
+        if row is None:
             return None
-        
-        # Calculate new streak (simple logic: yesterday = +1, else = reset to 1)
-        current_streak = current_data['current_streak']
-        longest_streak = current_data['longest_streak']
-        
-        yesterday = today - timedelta(days=1)
-        
-        if last_absen_date == yesterday:
-            # Continue streak
-            new_streak = current_streak + 1
-        else:
-            # Auto-reset streak
-            new_streak = 1
-            log.info(f"[ ABSEN SYSTEM ] reset data for id : {user_id} | last absen at : {last_absen_date})")
-        
-        # Update longest streak if needed
-        new_longest = max(longest_streak, new_streak)
-        is_new_record = new_streak > longest_streak
-        
-        # Update database
-        result = await AbsenRepository.update_absen(
-            guild_id, user_id, today, new_streak, new_longest
-        )
-        
+
+        if row['total_absen'] == 1:
+            log.info(f"[ ABSEN SYSTEM ] --- Create new data for id : {user_id} | gid: {guild_id}")
+        elif row['current_streak'] == 1:
+            log.info(f"[ ABSEN SYSTEM ] reset data for id : {user_id}")
+
+        await leaderboard.record(guild_id, user_id, streak=row['current_streak'])
+
         return {
             "success": True,
-            "streak": new_streak,
-            "longest_streak": new_longest,
-            "is_new_record": is_new_record,
-            "total_absen": result['total_absen'],
-            "last_absen": today
+            "streak": row['current_streak'],
+            "longest_streak": row['longest_streak'],
+            "is_new_record": row['is_new_record'],
+            "total_absen": row['total_absen'],
+            "last_absen": row['last_absen']
         }
     
+    @staticmethod
+    async def checkin(
+        guild_id: int,
+        user_id: int,
+        username: str,
+        today: date,
+        xp_gain: int,
+        balance_gain: int,
+        min_voice: int = 300
+    ) -> Dict[str, Any]:
+        """
+        Absen lengkap dalam satu transaksi: validasi voice, streak, dan hadiah.
+        `status`: "ok", "voice" (voice time kurang), atau "already" (sudah absen hari ini).
+        """
+        # detik voice yang masih di memory Voicecount ikut dihitung
+        unflushed = voicecount.tracker.unflushed(guild_id, user_id, today)
+
+        row = await AbsenRepository.absen_with_reward(
+            guild_id, user_id, username, today, unflushed, min_voice, xp_gain, balance_gain
+        )
+
+        if row["total_time"] < min_voice:
+            return {"status": "voice", "total_time": row["total_time"]}
+        if row["current_streak"] is None:
+            return {"status": "already", "total_time": row["total_time"]}
+
+        await leaderboard.record(guild_id, user_id, streak=row["current_streak"])
+
+        return {
+            "status": "ok",
+            "total_time": row["total_time"],
+            "streak": row["current_streak"],
+            "longest_streak": row["longest_streak"],
+            "is_new_record": row["is_new_record"],
+            "total_absen": row["total_absen"],
+            "xp": row["xp"],
+            "balance": row["balance"],
+            "old_level": row["old_level"],
+            "new_level": row["new_level"],
+        }
+
     @staticmethod
     async def get_user_absen_info(
         guild_id: int,
@@ -1,3 +1,5 @@
+import asyncio
+
 from core import db
 
 class TextChannelDB: 
@@ -33,8 +35,7 @@ class TextChannelDB:
         return True
             
 
-    async def get_second_channel(self,
-                                    guild_id: int) -> int | None:
+    async def get_second_channel(guild_id: int) -> int | None:
         query = """
             SELECT second_text_chid
             FROM voisa.guild_setting
@@ -43,11 +44,46 @@ class TextChannelDB:
         row = await db.fetchrow(query, guild_id)
         return int(row["second_text_chid"]) if row and row["second_text_chid"] else None
 
+    async def get_all_channels():
+        """Fallback cold start: master & second channel semua guild dalam satu SELECT"""
+        return await db.fetch(
+            """
+            SELECT guild_id, master_text_chid, second_text_chid
+            FROM voisa.guild_setting
+            WHERE master_text_chid IS NOT NULL OR second_text_chid IS NOT NULL
+            """
+        )
+
+
+# Setting channel semua guild disimpan di 3 hash (field = guild_id), jadi startup cukup
+# satu pipeline HGETALL, bukan SCAN + GET per guild.
+MASTER_HASH = "voisa:channel_settings:master"
+SECOND_HASH = "voisa:channel_settings:second"
+DISABLED_HASH = "voisa:channel_settings:disabled"
+# marker migrasi: "running" (ber-TTL, diambil lewat SET NX) lalu "done" setelah selesai
+MIGRATED_KEY = "voisa:channel_settings:migrated"
+MIGRATION_TTL = 300
+
+# key lama per guild: voisa:<nama>:<guild_id>
+LEGACY_KEYS = {
+    "voisa:master_channel_ai:*": MASTER_HASH,
+    "voisa:second_channel:*": SECOND_HASH,
+    "voisa:disabled_channels:*": DISABLED_HASH,
+}
+
+
+def _text(raw) -> str:
+    return raw.decode() if isinstance(raw, (bytes, bytearray)) else str(raw)
+
+
+def _parse_ids(raw) -> set[int]:
+    return {int(cid) for cid in _text(raw).split(",") if cid.strip().isdigit()}
+
+
 class TextChannelRedis: 
     @staticmethod
     async def get_master_channel_cache(self, guild_id: int) -> int | None:
-        key = f"voisa:master_channel_ai:{guild_id}"
-        data = await self.bot.redis.get(key)
+        data = await self.bot.redis.hget(MASTER_HASH, guild_id)
         if data:
             try:
                 return int(data)
@@ -57,13 +93,11 @@ class TextChannelRedis:
 
     @staticmethod
     async def save_master_channel_cache(self, guild_id: int, channel_id: int):
-        key = f"voisa:master_channel_ai:{guild_id}"
-        await self.bot.redis.set(key, int(channel_id))
+        await self.bot.redis.hset(MASTER_HASH, guild_id, int(channel_id))
         
     @staticmethod
     async def get_second_channel_cache(self, guild_id: int) -> int | None:
-        key = f"voisa:second_channel:{guild_id}"
-        data = await self.bot.redis.get(key)
+        data = await self.bot.redis.hget(SECOND_HASH, guild_id)
         if data:
             try:
                 return int(data)
@@ -73,32 +107,93 @@ class TextChannelRedis:
     
     @staticmethod
     async def save_second_channel_cache(self, guild_id: int, channel_id: int) -> None:
-        key = f"voisa:second_channel:{guild_id}"
-        await self.bot.redis.set(key, str(channel_id))
+        await self.bot.redis.hset(SECOND_HASH, guild_id, str(channel_id))
         
     @staticmethod
-    async def disable_channel_cache(self, guild_id: int):
-        key = f"voisa:disabled_channels:{guild_id}"
-        await self.bot.redis.set(key, ",".join(str(cid) for cid in disabled))
-        
+    async def save_disabled_channels_cache(self, guild_id: int, disabled: set[int]):
+        if disabled:
+            await self.bot.redis.hset(DISABLED_HASH, guild_id, ",".join(str(cid) for cid in disabled))
+        else:
+            await self.bot.redis.hdel(DISABLED_HASH, guild_id)
+
     @staticmethod
-    async def enable_channel_cache(self, guild_id: int, channel_id: int):
-        key = f"voisa:disabled_channels:{guild_id}"
-        await self.bot.redis.delete(key)
+    async def load_all_channels_cache(self) -> tuple[dict[int, int], dict[int, int], dict[int, set[int]]]:
+        """Semua setting channel dalam satu round trip: (master, second, disabled) per guild"""
+        pipe = self.bot.redis.pipeline(transaction=False)
+        pipe.hgetall(MASTER_HASH)
+        pipe.hgetall(SECOND_HASH)
+        pipe.hgetall(DISABLED_HASH)
+        masters, seconds, disabled = await pipe.execute()
+
+        def ids(mapping):
+            result = {}
+            for guild_id, channel_id in mapping.items():
+                try:
+                    result[int(guild_id)] = int(channel_id)
+                except ValueError:
+                    continue
+            return result
+
+        return ids(masters), ids(seconds), {int(gid): _parse_ids(raw) for gid, raw in disabled.items()}
+
+    @staticmethod
+    async def save_all_channels_cache(self, masters: dict[int, int], seconds: dict[int, int]):
+        pipe = self.bot.redis.pipeline(transaction=False)
+        if masters:
+            pipe.hset(MASTER_HASH, mapping=masters)
+        if seconds:
+            pipe.hset(SECOND_HASH, mapping=seconds)
+        await pipe.execute()
+
+    @staticmethod
+    async def migrate_legacy_keys(self, batch: int = 500) -> int:
+        """
+        Pindahkan key lama per guild ke hash, sekali saja dan oleh satu proses.
+        Marker diambil dengan SET NX sebelum mulai (dilepas lagi kalau gagal, kadaluarsa sendiri
+        kalau proses mati); proses lain menunggu sampai selesai. Return jumlah key yang dipindah.
+        """
+        r = self.bot.redis
+        if not await r.set(MIGRATED_KEY, "running", nx=True, ex=MIGRATION_TTL):
+            # sudah selesai, atau sedang dikerjakan proses lain: tunggu supaya yang dimuat tidak setengah jadi
+            for _ in range(MIGRATION_TTL * 2):
+                state = await r.get(MIGRATED_KEY)
+                if state is None or _text(state) != "running":
+                    break
+                await asyncio.sleep(0.5)
+            return 0
+
+        moved = 0
+        try:
+            for pattern, hash_key in LEGACY_KEYS.items():
+                keys = [key async for key in r.scan_iter(match=pattern, count=batch)]
+                for start in range(0, len(keys), batch):
+                    chunk = keys[start:start + batch]
+                    values = await r.mget(chunk)
+                    mapping = {
+                        _text(key).rsplit(":", 1)[1]: value
+                        for key, value in zip(chunk, values)
+                        if value is not None
+                    }
+                    pipe = r.pipeline(transaction=True)
+                    if mapping:
+                        pipe.hset(hash_key, mapping=mapping)
+                    pipe.delete(*chunk)
+                    await pipe.execute()
+                    moved += len(chunk)
+        except BaseException:
+            # lepas marker supaya start berikutnya mengulang sisa key yang belum pindah
+            await r.delete(MIGRATED_KEY)
+            raise
+
+        await r.set(MIGRATED_KEY, "done")
+        return moved
 
 class MasterChannelRedis:
     @staticmethod
     async def get_master_channel_cache(self, guild_id: int) -> int | None:
-        key = f"voisa:master_channel_ai:{guild_id}"
-        data = await self.bot.redis.get(key)
-        if data:
-            try:
-                return int(data)
-            except ValueError:
-                return None
-        return None
+        return await TextChannelRedis.get_master_channel_cache(self, guild_id)
     
     @staticmethod
     async def save_master_channel_cache(self, guild_id: int, channel_id: int, ttl: int = 3600) -> None:
-        key = f"voisa:master_channel_ai:{guild_id}"
-        await self.bot.redis.set(key, str(channel_id), ex=ttl)
+        # setting disimpan di hash tanpa TTL per field; `ttl` dipertahankan demi kompatibilitas
+        await TextChannelRedis.save_master_channel_cache(self, guild_id, channel_id)
@@ -0,0 +1,153 @@
+# services/copresence.py
+
+import logging
+
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+from config import VoiceSetting
+from core import redis
+from repositories import economy as repo
+from utils.helper.sweepline import OverlapSweep
+from utils.time import ID, get_current_date
+
+log = logging.getLogger(__name__)
+
+
+class CoPresenceTracker:
+    """
+    Pelacak live siapa saja yang pernah satu voice channel dengan user hari ini (tanggal Jakarta).
+    Anggota tiap channel disimpan di memory, sedangkan hasilnya (user lain yang pernah bareng)
+    disimpan sebagai Redis SET per user per hari, jadi jumlahnya cukup SCARD (O(1)).
+    """
+
+    KEY = "voisa:copresence:{guild_id}:{date}:{user_id}"
+    TTL = 2 * 86400
+
+    def __init__(self, excluded_channels=()):
+        self.excluded_channels = set(excluded_channels)
+        self.channels: dict[tuple[int, int], set[int]] = {}
+        self.day: str | None = None
+
+    def _key(self, guild_id: int, user_id: int, date: str | None = None) -> str:
+        return self.KEY.format(guild_id=guild_id, date=date or self.day, user_id=user_id)
+
+    def reset(self):
+        self.channels.clear()
+
+    async def seed(self, guilds):
+        """Isi ulang state dari voice state yang sedang aktif (dipanggil saat bot ready)"""
+        self.reset()
+        for guild in guilds:
+            for channel in guild.voice_channels + guild.stage_channels:
+                for member in channel.members:
+                    if not member.bot:
+                        await self.join(guild.id, channel.id, member.id)
+
+    async def join(self, guild_id: int, channel_id: int, user_id: int):
+        if channel_id in self.excluded_channels:
+            return
+        await self._roll_day()
+
+        members = self.channels.setdefault((guild_id, channel_id), set())
+        others = members - {user_id}
+        members.add(user_id)
+
+        if others:
+            await self._link(guild_id, {user_id: others})
+
+    def leave(self, guild_id: int, channel_id: int, user_id: int):
+        members = self.channels.get((guild_id, channel_id))
+        if not members:
+            return
+        members.discard(user_id)
+        if not members:
+            del self.channels[(guild_id, channel_id)]
+
+    async def count(self, guild_id: int, user_id: int) -> int:
+        return await redis.redis.scard(await self.today_key(guild_id, user_id))
+
+    async def today_key(self, guild_id: int, user_id: int) -> str:
+        """Key SET hari ini, untuk pembaca yang ingin SCARD di pipeline sendiri"""
+        await self._roll_day()
+        return self._key(guild_id, user_id)
+
+    async def _link(self, guild_id: int, links: dict[int, set[int]]):
+        """Tulis relasi dua arah user <-> others dalam satu pipeline"""
+        pipe = redis.redis.pipeline(transaction=False)
+        touched = set()
+        for user_id, others in links.items():
+            pipe.sadd(self._key(guild_id, user_id), *others)
+            touched.add(user_id)
+            for other in others:
+                pipe.sadd(self._key(guild_id, other), user_id)
+                touched.add(other)
+        for user_id in touched:
+            pipe.expire(self._key(guild_id, user_id), self.TTL)
+
+        try:
+            await pipe.execute()
+        except Exception as e:
+            log.error(f"[ COPRESENCE ] ------------ Failed to persist: {e}")
+
+    async def _roll_day(self):
+        today = get_current_date()
+        if today == self.day:
+            return
+        self.day = today
+
+        # yang masih bareng saat lewat tengah malam langsung terhitung untuk hari baru
+        for (guild_id, _), members in list(self.channels.items()):
+            if len(members) > 1:
+                await self._link(guild_id, {user_id: members - {user_id} for user_id in members})
+
+    async def backfill(self, guild_id: int, date: str | None = None) -> int:
+        """
+        Isi Redis dari voisa.voice_sessions (self-join SQL), hanya untuk backfill
+        mis. setelah Redis kosong atau saat pertama deploy. Return jumlah user.
+        """
+        date = date or get_current_date()
+        day_start = datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=ZoneInfo(ID))
+        pairs = await repo.get_voice_overlap_pairs(
+            guild_id, day_start, day_start + timedelta(days=1), list(self.excluded_channels)
+        )
+
+        links: dict[int, set[int]] = {}
+        for row in pairs:
+            links.setdefault(row["user_id"], set()).add(row["other_id"])
+        if not links:
+            return 0
+
+        pipe = redis.redis.pipeline(transaction=False)
+        for user_id, others in links.items():
+            key = self._key(guild_id, user_id, date)
+            pipe.sadd(key, *others)
+            pipe.expire(key, self.TTL)
+        await pipe.execute()
+
+        return len(links)
+
+
+### ------ Analytics
+### ---------------------------------------------------
+@staticmethod
+async def top_voice_partners(guild_id: int, user_id: int, days: int = 28, limit: int = 10):
+    """
+    User yang paling lama satu voice dengan `user_id` selama `days` hari terakhir.
+    Return list (other_id, detik), dihitung sweep-line sambil stream dari voice_sessions.
+    """
+    until = datetime.now(ZoneInfo(ID))
+    since = until - timedelta(days=days)
+
+    sweep = OverlapSweep(focus_user=user_id)
+    async for channel_id, member_id, join_ts, leave_ts in repo.stream_voice_sessions(
+        guild_id, since, until, list(VoiceSetting.EXCLUDED_CHANNELS)
+    ):
+        sweep.feed(channel_id, member_id, join_ts, leave_ts)
+
+    return [
+        (a if b == user_id else b, seconds)
+        for (a, b), seconds in sweep.top(limit)
+    ]
+
+
+tracker = CoPresenceTracker(VoiceSetting.EXCLUDED_CHANNELS)
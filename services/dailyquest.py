@@ -1,28 +1,144 @@
 # services/dailyquest.py
 
+import asyncio
+import logging
+
+from collections import defaultdict
+
+log = logging.getLogger(__name__)
+
+DEFAULT_PROGRESS = {
+    "open_discuss": 0,
+    "post_on_ᴠᴏɪꜱᴀ-ꜰᴇᴇᴅꜱ": 0,
+    "post_on_ᴠᴏɪꜱᴀ-ᴍᴇᴍᴇ": 0,
+    "post_on_ᴠᴏɪꜱᴀ-ꜰᴏᴏᴅꜱ": 0,
+    "create_voice_room": 0,
+    "join_anotherworld": 0,
+}
+
+# HINCRBY semua field, EXPIRE hanya kalau key belum punya TTL, lalu kembalikan isi hash.
+# ARGV[1] = ttl, sisanya pasangan field/increment.
+UPDATE_SCRIPT = """
+local key = KEYS[1]
+for i = 2, #ARGV, 2 do
+    redis.call('HINCRBY', key, ARGV[i], ARGV[i + 1])
+end
+if redis.call('TTL', key) < 0 then
+    redis.call('EXPIRE', key, ARGV[1])
+end
+return redis.call('HGETALL', key)
+"""
+
+
+def _decode_hash(flat) -> dict:
+    """Hasil HGETALL dari Lua berupa list datar [field, value, ...]"""
+    progress = dict(DEFAULT_PROGRESS)
+    for field, value in zip(flat[::2], flat[1::2]):
+        field = field.decode() if isinstance(field, (bytes, bytearray)) else field
+        progress[field] = int(value)
+    return progress
+
+
 class DailyQuest:
-    def __init__(self, redis):
+    """
+    Progress daily quest per member di Redis hash (satu hash per hari).
+    Increment dari burst pesan dikumpulkan dulu di memory selama `coalesce_window` detik,
+    lalu dikirim sekaligus: satu EVALSHA per key, semua key dalam satu pipeline.
+    """
+
+    TTL = 86400
+
+    def __init__(self, redis, coalesce_window: float = 2.0):
         self.redis = redis
+        self.coalesce_window = coalesce_window
+        self._script = redis.register_script(UPDATE_SCRIPT)
+        # key -> {field: increment yang belum dikirim}
+        self._pending: dict[str, dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._flush_task: asyncio.Task | None = None
 
+    # format key juga dipakai bot voice room (proses lain) untuk create_voice_room, jangan diubah sepihak
     def _key(self, guild_id: int, user_id: int, date: str) -> str:
         return f"dailyquest:{guild_id}:{user_id}:{date}"
 
+    def queue_get(self, pipe, guild_id: int, user_id: int, date: str):
+        """Antrekan HGETALL ke pipeline milik pemanggil, hasilnya diolah lewat parse()"""
+        pipe.hgetall(self._key(guild_id, user_id, date))
+
+    def parse(self, guild_id: int, user_id: int, date: str, data) -> dict:
+        progress = dict(DEFAULT_PROGRESS)
+        progress.update({k.decode(): int(v) for k, v in data.items()})
+        # increment yang masih di-coalesce tetap terlihat oleh pembaca
+        return self._apply_pending(self._key(guild_id, user_id, date), progress)
+
+    def _apply_pending(self, key: str, progress: dict) -> dict:
+        for field, amount in self._pending.get(key, {}).items():
+            progress[field] = progress.get(field, 0) + amount
+        return progress
+
     async def get_quest(self, guild_id: int, user_id: int, date: str):
-        key = self._key(guild_id, user_id, date)
-        data = await self.redis.hgetall(key)
-        if not data:
-            return {"open_discuss": 0,
-                    "post_on_ᴠᴏɪꜱᴀ-ꜰᴇᴇᴅꜱ": 0,
-                    "post_on_ᴠᴏɪꜱᴀ-ᴍᴇᴍᴇ": 0,
-                    "post_on_ᴠᴏɪꜱᴀ-ꜰᴏᴏᴅꜱ": 0,
-                    "create_voice_room": 0,
-                    "join_anotherworld": 0
-                    }
-        return {k.decode(): int(v) for k, v in data.items()}
+        data = await self.redis.hgetall(self._key(guild_id, user_id, date))
+        return self.parse(guild_id, user_id, date, data)
 
     async def update_quest(self, guild_id: int, user_id: int, field: str, date: str):
+        """Increment langsung (satu round trip) dan kembalikan progress terbaru"""
         key = self._key(guild_id, user_id, date)
-        await self.redis.hincrby(key, field, 1)
-        if not await self.redis.ttl(key) > 0:  # set expire sekali saja
-            await self.redis.expire(key, 86400)
-        return await self.get_quest(guild_id, user_id, date)
+        increments = self._pending.pop(key, {})
+        increments = {**increments, field: increments.get(field, 0) + 1}
+
+        args = [self.TTL]
+        for name, amount in increments.items():
+            args += [name, amount]
+        try:
+            flat = await self._script(keys=[key], args=args)
+        except Exception:
+            self._merge(key, increments)
+            raise
+        return _decode_hash(flat)
+
+    def track(self, guild_id: int, user_id: int, field: str, date: str, amount: int = 1):
+        """Catat increment tanpa menunggu Redis; dikirim oleh flush berikutnya"""
+        self._pending[self._key(guild_id, user_id, date)][field] += amount
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    def _merge(self, key: str, increments: dict[str, int]):
+        for name, amount in increments.items():
+            self._pending[key][name] += amount
+
+    async def _delayed_flush(self):
+        await asyncio.sleep(self.coalesce_window)
+        try:
+            await self.flush()
+        except Exception as e:
+            log.error(f"[ DAILYQUEST ] ------------ Flush failed: {e}")
+
+    async def flush(self) -> int:
+        """Kirim semua increment yang tertunda dalam satu pipeline, return jumlah key"""
+        if not self._pending:
+            return 0
+
+        batch, self._pending = self._pending, defaultdict(lambda: defaultdict(int))
+        pipe = self.redis.pipeline(transaction=False)
+        for key, increments in batch.items():
+            args = [self.TTL]
+            for name, amount in increments.items():
+                args += [name, amount]
+            await self._script(keys=[key], args=args, client=pipe)
+
+        try:
+            await pipe.execute()
+        except BaseException:
+            # kembalikan ke buffer supaya tidak hilang, dicoba lagi di flush berikutnya
+            for key, increments in batch.items():
+                self._merge(key, increments)
+            raise
+        return len(batch)
+
+    async def close(self):
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
@@ -1,4 +1,8 @@
 from repositories import economy as repo
+from repositories import leaderboard
+from services import copresence, voicecount
+from core import ledger
+from core.cache import member_stats
 
 ### ------ Getter 
 ### ---------------------------------------------------
@@ -6,27 +10,60 @@ from repositories import economy as repo
 async def get_user(guild_id: int, user_id: int, username: str):
     return await repo.get_user(guild_id, user_id, username)
 
+@staticmethod
+async def get_member_stats(guild_id: int, user_id: int) -> dict:
+    """Stats member lewat cache (memory -> redis -> postgres)"""
+    return await member_stats.get(guild_id, user_id, repo.get_member_stats)
+
 @staticmethod
 async def get_balance(guild_id: int, user_id: int):
-    row = await repo.get_balance_row(guild_id, user_id)
+    row = await get_member_stats(guild_id, user_id)
     return row["balance"] if row and "balance" in row else 0
 
 @staticmethod
 async def get_level(guild_id: int, user_id: int):
-    row = await repo.get_level(guild_id, user_id)
+    row = await get_member_stats(guild_id, user_id)
     return row["level"] if row and "level" in row else 0
 
 @staticmethod
 async def get_streaks(guild_id: int, user_id: int):
-    row = await repo.get_streaks(guild_id, user_id)
+    row = await get_member_stats(guild_id, user_id)
     return {
         "current_streak": row["current_streak"] if row and "current_streak" in row else 0,
         "longest_streak": row["longest_streak"] if row and "longest_streak" in row else 0
     }
 
 @staticmethod
-async def get_user_transaction_history(guild_id: int, user_id: int, limit: int = 5, offset: int = 0):
-    return await repo.get_user_transactions(guild_id, user_id, limit, offset)
+async def get_user_transaction_history(guild_id: int, user_id: int, limit: int = 5, before: tuple | None = None):
+    return await repo.get_user_transactions(guild_id, user_id, limit, before)
+
+@staticmethod
+async def count_user_transactions(guild_id: int, user_id: int) -> int:
+    return await repo.count_user_transactions(guild_id, user_id)
+
+@staticmethod
+async def flush_pending_transactions():
+    """Flush buffer ledger supaya history yang dibaca sudah lengkap"""
+    await ledger.flush()
+
+### ------ Leaderboard
+### ---------------------------------------------------
+LEADERBOARDS = leaderboard.BOARDS + leaderboard.WINDOWS
+
+@staticmethod
+async def get_rank(guild_id: int, user_id: int, board: str = "xp"):
+    """Return (rank, score); rank None kalau member belum ada di board"""
+    return await leaderboard.get_rank(guild_id, user_id, board)
+
+@staticmethod
+async def get_leaderboard(guild_id: int, board: str = "xp", limit: int = 10):
+    return await leaderboard.get_top(guild_id, board, limit)
+
+@staticmethod
+async def rebuild_leaderboards(guild_id: int | None = None) -> int:
+    # board jendela dibaca dari ledger, pastikan buffer sudah masuk
+    await ledger.flush()
+    return await leaderboard.rebuild(guild_id)
 
 ### ------ Setter
 ### ---------------------------------------------------
@@ -61,17 +98,27 @@ async def earn_xp_balance(guild_id: int,
                           balance_gain: int,
                           reason: str,
                           tx_type: str):
-    
-    level = await get_level(guild_id, user_id)
-    
-    # hitung bonus berdasarkan level
-    bonus_percent = min(level, 10)  # maksimal 10%
-    bonus_balance = int(balance_gain * bonus_percent / 100)
+    # bonus level (maks 10%) dihitung langsung di repository, satu round trip
+    return await repo.earn_xp_balance(guild_id, user_id, username, xp_gain, balance_gain, reason, tx_type)
 
-    # total balance yang didapat
-    total_balance = balance_gain + bonus_balance
-    
-    return await repo.earn_xp_balance(guild_id, user_id, username, xp_gain, total_balance, reason, tx_type)
+@staticmethod
+async def airdrop(guild_id: int,
+                  members: list[tuple[int, str]],
+                  xp_gain: int,
+                  balance_gain: int,
+                  reason: str = "airdrop"):
+    """Kredit XP & vcash ke banyak member sekaligus (satu round trip), return row per member"""
+    return await repo.earn_xp_balance_many(guild_id, members, xp_gain, balance_gain, reason, "credit")
+
+
+@staticmethod
+def get_cache_stats() -> dict:
+    return member_stats.stats()
+
+@staticmethod
+async def recompute_levels() -> int:
+    """Sinkronkan kolom level dengan kurva saat ini (jalankan setiap BASE_XP/LEVEL_POWER berubah)"""
+    return await repo.recompute_levels()
 
 
 ### ------ Validator 
@@ -80,19 +127,22 @@ async def earn_xp_balance(guild_id: int,
 async def validate_voice(guild_id: int,
                          user_id: int,
                          date: str):
-    
-    return await repo.validate_voice(guild_id, user_id, date)
+    """Cek apakah user join voice minimal 5 menit"""
+    total_time = await get_voice_time(guild_id, user_id, date)
+    return total_time >= 300, total_time
 
 @staticmethod
 async def get_voice_time(guild_id: int,
                          user_id: int,
                          date: str):
-    
-    return await repo.get_voice_time(guild_id, user_id, date)
+    # yang tersimpan di database + delta di memory yang belum di-flush
+    stored = await repo.get_voice_time(guild_id, user_id, date)
+    return stored + voicecount.tracker.unflushed(guild_id, user_id, date)
 
 @staticmethod
 async def get_voice_session(guild_id: int, user_id: int) -> int:
-    return await repo.get_voice_overlap_count(guild_id, user_id)
+    """Jumlah user berbeda yang pernah satu voice hari ini (tracker live, O(1))"""
+    return await copresence.tracker.count(guild_id, user_id)
 
 
 ### ------ Spender 
@@ -106,6 +156,14 @@ async def transfer_balance(guild_id: int,
                            amount: int):
     return await repo.transfer_balance(guild_id, sender_id, sender_username, 
                         target_id, target_username, amount)
+
+@staticmethod
+async def transfer_balance_many(guild_id: int,
+                                sender_id: int,
+                                sender_username: str,
+                                targets: list[tuple[int, str]],
+                                amount: int):
+    return await repo.transfer_balance_many(guild_id, sender_id, sender_username, targets, amount)
     
 @staticmethod
 async def spend_balance(guild_id: int,
@@ -113,7 +171,9 @@ async def spend_balance(guild_id: int,
                         username: str, 
                         price: int = 0, 
                         reason: str = "command_usage", 
-                        tx_type: str = "debit"):
-    return await repo.spend_balance(guild_id, user_id, username, price, reason, tx_type)
+                        tx_type: str = "debit",
+                        discount: tuple[int, int] | None = None,
+                        cashback_percent: int = 0):
+    return await repo.spend_balance(guild_id, user_id, username, price, reason, tx_type, discount, cashback_percent)
 
 
@@ -0,0 +1,126 @@
+# services/effects.py
+
+import heapq
+import time
+
+from dataclasses import dataclass, field
+from core import db
+from repositories.shop import ShopRepository
+from services.inventory import sweeper
+
+
+@dataclass
+class UserEffects:
+    """Item aktif seorang member: cashback (berdurasi) dan discount (sekali pakai)"""
+    # inventory_id -> (persen, epoch kadaluarsa atau None)
+    cashback: dict[int, tuple[int, float | None]] = field(default_factory=dict)
+    # inventory_id -> potongan vcash
+    discount: dict[int, int] = field(default_factory=dict)
+
+    def cashback_percent(self, now: float) -> int:
+        # tidak ditumpuk, yang terbesar saja
+        return max(
+            (pct for pct, expires in self.cashback.values() if expires is None or expires > now),
+            default=0
+        )
+
+    def best_discount(self) -> tuple[int, int] | None:
+        """(inventory_id, potongan) terbesar, None kalau tidak punya"""
+        if not self.discount:
+            return None
+        return max(self.discount.items(), key=lambda entry: entry[1])
+
+
+class ActiveEffectsIndex:
+    """
+    Index in-memory efek item per (guild, user), dimuat lazy sekali dari user_inventory.
+    Cashback yang kadaluarsa dibuang lewat heap deadline (expires_at), jadi command berbayar
+    cukup membaca memory. Wajib invalidate() setiap inventory member berubah di luar index.
+    """
+
+    def __init__(self, repo: ShopRepository, maxsize: int = 10_000):
+        self.repo = repo
+        self.maxsize = maxsize
+        self._index: dict[tuple[int, int], UserEffects] = {}
+        self._deadlines: list[tuple[float, int, int, int]] = []
+        # inventory_id -> entry heap yang masih berlaku; entry lain di heap dianggap basi
+        self._tracked: dict[int, tuple[float, int, int, int]] = {}
+
+    def _track(self, entry: tuple[float, int, int, int]):
+        item_id = entry[3]
+        if self._tracked.get(item_id) == entry:
+            return
+        self._tracked[item_id] = entry
+        heapq.heappush(self._deadlines, entry)
+
+    def _untrack(self, effects: UserEffects):
+        for item_id in effects.cashback:
+            self._tracked.pop(item_id, None)
+        self._compact()
+
+    def _compact(self):
+        # entry basi dibuang saat pop, tapi heap dibangun ulang kalau basinya sudah dominan
+        if len(self._deadlines) > 2 * len(self._tracked) + 64:
+            self._deadlines = list(self._tracked.values())
+            heapq.heapify(self._deadlines)
+
+    def _expire(self, now: float):
+        while self._deadlines and self._deadlines[0][0] <= now:
+            entry = heapq.heappop(self._deadlines)
+            _, guild_id, user_id, item_id = entry
+            if self._tracked.get(item_id) != entry:
+                continue
+            del self._tracked[item_id]
+            effects = self._index.get((guild_id, user_id))
+            if effects is not None:
+                effects.cashback.pop(item_id, None)
+
+    async def get(self, guild_id: int, user_id: int) -> UserEffects:
+        now = time.time()
+        self._expire(now)
+
+        key = (guild_id, user_id)
+        effects = self._index.get(key)
+        if effects is not None:
+            return effects
+
+        effects = UserEffects()
+        for row in await self.repo.get_active_effects(guild_id, user_id):
+            if row["effect_type"] == "discount":
+                effects.discount[row["id"]] = row["value"]
+            else:
+                expires = row["expires_at"].timestamp() if row["expires_at"] else None
+                effects.cashback[row["id"]] = (row["value"], expires)
+                if expires is not None:
+                    # item yang sudah ada di heap (mis. dimuat ulang setelah invalidate) tidak di-push lagi
+                    self._track((expires, guild_id, user_id, row["id"]))
+
+        if len(self._index) >= self.maxsize:
+            # index penuh: buang entry paling lama dimuat (dict menjaga urutan sisip)
+            self._untrack(self._index.pop(next(iter(self._index))))
+        self._index[key] = effects
+        return effects
+
+    def consume(self, guild_id: int, user_id: int, item_id: int):
+        effects = self._index.get((guild_id, user_id))
+        if effects is not None:
+            effects.discount.pop(item_id, None)
+
+    def on_expired(self, rows):
+        """Listener sweeper inventory: buang item yang sudah dihapus dari index"""
+        for row in rows:
+            self._tracked.pop(row["id"], None)
+            effects = self._index.get((row["guild_id"], row["user_id"]))
+            if effects is not None:
+                effects.cashback.pop(row["id"], None)
+                effects.discount.pop(row["id"], None)
+        self._compact()
+
+    def invalidate(self, guild_id: int, user_id: int):
+        effects = self._index.pop((guild_id, user_id), None)
+        if effects is not None:
+            self._untrack(effects)
+
+
+active_effects = ActiveEffectsIndex(ShopRepository(db))
+sweeper.subscribe(active_effects.on_expired)
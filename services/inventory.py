@@ -0,0 +1,62 @@
+# services/inventory.py
+
+import logging
+import time
+
+from core import db
+from repositories.shop import ShopRepository
+
+log = logging.getLogger(__name__)
+
+
+class InventorySweeper:
+    """
+    Hapus item inventory yang sudah kadaluarsa per batch (lewat index expires_at),
+    lalu kabari cache in-process lewat listener `callback(rows)` untuk setiap batch.
+    """
+
+    def __init__(self, repo: ShopRepository, batch_size: int = 1000, max_batches: int = 50):
+        self.repo = repo
+        self.batch_size = batch_size
+        # batas per sweep supaya satu putaran tidak memonopoli pool, sisanya putaran berikutnya
+        self.max_batches = max_batches
+        self._listeners = []
+        self.last_report: dict = {}
+
+    def subscribe(self, callback):
+        self._listeners.append(callback)
+
+    def _emit(self, rows):
+        for callback in self._listeners:
+            try:
+                callback(rows)
+            except Exception as e:
+                log.error(f"[ INVENTORY ] ------------- Expiry listener failed: {e}")
+
+    async def sweep(self) -> dict:
+        started = time.perf_counter()
+        deleted = 0
+        batches = 0
+
+        while batches < self.max_batches:
+            rows = await self.repo.delete_expired(self.batch_size)
+            if not rows:
+                break
+            # hanya batch yang benar-benar menghapus row yang dihitung
+            batches += 1
+            deleted += len(rows)
+            self._emit(rows)
+            if len(rows) < self.batch_size:
+                break
+
+        backlog = await self.repo.count_expired() if batches >= self.max_batches else 0
+        self.last_report = {
+            "deleted": deleted,
+            "batches": batches,
+            "backlog": backlog,
+            "ms": (time.perf_counter() - started) * 1000,
+        }
+        return self.last_report
+
+
+sweeper = InventorySweeper(ShopRepository(db))
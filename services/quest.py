@@ -0,0 +1,152 @@
+# services/quest.py
+
+import asyncio
+
+from dataclasses import dataclass, field
+from datetime import date as Date
+from core import redis
+from services import copresence, economy
+from services.dailyquest import DailyQuest
+
+# sumber progress quest
+COUNTER = "counter"          # hash dailyquest di Redis
+VOICE_TIME = "voice_time"    # voisa.voice_counts + delta Voicecount di memory (detik)
+VOICE_PEOPLE = "voice_people"  # SET co-presence di Redis
+
+# penanda claim per tanggal Jakarta, cukup hidup sampai hari itu lewat
+CLAIM_KEY = "yumna:dailyclaim:{guild_id}:{user_id}:{date}"
+CLAIM_TTL = 2 * 86400
+# key lama (JSON {"last_date": ...}) masih dicek supaya claim hari deploy tidak terbayar dua kali
+LEGACY_CLAIM_KEY = "yumna:dailyclaim:{guild_id}:{user_id}"
+
+# KEYS[1] = key claim, KEYS[2] = key lama; ARGV[1] = tanggal, ARGV[2] = ttl. Return 1 kalau berhasil claim.
+CLAIM_SCRIPT = """
+local legacy = redis.call('GET', KEYS[2])
+if legacy and string.find(legacy, ARGV[1], 1, true) then
+    return 0
+end
+if redis.call('SET', KEYS[1], '1', 'NX', 'EX', ARGV[2]) then
+    return 1
+end
+return 0
+"""
+
+
+@dataclass(frozen=True)
+class Quest:
+    key: str
+    display: str
+    source: str
+    target: int
+    xp: int
+    vcash: int
+
+    def format(self, current: int) -> str:
+        if self.source == VOICE_TIME:
+            return f"{current // 60}m/{self.target // 60}m"
+        return f"{current}/{self.target}"
+
+
+QUESTS: tuple[Quest, ...] = (
+    Quest("open_discuss", "Open a discuss on <#1371795699330449419>", COUNTER, 1, 200, 700),
+    Quest("post_on_ᴠᴏɪꜱᴀ-ꜰᴇᴇᴅꜱ", "Post something on <#1371794854442438717>", COUNTER, 1, 200, 500),
+    Quest("post_on_ᴠᴏɪꜱᴀ-ᴍᴇᴍᴇ", "Post something on <#1371794817453129800>", COUNTER, 1, 200, 500),
+    Quest("post_on_ᴠᴏɪꜱᴀ-ꜰᴏᴏᴅꜱ", "Post something on <#1415981198710276167>", COUNTER, 1, 200, 500),
+    Quest("join_anotherworld", "Join <#1378722381199183895>", COUNTER, 1, 250, 500),
+    Quest("create_voice_room", "Create a voice room", COUNTER, 1, 250, 500),
+    Quest("voice_2_hours", "⏱ Stay 2 hours in voice", VOICE_TIME, 7200, 1500, 1200),
+    Quest("voice_with_5_people", "voice with 5 people", VOICE_PEOPLE, 5, 1500, 1500),
+)
+
+# pemicu quest COUNTER dari event discord: channel_id -> key quest, dicatat lewat DailyQuest.track().
+# create_voice_room sengaja tidak ada di sini dan tidak dicatat bot ini: counter-nya milik bot voice room
+# (proses terpisah) yang langsung HINCRBY field create_voice_room di hash Redis
+# dailyquest:{guild_id}:{user_id}:{date}. Bot ini hanya membacanya lewat DailyQuest.
+MESSAGE_TRIGGERS = {
+    1371794854442438717: "post_on_ᴠᴏɪꜱᴀ-ꜰᴇᴇᴅꜱ",
+    1371794817453129800: "post_on_ᴠᴏɪꜱᴀ-ᴍᴇᴍᴇ",
+    1415981198710276167: "post_on_ᴠᴏɪꜱᴀ-ꜰᴏᴏᴅꜱ",
+}
+THREAD_TRIGGERS = {
+    1371795699330449419: "open_discuss",
+}
+VOICE_JOIN_TRIGGERS = {
+    1378722381199183895: "join_anotherworld",
+}
+
+
+@dataclass
+class QuestStatus:
+    """Progress semua quest seorang member pada satu hari"""
+    progress: dict[str, int] = field(default_factory=dict)
+
+    def current(self, quest: Quest) -> int:
+        return self.progress.get(quest.key, 0)
+
+    def is_done(self, quest: Quest) -> bool:
+        return self.current(quest) >= quest.target
+
+    @property
+    def completed(self) -> list[Quest]:
+        return [quest for quest in QUESTS if self.is_done(quest)]
+
+    @property
+    def total_xp(self) -> int:
+        return sum(quest.xp for quest in self.completed)
+
+    @property
+    def total_balance(self) -> int:
+        return sum(quest.vcash for quest in self.completed)
+
+    @property
+    def total(self) -> int:
+        return len(QUESTS)
+
+
+async def _read_redis(dailyquest: DailyQuest, guild_id: int, user_id: int, date_str: str):
+    """Counter quest dan jumlah teman voice dalam satu pipeline"""
+    people_key = await copresence.tracker.today_key(guild_id, user_id)
+
+    pipe = redis.redis.pipeline(transaction=False)
+    dailyquest.queue_get(pipe, guild_id, user_id, date_str)
+    pipe.scard(people_key)
+    counters, people = await pipe.execute()
+
+    return dailyquest.parse(guild_id, user_id, date_str, counters), int(people or 0)
+
+
+@staticmethod
+async def evaluate(dailyquest: DailyQuest, guild_id: int, user_id: int, day: Date) -> QuestStatus:
+    """Baca semua sumber secara paralel: satu pipeline Redis + satu query Postgres"""
+    (counters, people), voice_time = await asyncio.gather(
+        _read_redis(dailyquest, guild_id, user_id, day.strftime("%Y-%m-%d")),
+        economy.get_voice_time(guild_id, user_id, day),
+    )
+
+    sources = {VOICE_TIME: voice_time, VOICE_PEOPLE: people}
+    return QuestStatus({
+        quest.key: counters.get(quest.key, 0) if quest.source == COUNTER else sources[quest.source]
+        for quest in QUESTS
+    })
+
+
+### ------ Claim
+### ---------------------------------------------------
+@staticmethod
+async def claim_daily(guild_id: int, user_id: int, day: Date) -> bool:
+    """Cek & tandai claim dalam satu langkah atomik; False kalau hari ini sudah claim"""
+    date_str = day.strftime("%Y-%m-%d")
+    claimed = await redis.redis.eval(
+        CLAIM_SCRIPT, 2,
+        CLAIM_KEY.format(guild_id=guild_id, user_id=user_id, date=date_str),
+        LEGACY_CLAIM_KEY.format(guild_id=guild_id, user_id=user_id),
+        date_str, CLAIM_TTL
+    )
+    return bool(claimed)
+
+@staticmethod
+async def release_daily(guild_id: int, user_id: int, day: Date):
+    """Kompensasi: batalkan claim kalau hadiah gagal (atau tidak jadi) dibayar"""
+    await redis.redis.delete(
+        CLAIM_KEY.format(guild_id=guild_id, user_id=user_id, date=day.strftime("%Y-%m-%d"))
+    )
@@ -1,9 +1,16 @@
 # services/shop.py
 
+import asyncio
+import logging
 import random
+
 from datetime import datetime, timedelta
+from core import redis
 from utils.time_utils import JAKARTA_TZ
 from repositories.shop import ShopRepository
+from services.effects import active_effects
+
+log = logging.getLogger(__name__)
 
 BASE_POOL = [
     {"item_name": "1500 vcash top-up", "effect_type": "vcash_add", "value": 1500, "price": 1000},
@@ -14,29 +21,146 @@ BASE_POOL = [
     {"item_name": "2000 vcash top-up", "effect_type": "vcash_add", "value": 2000, "price": 1600},
 ]
 
+ITEMS_PER_DAY = 5
+
 class ShopService:
+    """
+    Katalog harian di-cache per guild di memory, ditandai versi generate hari itu di Redis
+    (VERSION_KEY) supaya regenerate di proses lain ikut terlihat. Counter stok di Redis (DECR atomik) jadi
+    gerbang depan: pembeli yang kalah cepat ditolak tanpa menyentuh Postgres, sehingga yang
+    sampai ke transaksi pembelian paling banyak sejumlah stok dan row lock tidak menumpuk.
+    Stok di Postgres tetap sumber kebenaran (decrement bersyarat di dalam transaksi).
+    """
+
+    STOCK_KEY = "voisa:shop:stock:{date}:{item_id}"
+    STOCK_TTL = 2 * 86400
+    # DECR hanya kalau counter ada; key yang hilang (evict / TTL) di-seed dulu dari ARGV[1] (stok
+    # Postgres) kalau diberikan, tanpa seed return -1 supaya pemanggil membaca stok dulu.
+    # Return 1 = dapat stok, 0 = habis.
+    RESERVE_SCRIPT = """
+    if redis.call('EXISTS', KEYS[1]) == 0 then
+        if not ARGV[1] then
+            return -1
+        end
+        redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+    end
+    if redis.call('DECR', KEYS[1]) < 0 then
+        redis.call('INCR', KEYS[1])
+        return 0
+    end
+    return 1
+    """
+    # kembalikan stok hanya ke counter yang masih ada; key yang hilang nanti di-seed ulang dari Postgres
+    RELEASE_SCRIPT = """
+    if redis.call('EXISTS', KEYS[1]) == 1 then
+        redis.call('INCR', KEYS[1])
+    end
+    """
+    # dinaikkan setiap generate_daily_shop, cache katalog dengan versi lain dianggap basi
+    VERSION_KEY = "voisa:shop:version:{date}"
+
     def __init__(self, shop_repo, economy_service):
         self.repo = shop_repo
         self.economy = economy_service
+        # (guild_id, tanggal) -> (versi, list item hari itu); katalog kosong tidak di-cache
+        self._catalog: dict[tuple[int, object], tuple[int, list[dict]]] = {}
+        self._catalog_lock = asyncio.Lock()
+
+    def _stock_key(self, date, item_id: int) -> str:
+        return self.STOCK_KEY.format(date=date, item_id=item_id)
 
-    async def generate_daily_shop(self):
-        """Generates the daily shop (called at 7AM GMT+7)."""
+    def _version_key(self, date) -> str:
+        return self.VERSION_KEY.format(date=date)
+
+    @staticmethod
+    def roll_daily_items(guild_id: int, day) -> list[dict]:
+        """Pilih item shop guild untuk `day`; seed dari (guild, tanggal) jadi hasilnya bisa diulang"""
+        rng = random.Random(f"{guild_id}:{day.isoformat()}")
+        items = rng.sample(BASE_POOL, k=min(ITEMS_PER_DAY, len(BASE_POOL)))
+        # salin, BASE_POOL dipakai bersama semua guild
+        return [{**item, "guild_id": guild_id, "stock": rng.randint(1, 5)} for item in items]
+
+    async def generate_daily_shop(self, guild_ids):
+        """Generates the daily shop of every guild in one batch (called at 7AM GMT+7)."""
         today = datetime.now(JAKARTA_TZ).date()
-        await self.repo.clear_today_shop(today)
+        rows = [item for guild_id in guild_ids for item in self.roll_daily_items(guild_id, today)]
+        if not rows:
+            return 0
+
+        inserted = await self.repo.replace_daily_items(today, rows)
+
+        # katalog baru langsung dipanaskan, counter stok ditimpa
+        catalog: dict[tuple[int, object], list[dict]] = {}
+        for row in sorted(inserted, key=lambda r: (r["guild_id"], r["id"])):
+            catalog.setdefault((row["guild_id"], today), []).append(dict(row))
+        await self._seed_stock(today, [item for items in catalog.values() for item in items], overwrite=True)
+
+        # versi baru membuat cache katalog di proses lain dimuat ulang
+        pipe = redis.redis.pipeline(transaction=True)
+        pipe.incr(self._version_key(today))
+        pipe.expire(self._version_key(today), self.STOCK_TTL)
+        version, _ = await pipe.execute()
+        self._catalog = {key: (version, items) for key, items in catalog.items()}
+
+        return len(catalog)
 
-        items = random.sample(BASE_POOL, k=min(5, len(BASE_POOL)))
+    async def _seed_stock(self, today, items: list[dict], overwrite: bool = False):
+        pipe = redis.redis.pipeline(transaction=False)
         for item in items:
-            item["stock"] = random.randint(1, 5)
-            await self.repo.insert_shop_item(today, item)
+            # tanpa overwrite (NX): counter yang sudah berjalan (proses lain / sebelum restart) tidak ditimpa
+            pipe.set(self._stock_key(today, item["id"]), item["stock"], ex=self.STOCK_TTL, nx=not overwrite)
+        await pipe.execute()
 
-    async def get_today_shop(self):
+    async def _load_catalog(self, guild_id: int, today) -> list[dict]:
+        """
+        Muat katalog dari Postgres sekali per versi generate, lalu seed counter stok di Redis.
+        Katalog kosong (shop belum di-generate) selalu dibaca ulang.
+        """
+        version = int(await redis.redis.get(self._version_key(today)) or 0)
+        cached = self._catalog.get((guild_id, today))
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        async with self._catalog_lock:
+            cached = self._catalog.get((guild_id, today))
+            if cached is not None and cached[0] == version:
+                return cached[1]
+
+            items = [dict(row) for row in await self.repo.get_today_items(guild_id, today)]
+            await self._seed_stock(today, items)
+
+            if items:
+                self._catalog[(guild_id, today)] = (version, items)
+            return items
+
+    async def get_today_shop(self, guild_id: int):
         today = datetime.now(JAKARTA_TZ).date()
-        return await self.repo.get_today_items(today)
+        items = await self._load_catalog(guild_id, today)
+        if not items:
+            return items
+
+        stocks = await redis.redis.mget([self._stock_key(today, item["id"]) for item in items])
+        return [
+            {**item, "stock": max(int(stock), 0) if stock is not None else item["stock"]}
+            for item, stock in zip(items, stocks)
+        ]
+
+    async def _reserve(self, today, item_id: int) -> bool:
+        key = self._stock_key(today, item_id)
+        reserved = await redis.redis.eval(self.RESERVE_SCRIPT, 1, key)
+        if reserved == -1:
+            # counter hilang: seed ulang dari stok Postgres (proses lain yang lebih dulu seed tetap menang)
+            stock = await self.repo.get_stock(item_id)
+            reserved = await redis.redis.eval(self.RESERVE_SCRIPT, 1, key, max(stock or 0, 0), self.STOCK_TTL)
+        return reserved == 1
+
+    async def _release(self, today, item_id: int):
+        await redis.redis.eval(self.RELEASE_SCRIPT, 1, self._stock_key(today, item_id))
 
     async def buy_item(self, guild_id, user_id, username, item_index):
         """Handles buying logic — deducts vcash, updates DB, returns result msg."""
         today = datetime.now(JAKARTA_TZ).date()
-        items = await self.repo.get_today_items(today)
+        items = await self._load_catalog(guild_id, today)
         if not items:
             return False, "🛒 The shop is empty right now."
 
@@ -44,28 +168,30 @@ class ShopService:
             return False, "❌ Invalid item number."
 
         item = items[item_index - 1]
-        if item["stock"] <= 0:
+        if not await self._reserve(today, item["id"]):
             return False, "❌ That item is out of stock."
 
-        # Deduct balance
-        ok = await self.economy.deduct_balance(guild_id, user_id, username, item["price"])
-        if not ok:
-            return False, "❌ Not enough vcash to buy this item."
-
-        # Update stock
-        await self.repo.reduce_stock(item["id"])
+        # debit, stok, inventory, ledger, dan kredit vcash_add dalam satu transaksi
+        try:
+            status, bought = await self.repo.purchase(guild_id, user_id, username, item["id"])
+        except Exception:
+            await self._release(today, item["id"])
+            raise
 
-        # Expiry handling
-        expires_at = None
-        if item["duration"]:
-            expires_at = datetime.now(JAKARTA_TZ) + item["duration"]
+        if status == "sold_out":
+            # Postgres bilang habis: samakan counter supaya pembeli berikutnya ditolak di Redis
+            await redis.redis.set(self._stock_key(today, item["id"]), 0, ex=self.STOCK_TTL)
+            return False, "❌ That item is out of stock."
+        if status != "ok":
+            await self._release(today, item["id"])
+            if status == "no_funds":
+                return False, "❌ Not enough vcash to buy this item."
+            return False, "❌ Invalid item number."
 
-        # Add to inventory
-        await self.repo.add_to_inventory(guild_id, user_id, item, expires_at)
+        if bought["effect_type"] in ("cashback", "discount"):
+            active_effects.invalidate(guild_id, user_id)
 
-        # Handle instant vcash item
-        if item["effect_type"] == "vcash_add":
-            await self.economy.add_vcash(guild_id, user_id, item["value"])
-            return True, f"✅ You bought **{item['item_name']}** and got **+{item['value']} vcash!**"
+        if bought["effect_type"] == "vcash_add":
+            return True, f"✅ You bought **{bought['item_name']}** and got **+{bought['value']} vcash!**"
 
-        return True, f"✅ You bought **{item['item_name']}** for **{item['price']} vcash!**"
+        return True, f"✅ You bought **{bought['item_name']}** for **{bought['price']} vcash!**"
@@ -0,0 +1,73 @@
+# services/transactions.py
+
+import logging
+
+from datetime import datetime, timezone
+from repositories import transactions as repo
+
+log = logging.getLogger(__name__)
+
+
+def _add_months(dt: datetime, months: int) -> datetime:
+    index = dt.year * 12 + (dt.month - 1) + months
+    return dt.replace(year=index // 12, month=index % 12 + 1, day=1)
+
+
+def _month_start(now: datetime | None = None) -> datetime:
+    now = now or datetime.now(timezone.utc)
+    return datetime(now.year, now.month, 1, tzinfo=timezone.utc)
+
+
+def _overlaps(partition, start: datetime, end: datetime) -> bool:
+    if partition["is_default"]:
+        return False
+    p_start = partition["range_start"]
+    p_end = partition["range_end"]
+    return (p_start is None or p_start < end) and (p_end is None or p_end > start)
+
+
+### ------ Maintenance
+### ---------------------------------------------------
+@staticmethod
+async def ensure_partitions(months_ahead: int) -> list[str]:
+    """Siapkan partisi bulanan dari bulan ini sampai `months_ahead` bulan ke depan"""
+    partitions = await repo.get_partitions()
+    current = _month_start()
+    created = []
+
+    for offset in range(months_ahead + 1):
+        start = _add_months(current, offset)
+        end = _add_months(current, offset + 1)
+
+        # bulan yang sudah ditanggung partisi lain (mis. transactions_legacy) dilewati
+        if any(_overlaps(p, start, end) for p in partitions):
+            continue
+
+        name = f"transactions_p{start:%Y%m}"
+        await repo.create_partition(name, start, end)
+        created.append(name)
+
+    return created
+
+@staticmethod
+async def archive_partitions(retention_months: int) -> list[str]:
+    """Arsip partisi yang seluruh rentangnya lebih tua dari `retention_months` bulan"""
+    partitions = await repo.get_partitions()
+    cutoff = _add_months(_month_start(), -retention_months)
+    archived = []
+
+    for p in partitions:
+        if p["is_default"] or p["range_end"] is None or p["range_end"] > cutoff:
+            continue
+
+        snapshots = await repo.archive_partition(p["name"], p["range_end"])
+        log.info(f"[ LEDGER ] ---------------- Archived {p['name']} ({snapshots} snapshots)")
+        archived.append(p["name"])
+
+    return archived
+
+@staticmethod
+async def run_maintenance(months_ahead: int, retention_months: int) -> dict:
+    created = await ensure_partitions(months_ahead)
+    archived = await archive_partitions(retention_months)
+    return {"created": created, "archived": archived}
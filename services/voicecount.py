@@ -0,0 +1,97 @@
+# services/voicecount.py
+
+import time
+import logging
+
+from collections import defaultdict
+from datetime import datetime, date, timedelta
+from zoneinfo import ZoneInfo
+from repositories import economy as repo
+from utils.time import ID
+
+log = logging.getLogger(__name__)
+
+JAKARTA = ZoneInfo(ID)
+
+
+def split_by_day(start: float, end: float):
+    """Pecah rentang epoch [start, end) per tanggal Jakarta, yield (date, detik)"""
+    while start < end:
+        local = datetime.fromtimestamp(start, JAKARTA)
+        next_midnight = datetime.combine(local.date() + timedelta(days=1), datetime.min.time(), JAKARTA).timestamp()
+        chunk_end = min(end, next_midnight)
+        yield local.date(), chunk_end - start
+        start = chunk_end
+
+
+class VoiceTimeTracker:
+    """
+    Pencatat durasi voice di memory.
+    voice_start_times: (guild_id, member_id) -> epoch terakhir yang sudah dihitung
+    pending: (guild_id, member_id, tanggal) -> detik yang belum di-flush ke voisa.voice_counts
+    """
+
+    def __init__(self):
+        self.voice_start_times: dict[tuple[int, int], float] = {}
+        self.pending: dict[tuple[int, int, date], float] = defaultdict(float)
+
+    def start(self, guild_id: int, member_id: int, now: float | None = None):
+        self.voice_start_times.setdefault((guild_id, member_id), now or time.time())
+
+    def stop(self, guild_id: int, member_id: int, now: float | None = None):
+        started = self.voice_start_times.pop((guild_id, member_id), None)
+        if started is not None:
+            self._accrue(guild_id, member_id, started, now or time.time())
+
+    def _accrue(self, guild_id: int, member_id: int, start: float, end: float):
+        for day, seconds in split_by_day(start, end):
+            self.pending[(guild_id, member_id, day)] += seconds
+
+    def checkpoint(self, now: float | None = None):
+        """Pindahkan durasi sesi yang masih berjalan ke pending"""
+        now = now or time.time()
+        for (guild_id, member_id), started in self.voice_start_times.items():
+            self._accrue(guild_id, member_id, started, now)
+            self.voice_start_times[(guild_id, member_id)] = now
+
+    def unflushed(self, guild_id: int, member_id: int, day: date) -> int:
+        """Detik di `day` yang belum masuk database (pending + sesi berjalan)"""
+        seconds = self.pending.get((guild_id, member_id, day), 0.0)
+        started = self.voice_start_times.get((guild_id, member_id))
+        if started is not None:
+            seconds += sum(s for d, s in split_by_day(started, time.time()) if d == day)
+        return int(seconds)
+
+    async def flush(self) -> int:
+        """Satu bulk upsert untuk semua delta, return jumlah row"""
+        self.checkpoint()
+
+        rows = []
+        for key, seconds in self.pending.items():
+            whole = int(seconds)
+            if whole > 0:
+                rows.append((*key, whole))
+
+        if rows:
+            for guild_id, member_id, day, whole in rows:
+                self.pending[(guild_id, member_id, day)] -= whole
+            try:
+                await repo.add_voice_time_many(rows)
+            except Exception:
+                # kembalikan delta supaya dicoba lagi di flush berikutnya
+                for guild_id, member_id, day, whole in rows:
+                    self.pending[(guild_id, member_id, day)] += whole
+                raise
+
+        # sisa pecahan detik dari hari yang sudah lewat tidak perlu disimpan lagi
+        today = datetime.now(JAKARTA).date()
+        for key in [k for k, v in self.pending.items() if v < 1 and k[2] < today]:
+            del self.pending[key]
+
+        return len(rows)
+
+    def reset(self):
+        self.voice_start_times.clear()
+
+
+tracker = VoiceTimeTracker()
@@ -0,0 +1,268 @@
+# services/voicexp.py
+
+import json
+import time
+import logging
+
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from config import LedgerSetting, VoiceSetting
+from core import ledger, redis
+from repositories import economy as repo
+
+log = logging.getLogger(__name__)
+
+# vcash voice yang belum dikredit, field = "guild_id:user_id", value = JSON {"username", "amount"}.
+# XP masuk setiap tick, vcash-nya dikumpulkan di sini lalu dikredit sekali per jendela
+# (row ledger-nya cocok dengan balance, bonus level dihitung dari total jendela).
+# Disalin ke Redis setiap tick supaya tidak hilang kalau bot mati sebelum jendela ditutup;
+# key proses yang lease ledger-nya habis diambil alih saat restore.
+UNBOOKED_PREFIX = "voisa:voicexp:unbooked:"
+UNBOOKED_KEY = f"{UNBOOKED_PREFIX}{LedgerSetting.JOURNAL_ID}"
+
+@dataclass(frozen=True)
+class EligibilityPolicy:
+    exclude_afk: bool = True
+    exclude_muted: bool = True
+    exclude_deafened: bool = True
+    min_members: int = 2
+    excluded_channels: frozenset[int] = frozenset()
+
+    @classmethod
+    def from_config(cls) -> "EligibilityPolicy":
+        return cls(
+            exclude_afk=VoiceSetting.XP_EXCLUDE_AFK,
+            exclude_muted=VoiceSetting.XP_EXCLUDE_MUTED,
+            exclude_deafened=VoiceSetting.XP_EXCLUDE_DEAFENED,
+            min_members=VoiceSetting.XP_MIN_MEMBERS,
+            excluded_channels=frozenset(VoiceSetting.XP_EXCLUDED_CHANNELS),
+        )
+
+    def channel_ok(self, guild, channel, humans: int) -> bool:
+        if channel.id in self.excluded_channels:
+            return False
+        if self.exclude_afk and channel == guild.afk_channel:
+            return False
+        return humans >= self.min_members
+
+    def member_ok(self, member) -> bool:
+        voice = member.voice
+        if voice is None:
+            return False
+        if self.exclude_muted and (voice.self_mute or voice.mute):
+            return False
+        if self.exclude_deafened and (voice.self_deaf or voice.deaf):
+            return False
+        return True
+
+
+class VoiceXpTicker:
+    """
+    Setiap tick: snapshot member eligible dari voice state di cache discord.py (tanpa query),
+    lalu satu upsert XP set-based per guild untuk semuanya.
+    Vcash dikumpulkan per member dan dikredit sekali per jendela `ledger_interval` detik lewat
+    jalur kredit biasa: satu row ledger per member yang persis sama dengan perubahan balance,
+    dan bonus level dihitung dari total jendela (bonus per tick dari 5 vcash selalu 0).
+    """
+
+    REASON = "Voice activity"
+
+    def __init__(self, policy: EligibilityPolicy, ledger_interval: int, history: int = 60):
+        self.policy = policy
+        self.ledger_interval = ledger_interval
+        self.durations: deque[float] = deque(maxlen=history)
+        self.ticks = 0
+        self.failures = 0
+        self.last_credited = 0
+        self.total_credited = 0
+        # (guild_id, user_id) -> {"username", "amount"}
+        self._unbooked: dict[tuple[int, int], dict] = {}
+        self._window_started = time.monotonic()
+
+    def _merge(self, stored, add: bool) -> list[tuple]:
+        """
+        Masukkan isi hash Redis ke ringkasan; add=True menjumlahkan dengan entry yang sudah ada.
+        Entry format lama (balance sudah dikredit per tick, ada "before"/"after") dikembalikan
+        sebagai row ledger untuk langsung dibukukan.
+        """
+        legacy = []
+        for field, raw in stored.items():
+            field = field.decode() if isinstance(field, (bytes, bytearray)) else field
+            guild_id, user_id = (int(part) for part in field.split(":"))
+            entry = json.loads(raw)
+            if "before" in entry:
+                legacy.append((guild_id, user_id, entry["username"], entry["amount"],
+                               entry["before"], entry["after"], self.REASON, "credit"))
+                continue
+
+            current = self._unbooked.get((guild_id, user_id))
+            if add and current:
+                current["amount"] += entry["amount"]
+            else:
+                self._unbooked[(guild_id, user_id)] = {"username": entry["username"], "amount": entry["amount"]}
+        return legacy
+
+    async def _reclaim_orphans(self) -> list[tuple]:
+        """Ambil alih ringkasan proses lain yang lease ledger-nya sudah habis"""
+        legacy = []
+        async for key in redis.redis.scan_iter(match=f"{UNBOOKED_PREFIX}*"):
+            key = key.decode() if isinstance(key, (bytes, bytearray)) else key
+            if key == UNBOOKED_KEY:
+                continue
+
+            lease = f"{ledger.LEASE_PREFIX}{key[len(UNBOOKED_PREFIX):]}"
+            if not await redis.redis.set(lease, f"reclaim:{LedgerSetting.JOURNAL_ID}", nx=True, ex=ledger.LEASE_TTL):
+                continue
+            try:
+                stored = await redis.redis.hgetall(key)
+                legacy += self._merge(stored, add=True)
+
+                pipe = redis.redis.pipeline(transaction=True)
+                if self._unbooked:
+                    pipe.hset(UNBOOKED_KEY, mapping=self._fields(self._unbooked))
+                pipe.delete(key)
+                await pipe.execute()
+                log.info(f"[ VOICE XP ] -------------- Reclaimed {len(stored)} unbooked credits from {key}")
+            finally:
+                await redis.redis.delete(lease)
+        return legacy
+
+    @staticmethod
+    def _fields(entries: dict) -> dict[str, str]:
+        return {f"{guild_id}:{user_id}": json.dumps(entry) for (guild_id, user_id), entry in entries.items()}
+
+    async def restore(self):
+        """Muat vcash yang belum dikredit dari run sebelumnya (dan dari proses yang sudah mati)"""
+        try:
+            legacy = self._merge(await redis.redis.hgetall(UNBOOKED_KEY), add=False)
+            legacy += await self._reclaim_orphans()
+        except Exception as e:
+            log.error(f"[ VOICE XP ] -------------- Failed to restore unbooked credits: {e}")
+            return
+
+        if legacy:
+            await ledger.append_many(legacy)
+            try:
+                await redis.redis.hdel(UNBOOKED_KEY, *(f"{row[0]}:{row[1]}" for row in legacy))
+            except Exception as e:
+                log.error(f"[ VOICE XP ] -------------- Failed to trim legacy unbooked credits: {e}")
+        if self._unbooked or legacy:
+            log.info(f"[ VOICE XP ] -------------- Restored {len(self._unbooked)} unbooked credits, "
+                     f"booked {len(legacy)} legacy rows")
+
+    def _accumulate(self, guild_id: int, rows, balance_gain: int) -> dict[str, str]:
+        """Tambahkan vcash satu tick ke ringkasan jendela, return field Redis yang berubah"""
+        changed = {}
+        for row in rows:
+            key = (guild_id, row["user_id"])
+            entry = self._unbooked.setdefault(key, {"amount": 0})
+            entry["username"] = row["username"]
+            entry["amount"] += balance_gain
+            changed.update(self._fields({key: entry}))
+        return changed
+
+    async def book(self) -> int:
+        """Tutup jendela: kredit total vcash per member (satu row ledger masing-masing), return jumlah member"""
+        self._window_started = time.monotonic()
+        if not self._unbooked:
+            return 0
+
+        batch, self._unbooked = self._unbooked, {}
+
+        # member satu guild dengan total yang sama dikredit dalam satu statement
+        groups: dict[tuple[int, int], list[tuple[int, str]]] = defaultdict(list)
+        for (guild_id, user_id), entry in batch.items():
+            groups[(guild_id, entry["amount"])].append((user_id, entry["username"]))
+
+        booked, settled = 0, []
+        for (guild_id, amount), members in groups.items():
+            try:
+                await repo.earn_xp_balance_many(guild_id, members, 0, amount, self.REASON, "credit")
+            except Exception as e:
+                # dikembalikan ke ringkasan, dicoba lagi di jendela berikutnya
+                self.failures += 1
+                log.error(f"[ VOICE XP ] -------------- Booking failed for guild {guild_id}: {e}")
+                for user_id, _ in members:
+                    entry = batch[(guild_id, user_id)]
+                    current = self._unbooked.setdefault((guild_id, user_id), {"amount": 0})
+                    current["username"] = entry["username"]
+                    current["amount"] += entry["amount"]
+                continue
+            booked += len(members)
+            settled += [(guild_id, user_id) for user_id, _ in members]
+
+        try:
+            pipe = redis.redis.pipeline(transaction=True)
+            if settled:
+                pipe.hdel(UNBOOKED_KEY, *(f"{guild_id}:{user_id}" for guild_id, user_id in settled))
+            if self._unbooked:
+                pipe.hset(UNBOOKED_KEY, mapping=self._fields(self._unbooked))
+            await pipe.execute()
+        except Exception as e:
+            log.error(f"[ VOICE XP ] -------------- Failed to trim unbooked credits: {e}")
+        return booked
+
+    def snapshot(self, guilds) -> dict[int, list[tuple[int, str]]]:
+        """{guild_id: [(user_id, username)]} untuk semua member yang eligible saat ini"""
+        eligible = {}
+        for guild in guilds:
+            members = []
+            for channel in guild.voice_channels + guild.stage_channels:
+                humans = [m for m in channel.members if not m.bot]
+                if not self.policy.channel_ok(guild, channel, len(humans)):
+                    continue
+                members.extend((m.id, str(m)) for m in humans if self.policy.member_ok(m))
+            if members:
+                eligible[guild.id] = members
+        return eligible
+
+    async def tick(self, guilds, xp_gain: int, balance_gain: int) -> int:
+        """Kredit satu interval, return jumlah member yang dikredit"""
+        started = time.perf_counter()
+        credited = 0
+        changed = {}
+
+        try:
+            for guild_id, members in self.snapshot(guilds).items():
+                try:
+                    rows = await repo.add_xp_many(guild_id, members, xp_gain)
+                    credited += len(rows)
+                    changed.update(self._accumulate(guild_id, rows, balance_gain))
+                except Exception as e:
+                    # satu guild gagal tidak boleh menggagalkan guild lain
+                    self.failures += 1
+                    log.error(f"[ VOICE XP ] -------------- Tick failed for guild {guild_id}: {e}")
+
+            if changed:
+                try:
+                    await redis.redis.hset(UNBOOKED_KEY, mapping=changed)
+                except Exception as e:
+                    log.error(f"[ VOICE XP ] -------------- Failed to persist unbooked credits: {e}")
+
+            if time.monotonic() - self._window_started >= self.ledger_interval:
+                await self.book()
+        finally:
+            self.durations.append(time.perf_counter() - started)
+            self.ticks += 1
+            self.last_credited = credited
+            self.total_credited += credited
+
+        return credited
+
+    def stats(self) -> dict:
+        durations = sorted(self.durations)
+        count = len(durations)
+        return {
+            "ticks": self.ticks,
+            "failures": self.failures,
+            "last_credited": self.last_credited,
+            "total_credited": self.total_credited,
+            "unbooked": len(self._unbooked),
+            "last_ms": self.durations[-1] * 1000 if count else 0.0,
+            "avg_ms": sum(durations) / count * 1000 if count else 0.0,
+            "p95_ms": durations[min(count - 1, int(count * 0.95))] * 1000 if count else 0.0,
+            "max_ms": durations[-1] * 1000 if count else 0.0,
+        }
+
+
+ticker = VoiceXpTicker(EligibilityPolicy.from_config(), VoiceSetting.XP_LEDGER_INTERVAL)
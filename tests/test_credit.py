@@ -0,0 +1,179 @@
+# tests/test_credit.py
+#
+# Regression kredit XP/vcash (CREDIT_CTES) terhadap Postgres asli dengan schema voisa
+# yang sudah ter-migrasi. Butuh TEST_DATABASE_DSN; tanpa itu semua test di-skip.
+# Memakai guild sintetis dan membersihkan row-nya sebelum & sesudah setiap test.
+# Jalankan: TEST_DATABASE_DSN=postgres://... python -m pytest -q tests
+
+import asyncio
+import os
+
+import pytest
+
+DSN = os.getenv("TEST_DATABASE_DSN")
+pytestmark = pytest.mark.skipif(not DSN, reason="TEST_DATABASE_DSN not set")
+
+asyncpg = pytest.importorskip("asyncpg")
+pytest.importorskip("redis")
+pytest.importorskip("cachetools")
+
+from core import db
+from repositories import economy
+from utils.helper.economy import BASE_XP, LEVEL_POWER
+
+GUILD_ID = 1  # tidak pernah dipakai guild discord asli
+
+
+async def _noop(*args, **kwargs):
+    return None
+
+
+@pytest.fixture(autouse=True)
+def no_redis(monkeypatch):
+    # cache & leaderboard bukan bagian yang diuji
+    monkeypatch.setattr(economy.member_stats, "invalidate_many", _noop)
+    monkeypatch.setattr(economy.leaderboard, "record_many", _noop)
+
+
+async def _cleanup():
+    for table in ("voisa.transactions", "voisa.members_absen", "voisa.voice_counts", "voisa.members"):
+        await db.execute(f"DELETE FROM {table} WHERE guild_id = $1", GUILD_ID)
+
+
+def run(body):
+    async def wrapper():
+        db.pool = await asyncpg.create_pool(DSN, min_size=1, max_size=4)
+        try:
+            await _cleanup()
+            return await body()
+        finally:
+            await _cleanup()
+            await db.close_pool()
+
+    return asyncio.run(wrapper())
+
+
+async def seed_member(user_id: int, balance: int, xp: int) -> int:
+    """Member lama dengan level sesuai xp, return level-nya"""
+    return await db.fetchval(
+        """
+        INSERT INTO voisa.members (guild_id, user_id, username, balance, xp, level, last_active)
+        VALUES ($1, $2, $3, $4, $5, voisa.level_from_xp($5, $6, $7), NOW())
+        RETURNING level
+        """,
+        GUILD_ID, user_id, f"member{user_id}", balance, xp, BASE_XP, LEVEL_POWER
+    )
+
+
+async def ledger_row(tx_id: int):
+    return await db.fetchrow(
+        "SELECT amount, balance_before, balance_after FROM voisa.transactions WHERE id = $1",
+        tx_id
+    )
+
+
+def expected_amount(balance_gain: int, level: int) -> int:
+    return balance_gain + balance_gain * min(level, 10) // 100
+
+
+def test_existing_member_keeps_real_balance_and_level():
+    async def body():
+        level = await seed_member(10, 100_000, 200_000)
+        assert level > 0
+
+        result = await economy.earn_xp_balance(GUILD_ID, 10, "member10", 100, 1000, "test", "credit")
+        amount = expected_amount(1000, level)
+
+        assert result["old_level"] == level
+        assert result["new_level"] == level
+        assert result["balance"] == 100_000 + amount
+
+        tx = await ledger_row(result["tx_id"])
+        assert tx["amount"] == amount
+        assert tx["balance_before"] == 100_000
+        assert tx["balance_after"] == 100_000 + amount
+
+    run(body)
+
+
+def test_new_member_starts_from_default_balance():
+    async def body():
+        result = await economy.earn_xp_balance(GUILD_ID, 11, "member11", 100, 1000, "test", "credit")
+
+        assert result["old_level"] == 0
+        assert result["balance"] == 25_000 + 1000
+
+        tx = await ledger_row(result["tx_id"])
+        assert tx["amount"] == 1000
+        assert tx["balance_before"] == 25_000
+
+    run(body)
+
+
+def test_airdrop_books_real_amounts_for_existing_members(monkeypatch):
+    recorded = []
+
+    async def record_many(guild_id, rows):
+        recorded.extend(rows)
+
+    monkeypatch.setattr(economy.leaderboard, "record_many", record_many)
+
+    async def body():
+        levels = {
+            20: await seed_member(20, 100_000, 200_000),
+            21: await seed_member(21, 40_000, 0),
+        }
+        members = [(20, "member20"), (21, "member21"), (22, "member22")]
+
+        rows = await economy.earn_xp_balance_many(GUILD_ID, members, 100, 1000, "Airdrop admin", "credit")
+        by_user = {row["user_id"]: row for row in rows}
+        assert sorted(by_user) == [20, 21, 22]
+
+        for user_id, balance_before in ((20, 100_000), (21, 40_000), (22, 25_000)):
+            level = levels.get(user_id, 0)
+            amount = expected_amount(1000, level)
+            row = by_user[user_id]
+
+            assert row["old_level"] == level
+            assert row["amount"] == amount
+
+            tx = await ledger_row(row["tx_id"])
+            assert tx["amount"] == amount
+            assert tx["balance_before"] == balance_before
+
+        # board jendela mendapat vcash yang benar-benar dikredit
+        earned = {user_id: gained for user_id, _, _, _, gained in recorded}
+        assert earned == {uid: by_user[uid]["amount"] for uid in by_user}
+
+    run(body)
+
+
+def test_absen_reward_for_existing_member_uses_real_balance():
+    from datetime import date
+    from repositories.absen import AbsenRepository
+
+    async def body():
+        today = date(2026, 1, 15)
+        level = await seed_member(30, 100_000, 200_000)
+
+        result = await AbsenRepository.absen_with_reward(
+            GUILD_ID, 30, "member30", today, 600, 300, 1200, 1500
+        )
+        amount = expected_amount(1500, level)
+
+        assert result["current_streak"] == 1
+        assert result["old_level"] == level
+        assert result["amount"] == amount
+
+        tx = await ledger_row(result["tx_id"])
+        assert tx["amount"] == amount
+        assert tx["balance_before"] == 100_000
+
+        # absen kedua di hari yang sama tidak dibayar lagi
+        again = await AbsenRepository.absen_with_reward(
+            GUILD_ID, 30, "member30", today, 600, 300, 1200, 1500
+        )
+        assert again["current_streak"] is None
+        assert again["tx_id"] is None
+
+    run(body)
@@ -0,0 +1,36 @@
+# tests/test_extensions.py
+#
+# Smoke test: extension shop benar-benar terdaftar dan bisa di-load tanpa koneksi DB/Redis.
+
+import asyncio
+
+import pytest
+
+discord = pytest.importorskip("discord")
+pytest.importorskip("dotenv")
+pytest.importorskip("pytz")
+
+from discord.ext import commands
+from config import BotSetting
+from core.scheduler import scheduler
+
+
+def test_shop_folder_is_loaded():
+    assert "shop" in BotSetting.COGS_FOLDER
+
+
+def test_shop_extension_loads():
+    async def body():
+        bot = commands.Bot(command_prefix="!", intents=discord.Intents.none())
+        try:
+            await bot.load_extension("cogs.shop.shop")
+
+            assert bot.get_cog("ShopCog") is not None
+            assert bot.get_command("shop") is not None
+            assert bot.get_command("buy") is not None
+            # cron refresh harian ikut terdaftar walau Redis tidak tersedia
+            assert "shop:daily_refresh" in scheduler._cron
+        finally:
+            await bot.close()
+
+    asyncio.run(body())
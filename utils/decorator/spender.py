@@ -1,5 +1,8 @@
+import time
+
 from functools import wraps
 from services import economy
+from services.effects import active_effects
 
 import discord
 
@@ -12,21 +15,35 @@ def requires_balance(price: int, reason: str = None):
             user_id = ctx.author.id
             guild_id = ctx.guild.id 
 
+            # level dari cache member_stats, efek item dari index in-memory: tanpa query tambahan
             level = await economy.get_level(guild_id, user_id)
+            effects = await active_effects.get(guild_id, user_id)
 
             discount = min(level, 10) * 0.01  
             discounted_price = int(price * (1 - discount))
 
             effective_price = 0 if user_id in FREE_USERS else discounted_price
 
-            formatted_price = "{:,}".format(effective_price)
-
             if effective_price > 0:
+                item_discount = effects.best_discount()
                 success = await economy.spend_balance(
                     ctx.guild.id, user_id, str(ctx.author),
-                    effective_price, reason, "debit"
+                    effective_price, reason, "debit",
+                    discount=item_discount,
+                    cashback_percent=effects.cashback_percent(time.time())
                 )
+
+                if item_discount and success:
+                    if success["discount_used"]:
+                        active_effects.consume(guild_id, user_id, item_discount[0])
+                    else:
+                        # discount sudah terpakai di tempat lain, muat ulang saat dipakai lagi
+                        active_effects.invalidate(guild_id, user_id)
+
                 if not success:
+                    if item_discount:
+                        effective_price = max(effective_price - item_discount[1], 0)
+                    formatted_price = "{:,}".format(effective_price)
                     embed = discord.Embed(
                         description=(
                             f"### Saldo tidak cukup!\n"
@@ -1,12 +1,27 @@
 # utils/helper/economy.py
 
-def xp_for_level(level: int, base_xp: int = 5000, power: float = 1.5) -> int:
+from bisect import bisect_right
+
+# Parameter kurva level, dipakai juga oleh voisa.level_from_xp di Postgres
+BASE_XP = 5000
+LEVEL_POWER = 1.5
+
+# (base_xp, power) -> [xp_for_level(0), xp_for_level(1), ...], diperpanjang sesuai kebutuhan
+_LEVEL_TABLES: dict[tuple[int, float], list[int]] = {}
+
+def xp_for_level(level: int, base_xp: int = BASE_XP, power: float = LEVEL_POWER) -> int:
     """Hitung XP minimum untuk level tertentu berdasarkan kurva eksponensial"""
     return int(base_xp * (level ** power))
 
-def get_level_from_xp(xp: int, base_xp: int = 5000, power: float = 1.5) -> int:
-    """Dari total XP, tentukan level saat ini"""
-    level = 0
-    while xp >= xp_for_level(level + 1, base_xp, power):
-        level += 1
-    return level
\ No newline at end of file
+def level_table(xp: int, base_xp: int = BASE_XP, power: float = LEVEL_POWER) -> list[int]:
+    """Tabel threshold XP per level yang sudah mencakup `xp`"""
+    table = _LEVEL_TABLES.setdefault((base_xp, power), [0])
+    while table[-1] <= xp:
+        table.append(xp_for_level(len(table), base_xp, power))
+    return table
+
+def get_level_from_xp(xp: int, base_xp: int = BASE_XP, power: float = LEVEL_POWER) -> int:
+    """Dari total XP, tentukan level saat ini (bisect di tabel threshold)"""
+    if xp < base_xp:
+        return 0
+    return bisect_right(level_table(xp, base_xp, power), xp) - 1
@@ -0,0 +1,59 @@
+# utils/helper/sweepline.py
+
+from collections import defaultdict
+from heapq import heappush, heappop
+
+
+class OverlapSweep:
+    """
+    Sweep-line durasi overlap antar user dalam satu voice channel.
+    Sesi wajib masuk terurut (channel_id, join_time); tiap sesi hanya dibandingkan
+    dengan sesi yang masih aktif (heap berdasarkan leave_time), jadi O(n log n + pasangan).
+    Kalau `focus_user` diisi, hanya pasangan yang melibatkan user tersebut yang dihitung.
+    """
+
+    def __init__(self, focus_user: int | None = None):
+        self.focus_user = focus_user
+        self.totals: dict[tuple[int, int], float] = defaultdict(float)
+
+        self._channel = None
+        self._active: list[tuple[float, int]] = []        # (leave, user_id)
+        self._focus_active: list[tuple[float, int]] = []  # sesi milik focus_user saja
+
+    def feed(self, channel_id: int, user_id: int, join: float, leave: float):
+        if leave <= join:
+            return
+
+        if channel_id != self._channel:
+            self._channel = channel_id
+            self._active.clear()
+            self._focus_active.clear()
+
+        active = self._active
+        while active and active[0][0] <= join:
+            heappop(active)
+        focus_active = self._focus_active
+        while focus_active and focus_active[0][0] <= join:
+            heappop(focus_active)
+
+        if self.focus_user is None or user_id == self.focus_user:
+            candidates = active
+        else:
+            candidates = focus_active
+
+        totals = self.totals
+        for other_leave, other_user in candidates:
+            if other_user == user_id:
+                continue
+            # sesi lain join lebih dulu, jadi overlap mulai dari `join`
+            overlap = (leave if leave < other_leave else other_leave) - join
+            if overlap > 0:
+                pair = (user_id, other_user) if user_id < other_user else (other_user, user_id)
+                totals[pair] += overlap
+
+        heappush(active, (leave, user_id))
+        if user_id == self.focus_user:
+            heappush(focus_active, (leave, user_id))
+
+    def top(self, limit: int = 10) -> list[tuple[tuple[int, int], float]]:
+        return sorted(self.totals.items(), key=lambda item: item[1], reverse=True)[:limit]